@@ -0,0 +1,281 @@
+import math
+import os
+import sys
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.vecinos import vecinos_cercanos
+from algoritmos.evaluador import Evaluador
+from algoritmos.eventos import INFO, consola
+from algoritmos.instrumentacion import SIN_INSTRUMENTACION
+
+# Largo máximo de la cadena que mueve Or-opt
+LARGO_OR_OPT = 3
+EPSILON = 1e-9
+
+
+class BusquedaLocal:
+    """
+    Post-optimización de rutas por índices de la matriz, común a los tres
+    algoritmos. Una ruta es una lista [centro, ..., centro] donde los nodos
+    que no son tachos (centro, vertedero, gasolineras) quedan fijos: solo se
+    reordenan tachos dentro de los tramos entre nodos fijos o entre rutas.
+
+    Movimientos (todos guiados por la lista de vecinos cercanos):
+    - 2-opt dentro de un tramo (invierte un bloque de tachos).
+    - Or-opt / relocate: mueve una cadena de 1 a 3 tachos junto a un vecino,
+      en la misma ruta o en otra.
+    - Exchange: intercambia un tacho con un vecino.
+
+    Un movimiento se acepta si reduce la distancia (o quita un tramo sin
+    camino sin agregar ninguno) y no aumenta el exceso de carga (entre
+    descargas en el vertedero) ni el de combustible (entre recargas en
+    gasolineras) de las rutas que toca. Los "don't-look bits" hacen que
+    solo se vuelvan a revisar los tachos cuyo entorno cambió.
+    """
+
+    def __init__(self, matriz, tachos, vertedero=None, gasolineras=(),
+                 capacidad=5000, demanda=300, autonomia=5000, k_vecinos=8):
+        self.matriz = np.asarray(matriz, dtype=float)
+        self.tachos = set(tachos)
+        self.vertedero = vertedero
+        self.gasolineras = set(gasolineras)
+        self.capacidad = capacidad
+        self.demanda = demanda
+        self.autonomia = autonomia
+        self.vecinos = vecinos_cercanos(self.matriz, self.tachos, k_vecinos)
+        self.evaluador = Evaluador(self.matriz, self.tachos, vertedero, gasolineras,
+                                   capacidad, demanda, autonomia)
+        self.movimientos = {"2opt": 0, "oropt": 0, "exchange": 0}
+        self.vecinos_evaluados = 0
+
+    @property
+    def contadores(self):
+        """Vecinos revisados, movimientos aceptados por tipo y consultas al evaluador."""
+        return {"vecinos_evaluados": self.vecinos_evaluados,
+                **{f"aceptados_{tipo}": n for tipo, n in self.movimientos.items()},
+                **self.evaluador.contadores}
+
+    def distancia(self, ruta):
+        return self.evaluador.distancia(ruta)
+
+    def exceso(self, ruta):
+        """
+        Devuelve (exceso de carga, exceso de combustible) de la ruta: cuánto
+        se supera la capacidad antes de cada descarga y la autonomía antes de
+        cada recarga (o del final). (0, 0) si la ruta es factible.
+        """
+        return self.evaluador.exceso(ruta)
+
+    def _indexar(self):
+        # Solo los tachos que aparecen una única vez se pueden mover
+        self.donde = {}
+        repetidos = set()
+        for r, ruta in enumerate(self.rutas):
+            for i in range(1, len(ruta) - 1):
+                t = ruta[i]
+                if t in self.tachos:
+                    if t in self.donde:
+                        repetidos.add(t)
+                    self.donde[t] = (r, i)
+        for t in repetidos:
+            del self.donde[t]
+
+    def _es_movible(self, ruta, i):
+        return 0 < i < len(ruta) - 1 and ruta[i] in self.donde
+
+    def _aceptar(self, nuevas):
+        """
+        Aplica {r: ruta_nueva} si no empeora el exceso de ninguna ruta.
+        """
+        for r, ruta in nuevas.items():
+            viejo = self.exceso(self.rutas[r])
+            nuevo = self.exceso(ruta)
+            if nuevo[0] > viejo[0] + EPSILON or nuevo[1] > viejo[1] + EPSILON:
+                return False
+        for r, ruta in nuevas.items():
+            self.rutas[r] = ruta
+        self._indexar()
+        return True
+
+    # === Movimientos ===
+
+    def _conviene(self, quitadas, agregadas):
+        """
+        ¿Mejora cambiar las aristas `quitadas` por `agregadas`? Nunca se
+        agrega un tramo sin camino; quitar uno mejora siempre y, si todos
+        tienen camino, decide la distancia. Así no se resta inf - inf.
+        """
+        M = self.matriz
+        despues = 0.0
+        for u, v in agregadas:
+            d = M[u, v]
+            if not math.isfinite(d):
+                return False
+            despues += d
+        antes = 0.0
+        for u, v in quitadas:
+            d = M[u, v]
+            if not math.isfinite(d):
+                return True
+            antes += d
+        return despues < antes - EPSILON
+
+    def _probar_2opt(self, r, a, b):
+        """Invierte el bloque de tachos ruta[a..b] (todos movibles)."""
+        ruta = self.rutas[r]
+        if b - a < 1 or a < 1 or b > len(ruta) - 2:
+            return False
+        if not all(ruta[k] in self.donde for k in range(a, b + 1)):
+            return False
+        bloque = ruta[a:b + 1]
+        internas = list(zip(bloque[:-1], bloque[1:]))
+        quitadas = [(ruta[a - 1], ruta[a]), *internas, (ruta[b], ruta[b + 1])]
+        agregadas = [(ruta[a - 1], ruta[b]), *((v, u) for u, v in internas), (ruta[a], ruta[b + 1])]
+        if not self._conviene(quitadas, agregadas):
+            return False
+        nueva = ruta[:a] + bloque[::-1] + ruta[b + 1:]
+        if self._aceptar({r: nueva}):
+            self.movimientos["2opt"] += 1
+            return True
+        return False
+
+    def _probar_oropt(self, r1, i, largo, r2, j):
+        """
+        Mueve la cadena ruta1[i..i+largo-1] entre ruta2[j] y ruta2[j+1].
+        """
+        ruta1, ruta2 = self.rutas[r1], self.rutas[r2]
+        fin = i + largo - 1
+        if fin > len(ruta1) - 2 or j >= len(ruta2) - 1:
+            return False
+        if not all(ruta1[k] in self.donde for k in range(i, fin + 1)):
+            return False
+        if r1 == r2 and i - 1 <= j <= fin:
+            return False
+
+        p, q = ruta1[i - 1], ruta1[fin + 1]
+        u, v = ruta2[j], ruta2[j + 1]
+        cadena = ruta1[i:fin + 1]
+        if not self._conviene([(p, cadena[0]), (cadena[-1], q), (u, v)],
+                              [(p, q), (u, cadena[0]), (cadena[-1], v)]):
+            return False
+
+        if r1 == r2:
+            sin_cadena = ruta1[:i] + ruta1[fin + 1:]
+            pos = j + 1 if j < i else j + 1 - largo
+            nuevas = {r1: sin_cadena[:pos] + cadena + sin_cadena[pos:]}
+        else:
+            nuevas = {r1: ruta1[:i] + ruta1[fin + 1:],
+                      r2: ruta2[:j + 1] + cadena + ruta2[j + 1:]}
+        if self._aceptar(nuevas):
+            self.movimientos["oropt"] += 1
+            return True
+        return False
+
+    def _probar_exchange(self, r1, i, r2, j):
+        if r1 == r2 and abs(i - j) < 2:
+            return False
+        ruta1, ruta2 = self.rutas[r1], self.rutas[r2]
+        x, y = ruta1[i], ruta2[j]
+        a, b = ruta1[i - 1], ruta1[i + 1]
+        c, e = ruta2[j - 1], ruta2[j + 1]
+        if not self._conviene([(a, x), (x, b), (c, y), (y, e)],
+                              [(a, y), (y, b), (c, x), (x, e)]):
+            return False
+
+        if r1 == r2:
+            ruta = list(ruta1)
+            ruta[i], ruta[j] = y, x
+            nuevas = {r1: ruta}
+        else:
+            nueva1, nueva2 = list(ruta1), list(ruta2)
+            nueva1[i], nueva2[j] = y, x
+            nuevas = {r1: nueva1, r2: nueva2}
+        if self._aceptar(nuevas):
+            self.movimientos["exchange"] += 1
+            return True
+        return False
+
+    def _mejorar_desde(self, x):
+        """Prueba los movimientos que acercan `x` a sus vecinos; aplica el primero que mejora."""
+        for y in self.vecinos[x].tolist():
+            if y < 0 or x not in self.donde or y not in self.donde:
+                continue
+            self.vecinos_evaluados += 1
+            r1, i = self.donde[x]
+            r2, j = self.donde[y]
+
+            # 2-opt: crea la arista x→y invirtiendo el bloque entre ambos
+            if r1 == r2:
+                if j > i and self._probar_2opt(r1, i + 1, j):
+                    return True
+                if j < i and self._probar_2opt(r1, j, i - 1):
+                    return True
+
+            # Or-opt: cadena desde x, insertada después o antes de y
+            for largo in range(1, LARGO_OR_OPT + 1):
+                if self._probar_oropt(r1, i, largo, r2, j):
+                    return True
+                if self._probar_oropt(r1, i, largo, r2, j - 1):
+                    return True
+
+            if self._probar_exchange(r1, i, r2, j):
+                return True
+        return False
+
+    def mejorar(self, rutas, max_movimientos=100000):
+        """
+        Aplica movimientos de mejora hasta que ningún tacho activo mejore.
+        Devuelve las rutas nuevas (no modifica las recibidas).
+        """
+        self.rutas = [list(ruta) for ruta in rutas]
+        self._indexar()
+
+        pendientes = deque(sorted(self.donde))
+        activo = set(pendientes)
+        aplicados = 0
+        while pendientes and aplicados < max_movimientos:
+            x = pendientes.popleft()
+            activo.discard(x)
+            if x not in self.donde:
+                continue
+            r, i = self.donde[x]
+            antes = self.rutas[r][max(0, i - 1):i + 2]
+            if not self._mejorar_desde(x):
+                continue
+
+            aplicados += 1
+            # Reactivar el tacho y los que quedaron junto a sus posiciones
+            tocados = set(antes) | set(self.vecinos[x].tolist())
+            if x in self.donde:
+                r, i = self.donde[x]
+                tocados.update(self.rutas[r][max(0, i - 1):i + 2])
+            for t in tocados:
+                if t in self.donde and t not in activo:
+                    activo.add(t)
+                    pendientes.append(t)
+        return self.rutas
+
+
+def mejorar_rutas(rutas, matriz, tachos, vertedero=None, gasolineras=(),
+                  capacidad=5000, demanda=300, autonomia=5000, k_vecinos=8,
+                  eventos=None, instrumentacion=SIN_INSTRUMENTACION):
+    """
+    Atajo para `BusquedaLocal(...).mejorar(rutas)` que además informa la
+    distancia antes y después con el evento "busqueda_local" (por consola
+    si no se pasa `eventos`) y suma sus contadores a `instrumentacion`.
+    Devuelve las rutas mejoradas.
+    """
+    eventos = consola() if eventos is None else eventos
+    busqueda = BusquedaLocal(matriz, tachos, vertedero, gasolineras,
+                             capacidad, demanda, autonomia, k_vecinos)
+    antes = sum(busqueda.distancia(r) for r in rutas)
+    mejoradas = busqueda.mejorar(rutas)
+    despues = sum(busqueda.distancia(r) for r in mejoradas)
+    m = busqueda.movimientos
+    instrumentacion.sumar(busqueda.contadores, "busqueda_local")
+    eventos.emitir("busqueda_local", INFO, antes_m=antes, despues_m=despues,
+                   dos_opt=m["2opt"], or_opt=m["oropt"], exchange=m["exchange"])
+    return mejoradas
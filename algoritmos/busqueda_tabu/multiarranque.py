@@ -0,0 +1,234 @@
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.instancia import Instancia
+from algoritmos.busqueda_tabu.tabu import TabuSearch, MemoriaTabu
+from algoritmos.clarke_wright.clarke_wright import construir_rutas, repartir_viajes
+from algoritmos.evaluador import CAPACIDAD_KG, DEMANDA_KG
+from algoritmos.eventos import INFO, SIN_EVENTOS
+from algoritmos.presupuesto import Presupuesto
+
+NUM_CAMIONES = 3
+
+
+def crear_tabu(problema, k_vecinos=None, num_camiones=NUM_CAMIONES):
+    """
+    TabuSearch de un `Problema` con los parámetros comunes del proyecto.
+    Solo entran los tachos alcanzables, como en Clarke & Wright: con los
+    demás toda ruta tendría un tramo sin camino.
+    """
+    p = problema
+    return TabuSearch(p.matriz, p.nodo_a_indice, p.indice_a_nodo,
+                      {t: DEMANDA_KG for t in p.alcanzables}, p.centro, p.vertedero,
+                      p.gasolineras, list(p.alcanzables), capacidad_camion=CAPACIDAD_KG / 1000,
+                      num_camiones=num_camiones, zona=p.sector, k_vecinos=k_vecinos)
+
+
+# === Soluciones iniciales ===
+
+def _completar(ts, grupos):
+    """Tachos por camión -> rutas del modelo tabú [centro, tachos..., vertedero, gasolinera, centro]."""
+    M = ts.matriz
+    gasolinera = min(ts.gasolineras, key=lambda g: M[ts.vertedero][g] + M[g][ts.centro])
+    return [[ts.centro, *grupo, ts.vertedero, gasolinera, ts.centro] for grupo in grupos]
+
+
+def inicial_aleatoria(ts):
+    """La de siempre: tachos mezclados y repartidos por capacidad."""
+    return ts.generar_solucion_inicial()
+
+
+def inicial_vecino_cercano(ts):
+    """
+    Vecino más cercano con cuotas parejas: cada camión arranca en un tacho
+    al azar y sigue por el tacho pendiente más cercano hasta llenar su cuota.
+    """
+    M = ts.matriz
+    pendientes = set(ts.tachos_actuales)
+    cuota = math.ceil(len(pendientes) / ts.num_camiones)
+    grupos = []
+    for _ in range(ts.num_camiones):
+        grupo = []
+        if pendientes:
+            grupo.append(random.choice(sorted(pendientes)))
+            pendientes.discard(grupo[-1])
+        while pendientes and len(grupo) < cuota:
+            pos = grupo[-1]
+            siguiente = min(pendientes, key=lambda t: (M[pos][t], t))
+            grupo.append(siguiente)
+            pendientes.discard(siguiente)
+        grupos.append(grupo)
+    return _completar(ts, grupos)
+
+
+def inicial_clarke_wright(ts):
+    """
+    Viajes de Clarke & Wright repartidos entre los camiones; los tachos sin
+    camino desde el centro se agregan al camión con menos tachos.
+    """
+    M = ts.matriz
+    alcanzables = [t for t in ts.tachos_actuales if np.isfinite(M[ts.centro][t])]
+    viajes = construir_rutas(alcanzables, ts.centro, M, ts.vertedero, ts.gasolineras)
+    camiones = repartir_viajes(viajes, M, ts.centro, ts.vertedero, ts.gasolineras)
+    grupos = [[t for viaje in viajes_camion for t in viaje[1:-1]] for viajes_camion in camiones]
+    grupos += [[] for _ in range(ts.num_camiones - len(grupos))]
+    for t in ts.tachos_actuales:
+        if t not in alcanzables:
+            min(grupos, key=len).append(t)
+    return _completar(ts, grupos)
+
+
+INICIALES = {
+    "aleatoria": inicial_aleatoria,
+    "vecino_cercano": inicial_vecino_cercano,
+    "clarke_wright": inicial_clarke_wright,
+}
+
+
+# === Pool de procesos ===
+
+# Estado de cada proceso del pool (se asigna en el inicializador)
+_instancia_worker = None
+_busquedas_worker = {}
+
+
+def _inicializar_worker(directorio):
+    """
+    Abre la instancia una vez por proceso: con el almacén binario la matriz
+    queda memory-mapped y todos los procesos comparten las mismas páginas.
+    """
+    global _instancia_worker
+    _instancia_worker = Instancia(directorio)
+    _busquedas_worker.clear()
+
+
+def _busqueda(sector, k_vecinos):
+    clave = (sector, k_vecinos)
+    if clave not in _busquedas_worker:
+        _busquedas_worker[clave] = crear_tabu(_instancia_worker.problema(sector), k_vecinos)
+    return _busquedas_worker[clave]
+
+
+def _ejecutar_arranque(tarea):
+    """
+    Corre un tramo de una trayectoria tabú. `inicial` es el nombre de una
+    solución inicial (primera época) o las rutas desde donde continuar.
+    Devuelve la mejor solución del tramo y dónde quedó la trayectoria; el
+    costo lo calcula el proceso principal.
+    """
+    sector, k_vecinos, semilla, inicial, iteraciones, max_evaluaciones, num_vecinos, limite = tarea
+    ts = _busqueda(sector, k_vecinos)
+    random.seed(semilla)
+    if isinstance(inicial, str):
+        inicial = INICIALES[inicial](ts)
+
+    ts.memoria_tabu = MemoriaTabu(ts.tam_tabu)
+    segundos = None if limite is None else max(limite - time.time(), 0.0)
+    presupuesto = Presupuesto(segundos=segundos, max_evaluaciones=max_evaluaciones,
+                              max_iteraciones=iteraciones)
+    ts.ejecutar_busqueda(num_vecinos=num_vecinos, eventos=SIN_EVENTOS,
+                         presupuesto=presupuesto, solucion_inicial=inicial)
+    return {
+        "mejor": ts.mejor_solucion,
+        "actual": ts.solucion_actual,
+        "evaluaciones": presupuesto.evaluaciones,
+    }
+
+
+def semilla_arranque(semilla, arranque, epoca, epocas):
+    """Semilla única y reproducible para cada (arranque, época)."""
+    return semilla * 1_000_003 + arranque * epocas + epoca
+
+
+def ejecutar_multiarranque(sector="este",
+                           arranques=6,
+                           epocas=5,
+                           iteraciones_por_epoca=40,
+                           num_vecinos=30,
+                           k_vecinos=None,
+                           iniciales=tuple(INICIALES),
+                           reemplazos=None,
+                           procesos=None,
+                           semilla=0,
+                           segundos=None,
+                           max_evaluaciones=None,
+                           directorio="data",
+                           eventos=SIN_EVENTOS):
+    """
+    Búsqueda tabú multiarranque: `arranques` trayectorias independientes,
+    cada una con su semilla y su solución inicial (se reparten en orden los
+    tipos de `iniciales`: aleatoria, vecino más cercano, Clarke & Wright),
+    corren en un `ProcessPoolExecutor` que abre la matriz una vez por
+    proceso. Al final de cada época las mejores soluciones de todas las
+    trayectorias se puntúan juntas en el proceso principal con
+    `Evaluador.evaluar_lote`.
+
+    La búsqueda avanza por épocas de `iteraciones_por_epoca` iteraciones.
+    Al final de cada época se difunde la mejor solución global: las
+    `reemplazos` trayectorias con peor costo (por defecto un cuarto, al
+    menos una) continúan desde ella; las demás siguen donde quedaron. La
+    memoria tabú se reinicia en cada época.
+
+    Con `segundos` no se empiezan épocas después del plazo y cada tramo se
+    corta al vencer. `max_evaluaciones` (vecinos evaluados en total, como
+    en `Presupuesto`) se reparte en partes iguales entre los tramos de
+    todas las trayectorias y épocas, para comparar con una sola búsqueda
+    tabú al mismo presupuesto. Las semillas dependen solo de (semilla,
+    arranque, época), así que el resultado no depende del número de
+    procesos (salvo cuando corta el plazo).
+
+    Devuelve {"mejor": rutas, "costo", "costos": mejor costo de cada
+    arranque, "historial": mejor costo global por época, "evaluaciones"}.
+    """
+    limite = None if segundos is None else time.time() + segundos
+    ts = crear_tabu(Instancia(directorio).problema(sector))
+    reemplazos = max(1, arranques // 4) if reemplazos is None else reemplazos
+    por_tramo = None if max_evaluaciones is None else max(1, max_evaluaciones // (arranques * epocas))
+    actuales = [iniciales[k % len(iniciales)] for k in range(arranques)]
+    costos = [math.inf] * arranques
+    mejor, mejor_costo = None, math.inf
+    historial, evaluaciones = [], 0
+
+    with ProcessPoolExecutor(max_workers=procesos,
+                             initializer=_inicializar_worker,
+                             initargs=(directorio,)) as pool:
+        for epoca in range(epocas):
+            if limite is not None and time.time() >= limite and mejor is not None:
+                break
+            tareas = [
+                (sector, k_vecinos, semilla_arranque(semilla, k, epoca, epocas), actuales[k],
+                 iteraciones_por_epoca, por_tramo, num_vecinos, limite)
+                for k in range(arranques)
+            ]
+            resultados = list(pool.map(_ejecutar_arranque, tareas))
+            costos_epoca = ts.evaluar_costos([r["mejor"] for r in resultados])
+
+            for k, resultado in enumerate(resultados):
+                actuales[k] = resultado["actual"]
+                costos[k] = min(costos[k], costos_epoca[k])
+                evaluaciones += resultado["evaluaciones"]
+                if mejor is None or costos_epoca[k] < mejor_costo:
+                    mejor, mejor_costo = resultado["mejor"], costos_epoca[k]
+            historial.append(mejor_costo)
+
+            # Difusión: las peores trayectorias continúan desde la mejor global
+            ultimos = sorted(range(arranques), key=lambda k: costos_epoca[k])
+            for k in ultimos[arranques - reemplazos:]:
+                actuales[k] = mejor
+            eventos.emitir("tabu_multiarranque_epoca", INFO, sector=sector, epoca=epoca + 1,
+                           mejor_costo=mejor_costo, costos=costos_epoca)
+
+    return {
+        "mejor": mejor,
+        "costo": mejor_costo,
+        "costos": costos,
+        "historial": historial,
+        "evaluaciones": evaluaciones,
+    }
@@ -1,7 +1,48 @@
+import os
+import sys
 import numpy as np
 import random
 import json
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.vecinos import vecinos_cercanos
+from algoritmos.evaluador import PESOS, Evaluador
+from algoritmos.eventos import DEBUG, INFO, AVISO, SIN_EVENTOS, consola
+from algoritmos.presupuesto import Presupuesto
+
+# Tipos de movimiento del vecindario
+TIPOS_MOVIMIENTO = ("swap", "relocate", "2opt")
+
+
+class MemoriaTabu:
+    """
+    Memoria tabú por atributos: guarda en un diccionario, para cada atributo
+    (p. ej. (nodo, ruta)), la iteración en la que deja de ser tabú.
+    La consulta es O(1) y los atributos vencidos se purgan periódicamente,
+    así que el tamaño queda acotado por la tenencia y no por max_iter.
+    """
+
+    def __init__(self, tenencia=7):
+        self.tenencia = tenencia
+        self.expira = {}
+        self._limite_purga = max(64, 4 * tenencia)
+
+    def es_tabu(self, atributos, iteracion):
+        return any(self.expira.get(a, -1) >= iteracion for a in atributos)
+
+    def agregar(self, atributos, iteracion):
+        for a in atributos:
+            self.expira[a] = iteracion + self.tenencia
+        if len(self.expira) > self._limite_purga:
+            self.expira = {a: it for a, it in self.expira.items() if it >= iteracion}
+            self._limite_purga = max(64, 4 * self.tenencia, 2 * len(self.expira))
+
+    def limpiar(self):
+        self.expira.clear()
+
+    def __len__(self):
+        return len(self.expira)
+
 
 class TabuSearch:
     def __init__(self, 
@@ -17,7 +58,8 @@ class TabuSearch:
                  max_km=100, 
                  num_camiones=3, 
                  tam_tabu=7, 
-                 zona='este'):
+                 zona='este',
+                 k_vecinos=None):
 
         self.matriz = matriz
         self.nodo_a_indice = nodo_a_indice
@@ -32,14 +74,28 @@ class TabuSearch:
         # === Parámetros del problema ===
         self.capacidad_kg = capacidad_camion * 1000 
         self.max_km = max_km
+        self.max_m = max_km * 1000  # la matriz está en metros
         self.num_camiones = num_camiones
         self.tam_tabu = tam_tabu
         self.zona = zona  
         self.demandas = demandas
 
-        self.tabu_list = []
+        # Lista de candidatos: swap/relocate solo entre tachos cercanos
+        self.vecinos_tachos = None
+        if k_vecinos:
+            self.vecinos_tachos = vecinos_cercanos(matriz, tachos_actuales_idx, k_vecinos)
+
+        # Evaluación completa con el evaluador común; la autonomía es la de la búsqueda tabú
+        self.evaluador = Evaluador(matriz, tachos_actuales_idx, vertedero_idx, gasolineras_idx,
+                                   capacidad=self.capacidad_kg, demanda=demandas, autonomia=self.max_m)
+
+        self.memoria_tabu = MemoriaTabu(tam_tabu)
+        self.iteracion = 0
         self.mejor_solucion = None
         self.mejor_costo = float('inf')
+        # Contadores para la instrumentación (algoritmos/instrumentacion.py)
+        self.contadores = {"vecinos_evaluados": 0, "movimientos_aceptados": 0,
+                           "aspiraciones": 0, "mejoras": 0}
 
     def generar_solucion_inicial(self):
         """
@@ -95,65 +151,197 @@ class TabuSearch:
 
         return rutas_finales
 
-    def evaluar_costo(self, rutas):
+    def _sin_recarga(self, ruta):
+        """Regla propia de la búsqueda tabú: la ruta vuelve del vertedero sin pasar por gasolinera."""
+        return len(ruta) >= 3 and ruta[-3] == self.vertedero and ruta[-2] not in self.gasolineras
+
+    def _estandar(self, ruta):
         """
-        Devuelve el costo total con penalizaciones.
+        True si la ruta tiene la forma [centro, tachos..., vertedero, x, centro]:
+        los movimientos solo permutan tachos, así que la conserva.
         """
-        costo_total = 0
-        penalizacion_total = 0
-        tachos_visitados = set()
-
-        for ruta in rutas:
-            carga = 0
-            distancia = 0
-            paso_por_gasolinera = False
-            antes_de_vertedero = True
-
-            for i in range(len(ruta) - 1):
-                origen = ruta[i]
-                destino = ruta[i + 1]
-                distancia = distancia + self.matriz[origen][destino]
+        return (len(ruta) >= 4 and ruta[-3] == self.vertedero
+                and all(n in self.demandas for n in ruta[1:-3]))
 
-                # Verificar si estamos antes del vertedero
-                if antes_de_vertedero and destino == self.vertedero:
-                    antes_de_vertedero = False
-
-                # Acumulamos carga si es tacho
-                if origen in self.demandas:
-                    carga = carga + self.demandas[origen]
-                    if origen in tachos_visitados:
-                        penalizacion_total += 99999  # Penalización muy alta por tacho duplicado
-                    else:
-                        tachos_visitados.add(origen)
+    def _penalizacion_ruta(self, ruta, distancia, carga, sin_camino=0):
+        """
+        Penalizaciones de una ruta con forma estándar, iguales a las del
+        `Evaluador` (tramos sin camino, exceso de carga al llegar al
+        vertedero y de recorrido al llegar a cada recarga) más la regla de
+        la gasolinera entre vertedero y centro. `distancia` es la de los
+        tramos con camino. Con una sola descarga y a lo sumo una recarga
+        (en ruta[-2]) los excesos salen de la carga y la distancia totales.
+        """
+        penalizacion = sin_camino * PESOS["sin_camino"]
+        penalizacion += max(carga - self.capacidad_kg, 0) * PESOS["carga"]
 
-                # Verificar si pasa por gasolinera
-                if origen in self.gasolineras:
-                    paso_por_gasolinera = True
+        if ruta[-2] in self.gasolineras:
+            regreso = self.matriz[ruta[-2]][ruta[-1]]
+            regreso = regreso if np.isfinite(regreso) else 0.0
+            tramos = (distancia - regreso, regreso)
+        else:
+            tramos = (distancia,)
+        penalizacion += sum(max(t - self.max_m, 0) for t in tramos) * PESOS["combustible"]
 
-            # 🚫 Penalización por exceso de carga
-            if carga > self.capacidad_kg:
-                exceso = carga - self.capacidad_kg
-                penalizacion_total = penalizacion_total + (exceso * 1000)
+        if self._sin_recarga(ruta):
+            penalizacion += PESOS["sin_recarga"]
+        return penalizacion
 
-            # 🚫 Penalización por no recargar gasolina antes del vertedero (si se pasa el límite)
-            if distancia > self.max_km and not paso_por_gasolinera:
-                exceso = distancia - self.max_km
-                penalizacion_total = penalizacion_total + (exceso * 500)
+    def evaluar_costo(self, rutas):
+        """
+        Costo total con penalizaciones: `Evaluacion.costo` del evaluador
+        común (algoritmos/evaluador.py) más la regla de la gasolinera entre
+        vertedero y centro. Los tramos sin camino no suman inf sino una
+        penalización cada uno.
+        """
+        return self.evaluador.evaluar(rutas).costo + PESOS["sin_recarga"] * sum(map(self._sin_recarga, rutas))
 
-            # 🚫 Penalización si no pasa por gasolinera entre vertedero y centro
-            if ruta[-3] == self.vertedero:
-                gasolinera = ruta[-2]
-                if gasolinera not in self.gasolineras:
-                    penalizacion_total = penalizacion_total + 50000  # fuerte penalización
+    def evaluar_costos(self, soluciones):
+        """`evaluar_costo` de varias soluciones en una sola pasada (`Evaluador.evaluar_lote`)."""
+        return [evaluacion.costo + PESOS["sin_recarga"] * sum(map(self._sin_recarga, solucion))
+                for evaluacion, solucion in zip(self.evaluador.evaluar_lote(soluciones), soluciones)]
 
-            costo_total = costo_total + distancia
+    def _preparar_cache(self, solucion):
+        """
+        Guarda, para la solución actual, la distancia (solo tramos con
+        camino), los tramos sin camino, la carga y la penalización de cada
+        ruta, y las sumas prefijas de ambas en los dos sentidos (para evaluar
+        2-opt sin recorrer el segmento invertido). Todo queda finito, así las
+        deltas nunca restan inf - inf.
+        """
+        self._solucion = solucion
+        self._dist = []
+        self._sin_camino = []
+        self._carga = []
+        self._pen = []
+        self._pref = []
 
-        # 🚫 Penalización si quedaron tachos sin visitar
-        tachos_idx = self.tachos_actuales
-        faltantes = set(tachos_idx) - tachos_visitados
-        penalizacion_total = penalizacion_total + (len(faltantes) * 9999)
+        for ruta in solucion:
+            r = np.asarray(ruta)
+            ida = np.asarray(self.matriz[r[:-1], r[1:]], dtype=float)
+            vuelta = np.asarray(self.matriz[r[1:], r[:-1]], dtype=float)
+            ida_sin, vuelta_sin = ~np.isfinite(ida), ~np.isfinite(vuelta)
+            ida, vuelta = np.where(ida_sin, 0.0, ida), np.where(vuelta_sin, 0.0, vuelta)
+            distancia = float(ida.sum())
+            sin_camino = int(ida_sin.sum())
+            carga = sum(self.demandas.get(n, 0) for n in ruta[:-1])
+            self._dist.append(distancia)
+            self._sin_camino.append(sin_camino)
+            self._carga.append(carga)
+            self._pen.append(self._penalizacion_ruta(ruta, distancia, carga, sin_camino)
+                             if self._estandar(ruta) else np.nan)
+            self._pref.append(tuple(np.concatenate(([0], np.cumsum(x)))
+                                    for x in (ida, vuelta, ida_sin, vuelta_sin)))
+
+        # Índice de posiciones de los tachos y rutas que admiten cada tipo de cambio
+        self._posicion = {}
+        for r, ruta in enumerate(solucion):
+            for i in range(1, len(ruta) - 3):
+                self._posicion.setdefault(ruta[i], (r, i))
+        self._rutas_con_tachos = [r for r, ruta in enumerate(solucion) if len(ruta) > 4]
+        self._rutas_2opt = [r for r, ruta in enumerate(solucion) if len(ruta) > 5]
+
+        # Duplicados y faltantes no cambian con swap/relocate/2-opt: las deltas
+        # solo recalculan las rutas tocadas sobre el costo actual
+        self._costo_actual = self.evaluar_costo(solucion)
+
+    def _costo_ruta(self, r, ruta, distancia, carga, sin_camino):
+        return distancia + self._penalizacion_ruta(ruta, distancia, carga, sin_camino)
+
+    def _cambiar_aristas(self, r, quitadas, agregadas):
+        """
+        (distancia, tramos sin camino) de la ruta r de la solución actual al
+        reemplazar las aristas `quitadas` por `agregadas` (listas de distancias).
+        """
+        quitado, agregado = sum(quitadas), sum(agregadas)
+        if np.isfinite(quitado) and np.isfinite(agregado):
+            return self._dist[r] - quitado + agregado, self._sin_camino[r]
+        distancia, sin_camino = self._dist[r], self._sin_camino[r]
+        for tramo in quitadas:
+            if np.isfinite(tramo):
+                distancia -= tramo
+            else:
+                sin_camino -= 1
+        for tramo in agregadas:
+            if np.isfinite(tramo):
+                distancia += tramo
+            else:
+                sin_camino += 1
+        return distancia, sin_camino
 
-        return costo_total + penalizacion_total
+    def aplicar_cambio(self, solucion, cambio):
+        """
+        Devuelve una nueva solución con el cambio aplicado. Solo se copian
+        las rutas modificadas; las demás se comparten con `solucion`.
+        """
+        nueva = list(solucion)
+        tipo = cambio[0]
+        if tipo == "swap":
+            _, r1, i1, r2, i2 = cambio
+            nueva[r1], nueva[r2] = solucion[r1].copy(), solucion[r2].copy()
+            nueva[r1][i1], nueva[r2][i2] = nueva[r2][i2], nueva[r1][i1]
+        elif tipo == "relocate":
+            _, r1, i1, r2, i2 = cambio
+            nueva[r1], nueva[r2] = solucion[r1].copy(), solucion[r2].copy()
+            nodo = nueva[r1].pop(i1)
+            nueva[r2].insert(i2, nodo)
+        elif tipo == "2opt":
+            _, r, i, j = cambio
+            nueva[r] = solucion[r][:i] + solucion[r][i:j + 1][::-1] + solucion[r][j + 1:]
+        return nueva
+
+    def delta_costo(self, cambio):
+        """
+        Costo de la solución actual tras aplicar `cambio`, calculado solo con
+        las aristas y cargas que el movimiento modifica:
+        - ("swap", r1, i1, r2, i2): intercambia dos tachos de rutas distintas.
+        - ("relocate", r1, i1, r2, i2): mueve el tacho r1[i1] a la posición i2 de r2.
+        - ("2opt", r, i, j): invierte el tramo r[i..j] de una ruta.
+        """
+        M = self.matriz
+        sol = self._solucion
+        tipo = cambio[0]
+
+        # Rutas sin la forma estándar (p. ej. una solución inicial externa): evaluación completa
+        if np.isnan(self._pen[cambio[1]]) or (tipo != "2opt" and np.isnan(self._pen[cambio[3]])):
+            return self.evaluar_costo(self.aplicar_cambio(sol, cambio))
+
+        if tipo == "2opt":
+            _, r, i, j = cambio
+            ruta = sol[r]
+            ida, vuelta, ida_sin, vuelta_sin = self._pref[r]
+            p, a, b, q = ruta[i - 1], ruta[i], ruta[j], ruta[j + 1]
+            distancia, sin_camino = self._cambiar_aristas(r, (M[p, a], M[b, q]), (M[p, b], M[a, q]))
+            distancia += (vuelta[j] - vuelta[i]) - (ida[j] - ida[i])
+            sin_camino += int((vuelta_sin[j] - vuelta_sin[i]) - (ida_sin[j] - ida_sin[i]))
+            costo_r = self._costo_ruta(r, ruta, distancia, self._carga[r], sin_camino)
+            return self._costo_actual - (self._dist[r] + self._pen[r]) + costo_r
+
+        _, r1, i1, r2, i2 = cambio
+        R1, R2 = sol[r1], sol[r2]
+        x = R1[i1]
+
+        if tipo == "swap":
+            y = R2[i2]
+            a, b = R1[i1 - 1], R1[i1 + 1]
+            c, e = R2[i2 - 1], R2[i2 + 1]
+            dist1, sin1 = self._cambiar_aristas(r1, (M[a, x], M[x, b]), (M[a, y], M[y, b]))
+            dist2, sin2 = self._cambiar_aristas(r2, (M[c, y], M[y, e]), (M[c, x], M[x, e]))
+            carga1 = self._carga[r1] - self.demandas.get(x, 0) + self.demandas.get(y, 0)
+            carga2 = self._carga[r2] - self.demandas.get(y, 0) + self.demandas.get(x, 0)
+        else:  # relocate
+            a, b = R1[i1 - 1], R1[i1 + 1]
+            c, e = R2[i2 - 1], R2[i2]
+            dist1, sin1 = self._cambiar_aristas(r1, (M[a, x], M[x, b]), (M[a, b],))
+            dist2, sin2 = self._cambiar_aristas(r2, (M[c, e],), (M[c, x], M[x, e]))
+            carga1 = self._carga[r1] - self.demandas.get(x, 0)
+            carga2 = self._carga[r2] + self.demandas.get(x, 0)
+
+        costo1 = self._costo_ruta(r1, R1, dist1, carga1, sin1)
+        costo2 = self._costo_ruta(r2, R2, dist2, carga2, sin2)
+        return (self._costo_actual
+                - (self._dist[r1] + self._pen[r1]) - (self._dist[r2] + self._pen[r2])
+                + costo1 + costo2)
 
     def costo_total(self, solucion):
         """
@@ -168,71 +356,148 @@ class TabuSearch:
                 total += self.matriz[origen][destino]
         return total
     
+    def cambio_aleatorio(self, solucion):
+        """
+        Sortea un cambio posicional sobre el tramo de tachos de las rutas
+        (posiciones 1..len-4, excluye centro, vertedero y gasolinera).
+        Las rutas se eligen solo entre las que admiten el tipo de cambio,
+        así que no hace falta reintentar. Devuelve None si ningún tipo aplica.
+        Con lista de candidatos (`k_vecinos`) swap y relocate se arman entre
+        tachos cercanos de rutas distintas.
+        """
+        con_tachos = self._rutas_con_tachos
+        tipos = [t for t in TIPOS_MOVIMIENTO
+                 if (t == "2opt" and self._rutas_2opt)
+                 or (t == "relocate" and con_tachos and len(solucion) > 1)
+                 or (t == "swap" and len(con_tachos) > 1)]
+        if not tipos:
+            return None
+        tipo = random.choice(tipos)
+
+        if tipo == "2opt":
+            r = random.choice(self._rutas_2opt)
+            i, j = sorted(random.sample(range(1, len(solucion[r]) - 3), 2))
+            return ("2opt", r, i, j)
+
+        if self.vecinos_tachos is not None:
+            cambio = self._cambio_cercano(solucion, tipo)
+            if cambio is not None:
+                return cambio
+
+        if tipo == "relocate":
+            r1 = random.choice(con_tachos)
+            r2 = random.choice([r for r in range(len(solucion)) if r != r1])
+            i1 = random.randint(1, len(solucion[r1]) - 4)
+            i2 = random.randint(1, len(solucion[r2]) - 3)  # puede insertarse antes del vertedero
+            return ("relocate", r1, i1, r2, i2)
+
+        # Seleccionar 2 rutas distintas con tachos
+        r1, r2 = random.sample(con_tachos, 2)
+        i1 = random.randint(1, len(solucion[r1]) - 4)
+        i2 = random.randint(1, len(solucion[r2]) - 4)
+        return ("swap", r1, i1, r2, i2)
+
+    def _cambio_cercano(self, solucion, tipo):
+        """
+        Swap o relocate entre un tacho al azar y uno de sus vecinos cercanos
+        que esté en otra ruta (relocate lo inserta justo después del vecino).
+        Devuelve None si ningún vecino está en otra ruta.
+        """
+        r1 = random.choice(self._rutas_con_tachos)
+        i1 = random.randint(1, len(solucion[r1]) - 4)
+        opciones = [self._posicion[v] for v in self.vecinos_tachos[solucion[r1][i1]].tolist()
+                    if v in self._posicion and self._posicion[v][0] != r1]
+        if not opciones:
+            return None
+        r2, i2 = random.choice(opciones)
+        if tipo == "relocate":
+            return ("relocate", r1, i1, r2, i2 + 1)
+        return ("swap", r1, i1, r2, i2)
+
+    def cambio_valido(self, solucion, cambio):
+        """
+        Valida con el índice de posiciones que el cambio no repite tachos:
+        los nodos movidos deben ser tachos distintos que aparecen una sola vez.
+        """
+        if cambio[0] == "2opt":
+            return True
+        _, r1, i1, r2, i2 = cambio
+        x = solucion[r1][i1]
+        if self._posicion.get(x) != (r1, i1):
+            return False
+        if cambio[0] == "swap":
+            y = solucion[r2][i2]
+            return x != y and self._posicion.get(y) == (r2, i2)
+        return True
+
+    def clave_movimiento(self, solucion, cambio):
+        """
+        Movimiento (atributos por nodo) que se guarda en la lista tabú:
+            ("swap", nodo1, ruta1, nodo2, ruta2)
+            ("relocate", nodo, ruta_origen, ruta_destino)
+            ("2opt", ruta, nodo_i, nodo_j)
+        """
+        tipo = cambio[0]
+        if tipo == "swap":
+            _, r1, i1, r2, i2 = cambio
+            return ("swap", solucion[r1][i1], r1, solucion[r2][i2], r2)
+        if tipo == "relocate":
+            _, r1, i1, r2, _ = cambio
+            return ("relocate", solucion[r1][i1], r1, r2)
+        _, r, i, j = cambio
+        return ("2opt", r, solucion[r][i], solucion[r][j])
+
+    def atributos_movimiento(self, movimiento):
+        """
+        Devuelve (creados, prohibidos) para un movimiento:
+        - creados: atributos que el movimiento produce; si alguno está en la
+          memoria, el movimiento es tabú.
+        - prohibidos: atributos que se vuelven tabú al aceptarlo (deshacerlo).
+        Los atributos son pares (nodo, ruta); 2-opt usa el tramo invertido.
+        """
+        tipo = movimiento[0]
+        if tipo == "swap":
+            _, nodo1, r1, nodo2, r2 = movimiento
+            return ((nodo1, r2), (nodo2, r1)), ((nodo1, r1), (nodo2, r2))
+        if tipo == "relocate":
+            _, nodo, r1, r2 = movimiento
+            return ((nodo, r2),), ((nodo, r1),)
+        _, r, a, b = movimiento
+        tramo = ("2opt", r, min(a, b), max(a, b))
+        return (tramo,), (tramo,)
+
+    def es_tabu(self, movimiento, iteracion=None):
+        creados, _ = self.atributos_movimiento(movimiento)
+        return self.memoria_tabu.es_tabu(creados, self.iteracion if iteracion is None else iteracion)
+
     def vecindario(self, solucion_actual, num_vecinos=10):
         """
-        Crea vecindario, en el cual se devuelve tuplar (solucion_vecina, movimiento):
-        - Una lista de vecinos generados a partir de la solución actual.
-        - Cada vecino es una nueva solución con un movimiento específico.
-            + Donde el movimiento es un swap entre dos nodos de dos rutas distintas.
-                movimiento = ("swap", nodo1, ruta1, nodo2, ruta2)
+        Crea vecindario como lista de tuplas (cambio, movimiento) sin copiar la solución:
+        - `cambio` es un descriptor posicional que solo se aplica si se elige:
+            ("swap", r1, i1, r2, i2), ("relocate", r1, i1, r2, i2) o ("2opt", r, i, j)
+        - `movimiento` son sus atributos para la lista tabú (ver clave_movimiento).
+        Requiere el caché de la solución actual (_preparar_cache).
         """
         vecinos = []
-        intentos = 0
-        max_intentos = num_vecinos * 3
-
-        while len(vecinos) < num_vecinos and intentos < max_intentos:
-            # Copiar la solución actual
-            nueva_sol = [ruta.copy() for ruta in solucion_actual]
-
-            # Seleccionar 2 rutas distintas
-            r1, r2 = random.sample(range(len(nueva_sol)), 2)
-
-            # Evitar que tengan solo nodos fijos
-            if len(nueva_sol[r1]) <= 4 or len(nueva_sol[r2]) <= 4:
-                intentos += 1
-                continue
-
-            # Elegir posiciones aleatorias dentro de las rutas (solo en el tramo de tachos)
-            i1 = random.randint(1, len(nueva_sol[r1]) - 4)  # excluye centro, vertedero, etc.
-            i2 = random.randint(1, len(nueva_sol[r2]) - 4)
-
-            # Nodo original antes de swap
-            nodo1 = nueva_sol[r1][i1]
-            nodo2 = nueva_sol[r2][i2]
-
-            # Creamos el movimiento
-            movimiento = ("swap", nodo1, r1, nodo2, r2)
-
-            # Aplicamos el swap
-            nueva_sol[r1][i1], nueva_sol[r2][i2] = nodo2, nodo1
-
-            # Validar que los tachos no se repitan
-            tachos_usados = set()
-            valido = True
-            for ruta in nueva_sol:
-                for nodo in ruta[1:-3]:  # solo los tachos
-                    if nodo in tachos_usados:
-                        valido = False
-                        break
-                    tachos_usados.add(nodo)
-
-            if valido:
-                vecinos.append((nueva_sol, movimiento))
-
-            intentos += 1
-
+        for _ in range(num_vecinos):
+            cambio = self.cambio_aleatorio(solucion_actual)
+            if cambio is None:
+                break
+            if self.cambio_valido(solucion_actual, cambio):
+                vecinos.append((cambio, self.clave_movimiento(solucion_actual, cambio)))
         return vecinos
     
     def buscar_mejor_vecino(self, vecinos):
         """
-        Dado un conjunto de vecinos generados junto con su movimiento:
-        - Evalúa el costo de cada vecino usando evaluar_costo().
+        Dado un conjunto de cambios generados junto con su movimiento:
+        - Evalúa el costo de cada vecino con delta_costo() sobre la solución actual
+          (solo las aristas y cargas que cambian, sin recorrer las rutas).
         - Si el movimiento está en la lista tabú:
             - Lo ignora a menos que cumpla el criterio de aspiración.
         - Escoge el vecino con menor costo total permitido.
 
         Devuelve:
-        - El mejor vecino.
+        - El cambio del mejor vecino (sin aplicar).
         - Su costo.
         - El movimiento.
         - Si fue tabú o no.
@@ -242,64 +507,113 @@ class TabuSearch:
         mejor_movimiento = None
         fue_tabu = False
 
-        for vecino, movimiento in vecinos:
-            costo = self.evaluar_costo(vecino)
+        for cambio, movimiento in vecinos:
+            costo = self.delta_costo(cambio)
 
-            if movimiento in self.tabu_list:
+            if self.es_tabu(movimiento):
                 # Criterio de aspiración: si mejora el mejor global, se permite
                 if costo < self.mejor_costo:
-                    mejor_vecino = vecino
+                    mejor_vecino = cambio
                     mejor_costo = costo
                     mejor_movimiento = movimiento
                     fue_tabu = True  # Se permitió por aspiración
             else:
                 if costo < mejor_costo:
-                    mejor_vecino = vecino
+                    mejor_vecino = cambio
                     mejor_costo = costo
                     mejor_movimiento = movimiento
                     fue_tabu = False
 
         return mejor_vecino, mejor_costo, mejor_movimiento, fue_tabu
 
-    def ejecutar_busqueda(self, max_iter=100, verbose=True):
+    def ejecutar_busqueda(self, max_iter=100, verbose=True, num_vecinos=10, tam_tabu=None, eventos=None,
+                          presupuesto=None, solucion_inicial=None):
+        """
+        Búsqueda tabú desde la solución inicial. El progreso se informa con
+        `eventos` (algoritmos/eventos.py); si no se pasa, `verbose` muestra
+        por consola el costo inicial y las mejoras (nivel INFO) y
+        `verbose=False` no emite nada. Cada iteración es un evento DEBUG.
+
+        Con un `Presupuesto` (algoritmos/presupuesto.py) la parada la decide
+        él (tiempo, vecinos evaluados, iteraciones sin mejora) en lugar de
+        `max_iter`. `self.presupuesto.mejor` tiene la mejor solución en todo
+        momento.
+
+        `solucion_inicial` (rutas [centro, tachos..., vertedero, gasolinera,
+        centro]) reemplaza a `generar_solucion_inicial()`; al terminar,
+        `self.solucion_actual` queda con la solución en la que paró la
+        trayectoria, para poder continuarla.
+        """
+        if eventos is None:
+            eventos = consola() if verbose else SIN_EVENTOS
+        detallar = eventos.escucha(DEBUG)
+
+        informar_presupuesto = presupuesto is not None
+        if presupuesto is None:
+            presupuesto = Presupuesto(max_iteraciones=max_iter)
+        self.presupuesto = presupuesto
+
+        # Tenencia tabú configurable por ejecución
+        if tam_tabu is not None:
+            self.tam_tabu = tam_tabu
+            self.memoria_tabu = MemoriaTabu(tam_tabu)
+
         # 1. Solución inicial
-        solucion_actual = self.generar_solucion_inicial()
-        costo_actual = self.evaluar_costo(solucion_actual)
+        if solucion_inicial is None:
+            solucion_actual = self.generar_solucion_inicial()
+        else:
+            solucion_actual = [list(ruta) for ruta in solucion_inicial]
+        self._preparar_cache(solucion_actual)
+        costo_actual = self._costo_actual
 
         # 2. Mejor solución
         self.mejor_solucion = solucion_actual
         self.mejor_costo = costo_actual
+        presupuesto.contar()
+        presupuesto.registrar(costo_actual, solucion_actual)
 
-        if verbose:
-            print(f"Iteración 0: Costo inicial = {costo_actual:.2f}")
+        eventos.emitir("tabu_inicio", INFO, costo=costo_actual)
 
         # 3. Ciclo principal
-        for iteracion in range(1, max_iter + 1):
-            vecinos = self.vecindario(solucion_actual)
+        while presupuesto.continuar():
+            iteracion = self.iteracion = presupuesto.iteraciones
+            vecinos = self.vecindario(solucion_actual, num_vecinos)
             if not vecinos:
-                if verbose:
-                    print(f"⚠️ Sin vecinos generados en la iteración {iteracion}")
+                eventos.emitir("tabu_sin_vecinos", AVISO, iteracion=iteracion)
+                presupuesto.detener("sin vecinos")
                 break
 
-            mejor_vecino, costo_vecino, movimiento, fue_tabu = self.buscar_mejor_vecino(vecinos)
+            mejor_cambio, costo_vecino, movimiento, fue_tabu = self.buscar_mejor_vecino(vecinos)
+            self.contadores["vecinos_evaluados"] += len(vecinos)
+            presupuesto.contar(len(vecinos))
+            if mejor_cambio is None:
+                continue
+            self.contadores["movimientos_aceptados"] += 1
+            self.contadores["aspiraciones"] += fue_tabu
 
-            # 4. Actualizar solución actual
-            solucion_actual = mejor_vecino
-            costo_actual = costo_vecino
+            # 4. Aplicar el cambio elegido (evaluación completa solo del movimiento aceptado)
+            solucion_actual = self.aplicar_cambio(solucion_actual, mejor_cambio)
+            self._preparar_cache(solucion_actual)
+            costo_actual = self._costo_actual
 
             # 5. Actualizar mejor solución si es necesario
-            if costo_actual < self.mejor_costo:
+            if presupuesto.registrar(costo_actual, solucion_actual):
                 self.mejor_solucion = solucion_actual
                 self.mejor_costo = costo_actual
-                if verbose:
-                    print(f"✅ Iteración {iteracion}: Mejorada a {self.mejor_costo:.2f}")
-            else:
-                if verbose:
-                    tag = "⭐️ (tabú)" if fue_tabu else ""
-                    print(f"Iteración {iteracion}: Costo = {costo_actual:.2f} {tag}")
+                self.contadores["mejoras"] += 1
+                eventos.emitir("tabu_mejora", INFO, iteracion=iteracion, costo=self.mejor_costo)
+            elif detallar:
+                eventos.emitir("tabu_iteracion", DEBUG, iteracion=iteracion, costo=costo_actual,
+                               tabu=fue_tabu)
+
+            # 6. Actualizar memoria tabú (prohibir deshacer el movimiento durante la tenencia)
+            _, prohibidos = self.atributos_movimiento(movimiento)
+            self.memoria_tabu.agregar(prohibidos, iteracion)
 
-            # 6. Actualizar lista tabú
-            self.tabu_list.append(movimiento)
+        self.solucion_actual = solucion_actual
+
+        if informar_presupuesto:
+            eventos.emitir("fin_presupuesto", INFO, solver="tabu", **presupuesto.resumen())
 
 
 def mostrar_rutas(ts, rutas):
@@ -309,6 +623,7 @@ def mostrar_rutas(ts, rutas):
     penalizacion_total = 0
     todos_tachos = set(ts.tachos_actuales)
     tachos_visitados = set()
+    duplicados = 0
 
     for idx_ruta, ruta in enumerate(rutas):
         print(f"\n🛻 Ruta del Camión {idx_ruta + 1}:")
@@ -324,65 +639,71 @@ def mostrar_rutas(ts, rutas):
             )
             ruta_str.append(f"{idx}({tipo})")
             if idx in ts.demandas:
+                if idx in tachos_visitados:
+                    duplicados += 1
                 tachos_visitados.add(idx)
         print(" → ".join(ruta_str))
 
-        # Cálculos de ruta
+        # Cálculos de ruta (distancias de la matriz en metros)
         carga_kg = 0
-        distancia_km = 0
-        paso_por_gasolinera = False
+        distancia_m = 0
+        sin_camino = 0
         penalizaciones = []
-        tiene_vertedero = False
 
         for i in range(len(ruta) - 1):
             origen, destino = ruta[i], ruta[i+1]
-            distancia_km += ts.matriz[origen][destino]
+            if np.isfinite(ts.matriz[origen][destino]):
+                distancia_m += ts.matriz[origen][destino]
+            else:
+                sin_camino += 1
 
             if origen in ts.demandas:
                 carga_kg += ts.demandas[origen]
 
-            if destino in ts.gasolineras:
-                paso_por_gasolinera = True
-                
-            if destino == ts.vertedero:
-                tiene_vertedero = True
+        # Validaciones y penalizaciones: mismas reglas y pesos que evaluar_costo
+        if sin_camino:
+            penalizaciones.append((f"🚧 Tramos sin camino ({sin_camino})", sin_camino * PESOS["sin_camino"]))
 
-        # Validaciones y penalizaciones
-        if not tiene_vertedero:
-            penalizaciones.append(("🚫 Ruta no pasa por vertedero", 50000))
-            
-        if carga_kg > ts.capacidad_kg:
-            exceso = carga_kg - ts.capacidad_kg
-            penalizaciones.append((f"⚠️ Exceso de carga ({exceso/1000:.2f} ton)", exceso * 10))
+        exceso_carga, exceso_combustible = ts.evaluador.exceso(ruta)
+        if exceso_carga > 0:
+            penalizaciones.append((f"⚠️ Exceso de carga ({exceso_carga/1000:.2f} ton)",
+                                   exceso_carga * PESOS["carga"]))
 
-        if distancia_km > ts.max_km and not paso_por_gasolinera:
-            exceso = distancia_km - ts.max_km
-            penalizaciones.append((f"⛽ Exceso km sin gasolinera ({exceso:.2f} km)", exceso * 5))
+        if exceso_combustible > 0:
+            penalizaciones.append((f"⛽ Exceso sin recargar ({exceso_combustible/1000:.2f} km)",
+                                   exceso_combustible * PESOS["combustible"]))
+
+        if ts._sin_recarga(ruta):
+            penalizaciones.append(("🚫 Sin gasolinera entre vertedero y centro", PESOS["sin_recarga"]))
 
         # Mostrar resumen
         print(f"🔁 Carga: {carga_kg/1000:.2f} ton (Capacidad: {ts.capacidad_kg/1000:.2f} ton)")
-        print(f"📏 Distancia: {distancia_km:.2f} km (Límite: {ts.max_km} km)")
+        print(f"📏 Distancia: {distancia_m/1000:.2f} km (Límite: {ts.max_km} km)")
         
         if penalizaciones:
             print("🚨 Penalizaciones:")
             for desc, val in penalizaciones:
                 print(f" - {desc}: +{val:.2f}")
         
-        costo_ruta = distancia_km + sum(p[1] for p in penalizaciones)
+        costo_ruta = distancia_m + sum(p[1] for p in penalizaciones)
         print(f"💰 Costo total ruta: {costo_ruta:.2f}")
 
-        costo_total += distancia_km
+        costo_total += distancia_m
         penalizacion_total += sum(p[1] for p in penalizaciones)
 
     # Verificación de tachos no visitados
+    if duplicados:
+        print(f"\n🚨 Tachos repetidos: {duplicados}")
+        penalizacion_total += duplicados * PESOS["duplicado"]
+
     faltantes = todos_tachos - tachos_visitados
     if faltantes:
-        penal = len(faltantes) * 9999
+        penal = len(faltantes) * PESOS["faltante"]
         print(f"\n🚨 Tachos no visitados ({len(faltantes)}): {faltantes}")
         penalizacion_total += penal
 
     print("\n🔚 Resumen General:")
-    print(f"✅ Costo rutas: {costo_total:.2f} km")
+    print(f"✅ Costo rutas: {costo_total:.2f} m")
     print(f"🚫 Penalizaciones: {penalizacion_total:.2f}")
     print(f"💵 COSTO TOTAL: {costo_total + penalizacion_total:.2f}")
     print("=" * 60)
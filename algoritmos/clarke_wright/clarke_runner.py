@@ -1,24 +1,46 @@
 import time
 import numpy as np
 import json
-from utils import cargar_datos_extra, cargar_matriz, cargar_indices
-from clarke_wright import construir_rutas, optimizar_rutas_distribuidas
+from utils import cargar_grafo
+from clarke_wright import (construir_rutas, construir_rutas_paralelas,
+                           coordenadas_por_indice, optimizar_rutas_distribuidas,
+                           AUTONOMIA_KM, CAPACIDAD_CAMION, PESO_TACO)
+from algoritmos.busqueda_local.busqueda_local import mejorar_rutas
+from algoritmos.evaluador import Evaluador
+from instancias.instancia import Instancia
+from algoritmos.eventos import eventos_desde_argv
+from algoritmos.instrumentacion import instrumentacion_desde_argv
+
+MODOS = ["secuencial", "paralelo", "barrido"]
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 2:
-        print("Uso: python clarke_runner.py [este|oeste]")
+    eventos, argv = eventos_desde_argv(sys.argv[1:])
+    instrumentacion, argv = instrumentacion_desde_argv(argv)
+    mejorar = "--mejorar" in argv
+    argumentos = [a for a in argv if not a.startswith("--")]
+    if len(argumentos) not in (1, 2):
+        print("Uso: python clarke_runner.py [este|oeste] [secuencial|paralelo|barrido] [--mejorar] "
+              "[--eventos eventos.jsonl] [--nivel debug] [--perfil] [--reporte instrumentacion.json]")
         exit(1)
 
-    sector = sys.argv[1].lower()
+    sector = argumentos[0].lower()
     if sector not in ["este", "oeste"]:
         print("Sector inválido. Usa 'este' o 'oeste'.")
         exit(1)
 
-    # Cargar archivos
-    datos = cargar_datos_extra()
-    matriz = cargar_matriz()
-    nodo_a_indice, indice_a_nodo = cargar_indices()
+    modo = argumentos[1].lower() if len(argumentos) == 2 else "secuencial"
+    if modo not in MODOS:
+        print(f"Modo inválido. Usa uno de: {', '.join(MODOS)}.")
+        exit(1)
+
+    # Cargar la instancia (matriz memory-mapped e índices)
+    instancia = Instancia("data")
+    with instrumentacion.fase("carga"):
+        datos = instancia.datos
+    with instrumentacion.fase("matriz"):
+        matriz = instancia.matriz
+    nodo_a_indice, indice_a_nodo = instancia.nodo_a_indice, instancia.indice_a_nodo
 
     # Obtener nodos centro y vertedero con fallback
     centro_nodo = int(datos.get("centro", datos.get("nodo_centro")))
@@ -46,15 +68,43 @@ if __name__ == "__main__":
     print(f"  📦 Tachos con conexión válida al centro: {len(tachos_idx)}")
     print(f"  ⛽ Gasolineras: {len(gasolineras_idx)}")
     print(f"  🚛 Camiones: 3")
+    print(f"  🔀 Modo: {modo}{' + búsqueda local' if mejorar else ''}")
     print("============================================================")
 
+    coordenadas = None
+    if modo == "barrido":
+        grafo = cargar_grafo("data/grafo_paucarpata.graphml")
+        coordenadas = coordenadas_por_indice(grafo, indice_a_nodo, len(matriz))
+
     # Ejecutar algoritmo
     start = time.time()
-    rutas_brutas = construir_rutas(tachos_idx, centro_idx, matriz)
-    rutas_finales = optimizar_rutas_distribuidas(
-        rutas_brutas, matriz, indice_a_nodo,
-        centro_idx, vertedero_idx, gasolineras_idx
-    )
+    with instrumentacion.fase("construccion"):
+        if modo == "secuencial":
+            rutas_brutas = construir_rutas(tachos_idx, centro_idx, matriz, vertedero_idx, gasolineras_idx)
+        else:
+            rutas_brutas = construir_rutas_paralelas(tachos_idx, centro_idx, matriz, coordenadas=coordenadas,
+                                                     vertedero_idx=vertedero_idx,
+                                                     gasolineras_idx=gasolineras_idx)
+        rutas_finales = optimizar_rutas_distribuidas(
+            rutas_brutas, matriz, indice_a_nodo,
+            centro_idx, vertedero_idx, gasolineras_idx, eventos
+        )
+    if mejorar:
+        # Post-optimización local sobre las rutas por índices de todos los camiones
+        with instrumentacion.fase("mejora"):
+            evaluador = Evaluador(matriz, tachos_idx, vertedero_idx, gasolineras_idx,
+                                  capacidad=CAPACIDAD_CAMION, demanda=PESO_TACO,
+                                  autonomia=AUTONOMIA_KM * 1000)
+            mejoradas = mejorar_rutas(
+                [ruta["ruta_indices"] for ruta in rutas_finales], matriz, tachos_idx,
+                vertedero_idx, gasolineras_idx, capacidad=CAPACIDAD_CAMION,
+                demanda=PESO_TACO, autonomia=AUTONOMIA_KM * 1000, eventos=eventos,
+                instrumentacion=instrumentacion
+            )
+            for ruta, indices in zip(rutas_finales, mejoradas):
+                ruta["ruta_indices"] = indices
+                ruta["ruta"] = [indice_a_nodo[idx] for idx in indices]
+                ruta["distancia_total_km"] = round(evaluador.distancia(indices) / 1000, 2)
     end = time.time()
 
     print(f"\n🏁 RESULTADOS SECTOR {sector.upper()}")
@@ -88,7 +138,10 @@ if __name__ == "__main__":
         "algorithm": "Clarke & Wright"
     }
 
-    with open(f"algoritmos/clarke_wright/resultados_{sector}.json", "w", encoding="utf-8") as f:
-        json.dump(resultado_json, f, indent=2)
+    with instrumentacion.fase("salida"):
+        with open(f"algoritmos/clarke_wright/resultados_{sector}.json", "w", encoding="utf-8") as f:
+            json.dump(resultado_json, f, indent=2)
 
     print(f"\n💾 Resultados guardados en 'resultados_{sector}.json'")
+    eventos.cerrar()
+    instrumentacion.terminar()
@@ -1,35 +1,383 @@
+import heapq
+import math
+import os
+import sys
 import numpy as np
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from algoritmos.eventos import AVISO, consola
+from algoritmos.evaluador import Evaluador
+
 PESO_TACO = 300
 CAPACIDAD_CAMION = 5000
 AUTONOMIA_KM = 5
 CANT_CAMIONES = 3
 
+def calcular_ahorros_arrays(tachos, centro_idx, matriz, limite=None):
+    """
+    Calcula los ahorros s(i, j) = d(c, i) + d(c, j) - d(i, j) para todos los
+    pares i < j del triángulo superior en una sola operación de NumPy.
+
+    Devuelve tres arreglos (ahorros, ni, nj) ordenados de mayor a menor ahorro,
+    con el mismo orden que `sorted(..., reverse=True)` sobre las tuplas.
+    Si se indica `limite`, solo se ordenan los `limite` mayores (argpartition).
+    """
+    tachos = np.asarray(tachos, dtype=np.int64)
+    d0 = np.asarray(matriz[centro_idx])[tachos]
+    D = np.asarray(matriz)[np.ix_(tachos, tachos)]
+
+    iu, ju = np.triu_indices(len(tachos), k=1)
+    ahorros = d0[iu] + d0[ju] - D[iu, ju]
+    ni, nj = tachos[iu], tachos[ju]
+
+    if limite is not None and limite < len(ahorros):
+        seleccion = np.argpartition(-ahorros, limite - 1)[:limite]
+        ahorros, ni, nj = ahorros[seleccion], ni[seleccion], nj[seleccion]
+
+    orden = np.lexsort((nj, ni, ahorros))[::-1]
+    return ahorros[orden], ni[orden], nj[orden]
+
 def calcular_ahorros(tachos, centro_idx, matriz):
-    ahorros = []
-    for i in range(len(tachos)):
-        for j in range(i + 1, len(tachos)):
-            ni, nj = tachos[i], tachos[j]
-            ahorro = matriz[centro_idx][ni] + matriz[centro_idx][nj] - matriz[ni][nj]
-            ahorros.append((ahorro, ni, nj))
-    return sorted(ahorros, reverse=True)
-
-def construir_rutas(tachos, centro_idx, matriz):
-    rutas = []
-    tachos_usados = set()
-    ahorros = calcular_ahorros(tachos, centro_idx, matriz)
-
-    for ahorro, ni, nj in ahorros:
-        if ni in tachos_usados or nj in tachos_usados:
+    ahorros, ni, nj = calcular_ahorros_arrays(tachos, centro_idx, matriz)
+    return list(zip(ahorros.tolist(), ni.tolist(), nj.tolist()))
+
+def tabla_gasolineras(matriz, gasolineras_idx):
+    """
+    Para cada nodo devuelve (distancia a la gasolinera más cercana, índice de esa gasolinera).
+    """
+    gasolineras = np.asarray(gasolineras_idx, dtype=np.int64)
+    distancias = np.asarray(matriz)[:, gasolineras]
+    cercana = np.argmin(distancias, axis=1)
+    return distancias[np.arange(len(distancias)), cercana], gasolineras[cercana]
+
+def distancia_viaje(tachos_viaje, centro_idx, matriz, vertedero_idx=None, gasolineras=None):
+    """
+    Simula el recorrido centro → tachos saliendo con el tanque lleno y
+    recargando en la gasolinera más cercana cuando no alcanza para el
+    siguiente tramo más la ida a una gasolinera desde el destino (salvo con
+    el tanque lleno, como en `optimizar_rutas_distribuidas`).
+
+    Devuelve la distancia en metros (con desvíos a gasolineras y, si se
+    indica, el tramo final al vertedero) o inf si el recorrido de tachos no
+    es factible con AUTONOMIA_KM.
+    """
+    autonomia = AUTONOMIA_KM * 1000
+    combustible = autonomia
+    distancia = 0.0
+    origen = centro_idx
+
+    for destino in tachos_viaje:
+        tramo = matriz[origen][destino]
+        if not np.isfinite(tramo):
+            return np.inf
+
+        if gasolineras is None:
+            if tramo > combustible:
+                return np.inf
+        else:
+            dist_gas, gas_cercana = gasolineras
+            reserva = dist_gas[destino]
+            # Con el tanque lleno no se recarga (igual que al ejecutar las rutas)
+            if combustible < tramo + reserva and combustible < autonomia:
+                if dist_gas[origen] > combustible:
+                    return np.inf
+                distancia += dist_gas[origen]
+                combustible = autonomia
+                origen = gas_cercana[origen]
+                tramo = matriz[origen][destino]
+            if tramo > combustible:
+                return np.inf
+
+        combustible -= tramo
+        distancia += tramo
+        origen = destino
+
+    if vertedero_idx is not None:
+        distancia += matriz[origen][vertedero_idx]
+    return distancia
+
+def construir_rutas(tachos, centro_idx, matriz, vertedero_idx=None, gasolineras_idx=None):
+    """
+    Clarke & Wright secuencial: cada tacho empieza en su propio viaje y los
+    pares se recorren de mayor a menor ahorro, uniendo dos viajes cuando los
+    tachos del par son extremos de viajes distintos.
+
+    La unión solo se acepta si el viaje resultante respeta la capacidad
+    (CAPACIDAD_CAMION / PESO_TACO tachos) y es factible con AUTONOMIA_KM
+    (ver `distancia_viaje`).
+
+    Devuelve una lista de viajes [centro, tachos..., centro].
+    """
+    max_tachos = CAPACIDAD_CAMION // PESO_TACO
+    gasolineras = tabla_gasolineras(matriz, gasolineras_idx) if gasolineras_idx else None
+
+    # viaje_de[t] = id del viaje que contiene al tacho t
+    viajes = {t: [t] for t in tachos}
+    viaje_de = {t: t for t in tachos}
+
+    ahorros, ni_arr, nj_arr = calcular_ahorros_arrays(tachos, centro_idx, matriz)
+
+    for ahorro, ni, nj in zip(ahorros.tolist(), ni_arr.tolist(), nj_arr.tolist()):
+        if ahorro <= 0:
+            break
+
+        vi, vj = viaje_de[ni], viaje_de[nj]
+        if vi == vj:
+            continue
+
+        ruta_i, ruta_j = viajes[vi], viajes[vj]
+        if len(ruta_i) + len(ruta_j) > max_tachos:
             continue
-        rutas.append([centro_idx, ni, nj, centro_idx])
-        tachos_usados.update([ni, nj])
 
-    for t in tachos:
-        if t not in tachos_usados:
-            rutas.append([centro_idx, t, centro_idx])
+        # Solo se unen viajes por sus extremos
+        if ruta_i[-1] == ni and ruta_j[0] == nj:
+            nueva = ruta_i + ruta_j
+        elif ruta_j[-1] == nj and ruta_i[0] == ni:
+            nueva = ruta_j + ruta_i
+        elif ruta_i[-1] == ni and ruta_j[-1] == nj:
+            nueva = ruta_i + ruta_j[::-1]
+        elif ruta_i[0] == ni and ruta_j[0] == nj:
+            nueva = ruta_i[::-1] + ruta_j
+        else:
+            continue
+
+        if not np.isfinite(distancia_viaje(nueva, centro_idx, matriz, vertedero_idx, gasolineras)):
+            continue
+
+        viajes[vi] = nueva
+        del viajes[vj]
+        for t in ruta_j:
+            viaje_de[t] = vi
+
+    return [[centro_idx] + viaje + [centro_idx] for viaje in viajes.values()]
+
+def repartir_viajes(rutas_brutas, matriz, centro_idx, vertedero_idx=None, gasolineras_idx=None):
+    """
+    Reparte los viajes entre los camiones asignando cada viaje (del más largo
+    al más corto, y al final los infactibles) al camión con menos distancia
+    acumulada.
+    """
+    gasolineras = tabla_gasolineras(matriz, gasolineras_idx) if gasolineras_idx else None
+    costos = [
+        distancia_viaje(ruta[1:-1], centro_idx, matriz, vertedero_idx, gasolineras)
+        for ruta in rutas_brutas
+    ]
+    camiones = [[] for _ in range(CANT_CAMIONES)]
+    acumulado = [0.0] * CANT_CAMIONES
+
+    # Los viajes infactibles (p. ej. un tacho sin salida) van al final, para no dejar varado al camión
+    for k in sorted(range(len(rutas_brutas)), key=lambda k: (np.isfinite(costos[k]), costos[k]), reverse=True):
+        i = acumulado.index(min(acumulado))
+        camiones[i].append(rutas_brutas[k])
+        acumulado[i] += costos[k] if np.isfinite(costos[k]) else 0.0
+
+    return camiones
+
+# Lado de la ruta por el que se agrega un socio
+COLA, CABEZA = 0, 1
+
+class HeapAhorros:
+    """
+    Heap de ahorros que se llena de forma perezosa: solo los extremos de
+    ruta "activados" aportan entradas, y de cada uno se guarda un bloque de
+    sus `bloque` mejores socios aún libres. Cuando el bloque se agota se
+    calcula el siguiente a partir de la matriz.
 
-    return rutas
+    Cada extremo se activa por un lado, con su propia fila de ahorros
+    porque la matriz es asimétrica:
+    - COLA (socio j agregado después de t): M[t,c] + M[c,j] - M[t,j]
+    - CABEZA (socio j agregado antes de t): M[j,c] + M[c,t] - M[j,t]
+
+    La memoria es O(activos * bloque) en lugar de O(n²) de la lista completa.
+    """
+
+    def __init__(self, tachos, centro_idx, matriz, bloque=32):
+        self.tachos = np.asarray(tachos, dtype=np.int64)
+        self.matriz = matriz
+        self.ida = np.asarray(matriz[centro_idx])[self.tachos]
+        self.vuelta = np.asarray(matriz)[self.tachos, centro_idx]
+        self.bloque = bloque
+        self.libre = np.ones(len(self.tachos), dtype=bool)
+        self.pos = {int(t): k for k, t in enumerate(self.tachos)}
+        self.umbral = {}
+        self.heap = []
+
+    def ocupar(self, tacho):
+        self.libre[self.pos[tacho]] = False
+
+    def activar(self, tacho, lado):
+        """Agrega al heap el primer bloque de socios de `tacho` por `lado`."""
+        self.umbral[(tacho, lado)] = (np.inf, np.inf)
+        self._recargar(tacho, lado)
+
+    def _fila(self, tacho, lado):
+        k = self.pos[tacho]
+        if lado == COLA:
+            return self.vuelta[k] + self.ida - np.asarray(self.matriz[tacho])[self.tachos]
+        return self.vuelta + self.ida[k] - np.asarray(self.matriz)[self.tachos, tacho]
+
+    def _recargar(self, tacho, lado):
+        k = self.pos[tacho]
+        fila = self._fila(tacho, lado)
+        ahorro_max, j_max = self.umbral[(tacho, lado)]
+
+        # Solo socios libres, finitos y posteriores (en orden) al último bloque
+        candidatos = self.libre & np.isfinite(fila) & (
+            (fila < ahorro_max) | ((fila == ahorro_max) & (self.tachos < j_max))
+        )
+        candidatos[k] = False
+        idx = np.flatnonzero(candidatos)
+        if len(idx) == 0:
+            return
+        if len(idx) > self.bloque:
+            idx = idx[np.argpartition(-fila[idx], self.bloque - 1)[:self.bloque]]
+
+        for j in idx:
+            heapq.heappush(self.heap, (-fila[j], -int(self.tachos[j]), tacho, lado))
+
+        ultimo = min(idx, key=lambda j: (fila[j], self.tachos[j]))
+        self.umbral[(tacho, lado)] = (fila[ultimo], self.tachos[ultimo])
+        # Marca de fin de bloque: al salir se pide el siguiente bloque
+        heapq.heappush(self.heap, (-fila[ultimo], -int(self.tachos[ultimo]) + 0.5, tacho, lado))
+
+    def pop(self):
+        """Devuelve (ahorro, extremo, socio, lado) o None si el heap se vació."""
+        while self.heap:
+            ahorro, socio, extremo, lado = heapq.heappop(self.heap)
+            if socio != int(socio):
+                if (extremo, lado) in self.umbral:
+                    self._recargar(extremo, lado)
+                continue
+            return -ahorro, extremo, -int(socio), lado
+        return None
+
+    def desactivar(self, tacho, lado=None):
+        """Deja de pedir socios para `tacho` por `lado` (por ambos si es None)."""
+        for l in (COLA, CABEZA) if lado is None else (lado,):
+            self.umbral.pop((tacho, l), None)
+
+def semillas_lejanas(tachos, centro_idx, matriz, num_rutas):
+    """Semillas: el tacho más lejano al centro y luego los más alejados entre sí."""
+    tachos = list(tachos)
+    semillas = [max(tachos, key=lambda t: matriz[centro_idx][t])]
+    while len(semillas) < min(num_rutas, len(tachos)):
+        semillas.append(max(
+            (t for t in tachos if t not in semillas),
+            key=lambda t: min(matriz[s][t] + matriz[t][s] for s in semillas)
+        ))
+    return semillas
+
+def semillas_barrido(tachos, centro_idx, matriz, coordenadas, num_rutas):
+    """
+    Barrido geométrico: ordena los tachos por ángulo polar alrededor del
+    centro (coordenadas x/y del grafo), corta en `num_rutas` sectores con la
+    misma cantidad de tachos empezando por el mayor hueco angular, y toma
+    como semilla de cada sector su tacho más lejano al centro.
+    """
+    tachos = np.asarray(tachos, dtype=np.int64)
+    xc, yc = coordenadas[centro_idx]
+    angulos = np.arctan2(coordenadas[tachos, 1] - yc, coordenadas[tachos, 0] - xc)
+    orden = np.argsort(angulos)
+
+    huecos = np.diff(np.append(angulos[orden], angulos[orden[0]] + 2 * np.pi))
+    orden = np.roll(orden, -(int(np.argmax(huecos)) + 1))
+
+    semillas = []
+    for sector in np.array_split(tachos[orden], min(num_rutas, len(tachos))):
+        semillas.append(int(max(sector, key=lambda t: matriz[centro_idx][t])))
+    return semillas
+
+def coordenadas_por_indice(grafo, indice_a_nodo, n):
+    """Arreglo (n, 2) con las coordenadas x/y del grafo CSR para cada índice de la matriz."""
+    coordenadas = np.full((n, 2), np.nan)
+    for idx, nodo in indice_a_nodo.items():
+        if nodo in grafo.nodo_a_pos:
+            coordenadas[idx] = grafo.coordenadas(nodo)
+    return coordenadas
+
+def construir_rutas_paralelas(tachos, centro_idx, matriz, num_rutas=CANT_CAMIONES,
+                              coordenadas=None, bloque=32, vertedero_idx=None, gasolineras_idx=None):
+    """
+    Clarke & Wright paralelo: construye varias rutas a la vez. Cada ruta
+    parte de una semilla (barrido geométrico si se dan `coordenadas`, o
+    tachos lejanos si no) y en cada paso se toma del `HeapAhorros` el mayor
+    ahorro entre un extremo de ruta y un tacho libre. Como en
+    `construir_rutas`, la extensión solo se acepta si el viaje respeta la
+    capacidad y es factible según `distancia_viaje`.
+
+    Se abren `num_rutas` rutas (o las que pida la capacidad) con un tope
+    parejo de tachos; si se bloquean con tachos libres, se abre otra tanda
+    con semillas entre ellos. Solo son semilla los tachos con camino desde y
+    hacia el centro y hacia el vertedero; los que no lo tienen quedan cada
+    uno en su propio viaje.
+
+    Devuelve una lista de viajes [centro, tachos..., centro].
+    """
+    max_tachos = CAPACIDAD_CAMION // PESO_TACO
+    gasolineras = tabla_gasolineras(matriz, gasolineras_idx) if gasolineras_idx else None
+
+    def conectado(t):
+        return (np.isfinite(matriz[centro_idx][t]) and np.isfinite(matriz[t][centro_idx])
+                and (vertedero_idx is None or np.isfinite(matriz[t][vertedero_idx])))
+
+    tachos = [int(t) for t in tachos]
+    pendientes = [t for t in tachos if conectado(t)]
+    aislados = [t for t in tachos if not conectado(t)]
+
+    viajes = []
+    num = max(num_rutas, math.ceil(len(pendientes) / max_tachos))
+    while pendientes:
+        num = min(num, len(pendientes))
+        limite = min(math.ceil(len(pendientes) / num), max_tachos)
+        if coordenadas is not None:
+            semillas = semillas_barrido(pendientes, centro_idx, matriz, coordenadas, num)
+        else:
+            semillas = semillas_lejanas(pendientes, centro_idx, matriz, num)
+
+        heap = HeapAhorros(pendientes, centro_idx, matriz, bloque=bloque)
+        rutas = [[s] for s in semillas]
+        ruta_de = {}
+        for r, s in enumerate(semillas):
+            ruta_de[s] = r
+            heap.ocupar(s)
+        for s in semillas:
+            heap.activar(s, COLA)
+            heap.activar(s, CABEZA)
+
+        libres = len(pendientes) - len(semillas)
+        while libres:
+            entrada = heap.pop()
+            if entrada is None:
+                break
+            _, extremo, socio, lado = entrada
+            if socio in ruta_de or extremo not in ruta_de:
+                continue
+            r = ruta_de[extremo]
+            ruta = rutas[r]
+            if ruta[-1 if lado == COLA else 0] != extremo:
+                heap.desactivar(extremo, lado)
+                continue
+            if len(ruta) >= limite:
+                heap.desactivar(ruta[0])
+                heap.desactivar(ruta[-1])
+                continue
+
+            nueva = ruta + [socio] if lado == COLA else [socio] + ruta
+            if not np.isfinite(distancia_viaje(nueva, centro_idx, matriz, vertedero_idx, gasolineras)):
+                continue
+
+            rutas[r] = nueva
+            heap.desactivar(extremo, lado)
+            ruta_de[socio] = r
+            heap.ocupar(socio)
+            heap.activar(socio, lado)
+            libres -= 1
+
+        viajes += rutas
+        pendientes = [t for t in pendientes if t not in ruta_de]
+        num = math.ceil(len(pendientes) / max_tachos)
+
+    return [[centro_idx] + viaje + [centro_idx] for viaje in viajes + [[t] for t in aislados]]
 
 def distancia_km(metros):
     return metros / 1000
@@ -37,49 +385,71 @@ def distancia_km(metros):
 def buscar_gasolinera(origen, gasolineras, matriz):
     return min(gasolineras, key=lambda g: matriz[origen][g])
 
-def optimizar_rutas_distribuidas(rutas_brutas, matriz, indice_a_nodo, centro_idx, vertedero_idx, gasolineras_idx):
+def optimizar_rutas_distribuidas(rutas_brutas, matriz, indice_a_nodo, centro_idx, vertedero_idx, gasolineras_idx,
+                                 eventos=None):
+    """
+    Ejecuta los viajes de cada camión con el mismo modelo de combustible que
+    `distancia_viaje`: cada viaje empieza vacío y con el tanque lleno (tras
+    descargar en el vertedero se recarga en la gasolinera más cercana) y se
+    recarga antes de un tramo si no alcanza para él más la ida desde el
+    destino a su gasolinera más cercana.
+
+    La distancia informada de cada camión la calcula el `Evaluador` común
+    sobre la ruta ejecutada.
+    """
+    eventos = consola() if eventos is None else eventos
     rutas_finales = []
-    camiones = [[] for _ in range(CANT_CAMIONES)]
     tachos_recolectados_global = set()
+    dist_gas, gas_cercana = tabla_gasolineras(matriz, gasolineras_idx)
+    evaluador = Evaluador(matriz, [t for ruta in rutas_brutas for t in ruta[1:-1]], vertedero_idx,
+                          gasolineras_idx, CAPACIDAD_CAMION, PESO_TACO, AUTONOMIA_KM * 1000)
 
-    # Distribuir rutas en round robin
-    for i, ruta in enumerate(rutas_brutas):
-        camiones[i % CANT_CAMIONES].append(ruta)
+    # Distribuir viajes balanceando la distancia de cada camión
+    camiones = repartir_viajes(rutas_brutas, matriz, centro_idx, vertedero_idx, gasolineras_idx)
 
     for i, rutas_camion in enumerate(camiones):
         carga = 0
-        combustible = AUTONOMIA_KM
-        distancia_total = 0
+        # Combustible en metros, como la matriz
+        autonomia = AUTONOMIA_KM * 1000
+        combustible = autonomia
         ruta_real = []
         origen = centro_idx
 
-        for subruta in rutas_camion:
+        for k, subruta in enumerate(rutas_camion):
+            # Cada viaje empieza vacío: descargar en el vertedero el anterior
+            if k > 0 and carga > 0 and np.isfinite(matriz[origen][vertedero_idx]):
+                ruta_real.append(vertedero_idx)
+                combustible -= matriz[origen][vertedero_idx]
+                carga = 0
+                origen = vertedero_idx
+            # ...y salir con el tanque lleno, como supone la verificación de las uniones
+            if k > 0 and combustible < autonomia and np.isfinite(dist_gas[origen]):
+                combustible = autonomia
+                origen = int(gas_cercana[origen])
+                ruta_real.append(origen)
+
             for j in range(1, len(subruta) - 1):
                 destino = subruta[j]
 
                 if not np.isfinite(matriz[origen][destino]):
-                    print(f"⚠️ Camión {i+1} omitió salto inválido: {origen} → {destino} (distancia = inf)")
+                    eventos.emitir("cw_salto_invalido", AVISO, camion=i + 1, origen=origen, destino=destino)
                     continue
 
-                dist_km = distancia_km(matriz[origen][destino])
-
-                if dist_km > combustible:
-                    gas = buscar_gasolinera(origen, gasolineras_idx, matriz)
-                    distancia_total += distancia_km(matriz[origen][gas])
-                    ruta_real.append(gas)
-                    combustible = AUTONOMIA_KM
-                    origen = gas
-                    dist_km = distancia_km(matriz[origen][destino])
+                if (combustible < matriz[origen][destino] + dist_gas[destino] and combustible < autonomia
+                        and np.isfinite(dist_gas[origen])):
+                    combustible = autonomia
+                    origen = int(gas_cercana[origen])
+                    ruta_real.append(origen)
 
                 if carga + PESO_TACO > CAPACIDAD_CAMION:
-                    distancia_total += distancia_km(matriz[origen][vertedero_idx])
                     ruta_real.append(vertedero_idx)
-                    combustible -= distancia_km(matriz[origen][vertedero_idx])
+                    combustible -= matriz[origen][vertedero_idx]
                     carga = 0
                     origen = vertedero_idx
 
-                combustible -= dist_km
-                distancia_total += dist_km
+                # El tramo se mide desde donde quedó el camión (tras recargar o descargar)
+                dist = matriz[origen][destino]
+                combustible -= dist
                 ruta_real.append(destino)
                 carga += PESO_TACO
                 origen = destino
@@ -87,22 +457,21 @@ def optimizar_rutas_distribuidas(rutas_brutas, matriz, indice_a_nodo, centro_idx
 
         if ruta_real and ruta_real[-1] != vertedero_idx:
             if np.isfinite(matriz[origen][vertedero_idx]):
-                distancia_total += distancia_km(matriz[origen][vertedero_idx])
                 ruta_real.append(vertedero_idx)
                 origen = vertedero_idx
             else:
-                print(f"⚠️ Camión {i+1} no pudo ir al vertedero desde {origen} (sin conexión)")
+                eventos.emitir("cw_sin_vertedero", AVISO, camion=i + 1, origen=origen)
 
         if np.isfinite(matriz[origen][centro_idx]):
-            distancia_total += distancia_km(matriz[origen][centro_idx])
             ruta_real.append(centro_idx)
         else:
-            print(f"⚠️ Camión {i+1} no pudo regresar al centro desde {origen} (sin conexión)")
+            eventos.emitir("cw_sin_regreso", AVISO, camion=i + 1, origen=origen)
 
         rutas_finales.append({
             "camion": i + 1,
             "ruta": [indice_a_nodo[idx] for idx in [centro_idx] + ruta_real],
-            "distancia_total_km": round(distancia_total, 2),
+            "ruta_indices": [centro_idx] + ruta_real,
+            "distancia_total_km": round(distancia_km(evaluador.distancia([centro_idx] + ruta_real)), 2),
             "tachos_recolectados": list(tachos_recolectados_global)
         })
 
@@ -1,27 +1,32 @@
-import osmnx as ox
+import os
+import sys
 import matplotlib.pyplot as plt
-import networkx as nx
+from matplotlib.collections import LineCollection
 import json
 import time
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.grafo_csr import cargar_grafo_csr
+
 # Cargar grafo y datos
-G = ox.load_graphml("data/grafo_paucarpata.graphml")
+G = cargar_grafo_csr("data/grafo_paucarpata.graphml")
 with open("data/datos_extra.json", "r") as f:
     datos = json.load(f)
 
 # Función para dibujar puntos
 def dibujar_nodo(G, nodo, ax, color, size, label=None, marker='o'):
-    x, y = G.nodes[nodo]['x'], G.nodes[nodo]['y']
+    x, y = G.coordenadas(nodo)
     ax.scatter(x, y, s=size, c=color, zorder=10, label=label, marker=marker)
 
 # Función para trazar ruta entre nodos
 def trazar_ruta(G, ruta, ax, color):
     for i in range(len(ruta) - 1):
-        try:
-            path = nx.shortest_path(G, source=ruta[i], target=ruta[i+1], weight='length')
-            ox.plot_graph_route(G, path, route_color=color, route_linewidth=1.5, ax=ax, show=False, close=False, orig_dest_node_size=0)
-        except:
+        path = G.camino(ruta[i], ruta[i+1])
+        if path is None:
             print(f"⚠️ Ruta no trazable: {ruta[i]} → {ruta[i+1]}")
+            continue
+        xs, ys = zip(*[G.coordenadas(n) for n in path])
+        ax.plot(xs, ys, color=color, linewidth=1.5, alpha=0.7)
 
 # Colores para camiones
 colores = ['red', 'blue', 'green', 'orange', 'purple', 'brown']
@@ -30,14 +35,10 @@ def graficar_sector(nombre_archivo_resultado, nombre_salida_img, sector_nombre):
     with open(nombre_archivo_resultado, "r") as f:
         resultado = json.load(f)
 
-    fig, ax = ox.plot_graph(
-    G,
-    node_size=0,
-    edge_color='lightgray',
-    bgcolor='white',   # <-- esta línea fuerza fondo blanco
-    show=False,
-    close=False
-)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    ax.add_collection(LineCollection(G.segmentos(), colors='lightgray', linewidths=0.5))
+    ax.autoscale()
+    ax.set_facecolor('white')
 
 
     # Dibuja centro como cuadrado negro
@@ -1,13 +1,21 @@
 import json
 import networkx as nx
-import osmnx as ox
 import numpy as np
+import os
+import sys
 
-def cargar_matriz(path="data/matriz_distancias.npy"):
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.grafo_csr import cargar_grafo_csr
+from instancias.almacen_matriz import ALMACEN_PATH, cargar_almacen
+
+def cargar_matriz(path="data/matriz_distancias.npy", almacen_path=ALMACEN_PATH):
+    if almacen_path and os.path.exists(almacen_path):
+        matriz, _, _ = cargar_almacen(almacen_path)
+        return matriz
     return np.load(path)
 
 def cargar_grafo(path):
-    return ox.load_graphml(path)
+    return cargar_grafo_csr(path)
 
 def cargar_datos_extra(path="data/datos_extra.json"):
     with open(path, 'r', encoding='utf-8') as f:
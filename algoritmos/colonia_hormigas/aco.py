@@ -1,4 +1,11 @@
+import copy
 import random
+import numpy as np
+
+from entorno import EstadoTachos
+from algoritmos.eventos import DEBUG, INFO, AVISO, consola
+from algoritmos.evaluador import DEMANDA_KG, Evaluador
+from algoritmos.presupuesto import Presupuesto
 
 def necesita_abastecerse(camion, entorno):
     """
@@ -8,9 +15,7 @@ def necesita_abastecerse(camion, entorno):
     if not entorno.gasolineras:
         return False
     
-    distancia_gasolinera_mas_cercana = min(
-        entorno.distancia(camion.pos, g) for g in entorno.gasolineras
-    )
+    distancia_gasolinera_mas_cercana = entorno.distancia_gasolinera_cercana(camion.pos)
     
     margen_seguridad = 300
     
@@ -60,9 +65,7 @@ def puede_ir_a_tacho_con_seguridad(camion, entorno, tacho):
     if distancia_al_tacho >= camion.km_restantes:
         return False
     
-    distancia_tacho_a_gasolinera = min(
-        entorno.distancia(tacho, g) for g in entorno.gasolineras
-    )
+    distancia_tacho_a_gasolinera = entorno.distancia_gasolinera_cercana(tacho)
     
     margen_seguridad = 300
     combustible_requerido = distancia_al_tacho + distancia_tacho_a_gasolinera + margen_seguridad
@@ -94,6 +97,7 @@ def validar_movimiento_seguro(camion, entorno, destino):
     """
     Validación adicional antes de cualquier movimiento, incluyendo verificación de capacidad
     """
+    entorno.contadores["verificaciones"] += 1
     distancia = entorno.distancia(camion.pos, destino)
     tipo_destino = entorno.tipo_nodo(destino)
     
@@ -110,9 +114,7 @@ def validar_movimiento_seguro(camion, entorno, destino):
     combustible_despues = camion.km_restantes - distancia
     
     if entorno.gasolineras:
-        distancia_a_gasolinera_desde_destino = min(
-            entorno.distancia(destino, g) for g in entorno.gasolineras
-        )
+        distancia_a_gasolinera_desde_destino = entorno.distancia_gasolinera_cercana(destino)
         
         margen_seguridad = 200
         if combustible_despues < (distancia_a_gasolinera_desde_destino + margen_seguridad):
@@ -136,7 +138,7 @@ def seleccionar_siguiente(camion, entorno, feromonas, alpha, beta):
 
         tipo = entorno.tipo_nodo(nodo)
         if tipo == "tacho" and nodo not in camion.tachos_visitados:
-            tau = feromonas.get((camion.pos, nodo), 1.0)
+            tau = feromonas[camion.pos, nodo]
             eta = 1 / distancia
             valor = (tau ** alpha) * (eta ** beta)
             probabilidades.append((nodo, valor))
@@ -173,24 +175,33 @@ def asignar_zonas_equitativas(tachos_disponibles, num_camiones, entorno):
     
     return zonas
 
-def seleccionar_siguiente_colaborativo(camion, entorno, feromonas, tachos_visitados_sector, alpha, beta, zona_asignada=None, fase="personal"):
+def seleccionar_siguiente_colaborativo(camion, entorno, feromonas, tachos_visitados_sector, alpha, beta, zona_asignada=None, fase="personal", candidatos=None):
     """
     Selección colaborativa con fases:
     1. Fase personal: priorizan su zona asignada
     2. Fase colaborativa: ayudan con tachos de otras zonas
+
+    Si se pasa `candidatos` (tachos no visitados ya filtrados, p. ej. de la
+    lista de vecinos cercanos) solo se evalúan esos.
     """
-    opciones_disponibles = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
+    if candidatos is not None:
+        opciones_disponibles = candidatos
+    else:
+        opciones_disponibles = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
     
     if not opciones_disponibles:
         return None
     
-    if fase == "personal" and zona_asignada:
+    if candidatos is not None:
+        opciones = candidatos
+    elif fase == "personal" and zona_asignada:
         opciones = [t for t in opciones_disponibles if t in zona_asignada]
         if not opciones:
             opciones = opciones_disponibles
             fase = "colaborativa"
     else:
         opciones = opciones_disponibles
+    entorno.contadores["candidatos_evaluados"] += len(opciones)
     
     probabilidades = []
     total = 0
@@ -205,7 +216,7 @@ def seleccionar_siguiente_colaborativo(camion, entorno, feromonas, tachos_visita
         distancia_al_tacho = entorno.distancia(camion.pos, nodo)
         tipo = entorno.tipo_nodo(nodo)
         if tipo == "tacho" and nodo not in tachos_visitados_sector:
-            tau = feromonas.get((camion.pos, nodo), 1.0)
+            tau = feromonas[camion.pos, nodo]
             eta = 1 / distancia_al_tacho
             
             bonus_zona = 1.5 if (fase == "personal" and zona_asignada and nodo in zona_asignada) else 1.0
@@ -226,6 +237,93 @@ def seleccionar_siguiente_colaborativo(camion, entorno, feromonas, tachos_visita
     
     return probabilidades[-1][0]
 
+def actualizar_feromonas(feromonas, rutas, cantidad, rho, tau_min=None, tau_max=None):
+    """
+    Actualización de feromonas sobre la matriz n×n:
+    - Evaporación de todas las aristas en un solo paso (tau *= 1 - rho).
+    - Depósito de `cantidad` en cada arista recorrida por `rutas`.
+    - Si se indican `tau_min`/`tau_max` (MAX-MIN Ant System) los valores
+      se recortan a ese rango.
+    """
+    feromonas *= (1 - rho)
+    for ruta in rutas:
+        if len(ruta) > 1:
+            ruta = np.asarray(ruta)
+            np.add.at(feromonas, (ruta[:-1], ruta[1:]), cantidad)
+    if tau_min is not None or tau_max is not None:
+        np.clip(feromonas, tau_min, tau_max, out=feromonas)
+
+def calidad_solucion(recolectados, total, distancia_m):
+    """Depósito por unidad de q: fracción de tachos recolectados / distancia en km."""
+    return (recolectados / total) / max(distancia_m / 1000, 1e-9)
+
+def candidatos_cercanos(vecinos, pos, tachos_visitados_sector, zona=None):
+    """
+    Tachos de la lista de vecinos de `pos` (ver instancias/vecinos.py) que
+    aún no fueron visitados y, si se indica, pertenecen a `zona`.
+    """
+    return [t for t in vecinos[pos].tolist()
+            if t >= 0 and t not in tachos_visitados_sector and (zona is None or t in zona)]
+
+def seleccionar_siguiente_vectorizado(camion, entorno, tau_alpha, eta_beta, tachos_visitados_sector, zona_asignada=None, fase="personal", candidatos=None):
+    """
+    Versión NumPy de `seleccionar_siguiente_colaborativo` (mismas reglas):
+    - Máscaras de factibilidad sobre todos los candidatos a la vez
+      (capacidad, alcance, combustible para llegar luego a una gasolinera).
+    - Atractivo tau**alpha * eta**beta leído de matrices precalculadas.
+    - Muestreo con cumsum + searchsorted.
+
+    `zona_asignada` es una máscara booleana de largo n (o None). Si se pasa
+    `candidatos` (tachos no visitados ya filtrados) solo se evalúan esos.
+    """
+    if candidatos is not None:
+        candidatos = np.asarray(candidatos, dtype=np.int64)
+    else:
+        candidatos = entorno.tachos_array
+    if candidatos is entorno.tachos_array and tachos_visitados_sector:
+        if isinstance(tachos_visitados_sector, EstadoTachos):
+            visitado = tachos_visitados_sector.mascara
+        else:
+            visitado = np.zeros(len(entorno.distancias), dtype=bool)
+            visitado[list(tachos_visitados_sector)] = True
+        candidatos = candidatos[~visitado[candidatos]]
+
+    if len(candidatos) == 0:
+        return None
+
+    bonus_zona = 1.0
+    if fase == "personal" and zona_asignada is not None:
+        en_zona = candidatos[zona_asignada[candidatos]]
+        if len(en_zona):
+            candidatos = en_zona
+            bonus_zona = 1.5
+
+    if not entorno.gasolineras or camion.kg_basura + 300 > camion.kg_max:
+        return None
+
+    pos = camion.pos
+    km = camion.km_restantes
+    contadores = entorno.contadores
+    contadores["candidatos_evaluados"] += len(candidatos)
+    contadores["consultas_distancia"] += len(candidatos)
+    contadores["verificaciones"] += len(candidatos)
+    distancias = entorno.distancias[pos, candidatos]
+    hacia_gasolinera = entorno.dist_gasolinera_cercana[candidatos]
+    factible = (
+        (distancias < km)
+        & (km >= distancias + hacia_gasolinera + 300)
+        & (km - distancias >= hacia_gasolinera + 200)
+    )
+    candidatos = candidatos[factible]
+    if len(candidatos) == 0:
+        return None
+
+    valores = tau_alpha[pos, candidatos] * eta_beta[pos, candidatos] * bonus_zona
+    acumulado = np.cumsum(valores)
+    r = random.uniform(0, acumulado[-1])
+    k = int(np.searchsorted(acumulado, r, side="left"))
+    return int(candidatos[min(k, len(candidatos) - 1)])
+
 def intentar_alcanzar_tachos_dificiles(camion, entorno, tachos_pendientes):
     """
     Estrategia especial para intentar alcanzar tachos que parecen difíciles.
@@ -235,21 +333,17 @@ def intentar_alcanzar_tachos_dificiles(camion, entorno, tachos_pendientes):
         return None
     
     mejores_opciones = []
+    distancias_a_gasolineras = {g: entorno.distancia(camion.pos, g) for g in entorno.gasolineras}
     
     for tacho in tachos_pendientes:
         mejor_gasolinera = None
         menor_distancia_total = float('inf')
+        dist_tacho_a_gasolinera = entorno.distancia_gasolinera_cercana(tacho)
         
         for gasolinera in entorno.gasolineras:
-            dist_a_gasolinera = entorno.distancia(camion.pos, gasolinera)
+            dist_a_gasolinera = distancias_a_gasolineras[gasolinera]
             dist_gasolinera_a_tacho = entorno.distancia(gasolinera, tacho)
             
-            gasolinera_desde_tacho = min(
-                entorno.gasolineras,
-                key=lambda g: entorno.distancia(tacho, g)
-            )
-            dist_tacho_a_gasolinera = entorno.distancia(tacho, gasolinera_desde_tacho)
-            
             distancia_total = dist_a_gasolinera + dist_gasolinera_a_tacho + dist_tacho_a_gasolinera
             
             combustible_necesario = dist_gasolinera_a_tacho + dist_tacho_a_gasolinera + 300
@@ -278,18 +372,92 @@ def ejecutar_aco(
         iteraciones=10,
         alpha=1.0,
         beta=2.0,
-        rho=0.1):
+        rho=0.1,
+        selector="clasico",
+        q=1.0,
+        tau_min=None,
+        tau_max=None,
+        vecinos=None,
+        eventos=None,
+        presupuesto=None):
+    """
+    `feromonas` es una matriz NumPy n×n (se modifica en el lugar).
+
+    `selector` elige la regla de transición: "clasico" (bucle en Python
+    por candidato) o "vectorizado" (`seleccionar_siguiente_vectorizado`),
+    para poder comparar resultados.
+
+    Al final de cada iteración se evaporan todas las aristas y se deposita
+    q * cobertura / distancia_km en las aristas de la solución, de modo que
+    las soluciones más cortas y completas refuerzan más. Con `tau_min` o
+    `tau_max` se usa el esquema MAX-MIN: deposita solo la mejor solución
+    encontrada hasta el momento y las feromonas quedan acotadas.
+
+    Con `vecinos=k` cada paso evalúa solo los k tachos no visitados más
+    cercanos a la posición del camión (lista de candidatos) y recurre a
+    todos los tachos cuando ninguno de ellos es factible.
+
+    El progreso se informa con `eventos` (algoritmos/eventos.py): un evento
+    por iteración y por movimiento (nivel DEBUG) y los de la fase final.
+    Por defecto se muestran por consola desde INFO; con `SIN_EVENTOS` no
+    se arma ningún mensaje.
+
+    Sin `presupuesto` se hacen hasta `iteraciones` iteraciones y se para en
+    la primera que recolecta todos los tachos. Con un `Presupuesto`
+    (algoritmos/presupuesto.py) se itera mientras quede tiempo/evaluaciones
+    y no haya estancamiento; cada iteración cuenta como una evaluación con
+    el costo del evaluador común (`Evaluacion.costo`: distancia más
+    penalizaciones por faltantes, carga, combustible). En ambos casos
+    la fase final parte de la mejor iteración, no de la última.
+    """
+    if selector not in ("clasico", "vectorizado"):
+        raise ValueError(f"Selector desconocido: {selector}")
+    n = len(entorno.distancias)
+    eta_beta = entorno.eta_beta(beta) if selector == "vectorizado" else None
+    lista_vecinos = entorno.lista_candidatos(vecinos) if vecinos else None
     
     # Guardar estado inicial de los camiones
     centro_inicial = camiones[0].pos
     km_max = camiones[0].km_max
     kg_max = camiones[0].kg_max
+    evaluador = Evaluador(entorno.matriz, entorno.tachos, entorno.vertedero, entorno.gasolineras,
+                          capacidad=kg_max, demanda=DEMANDA_KG, autonomia=km_max)
     
     # Crear zonas equitativas iniciales
     tachos_totales = list(entorno.tachos)
     zonas_iniciales = asignar_zonas_equitativas(tachos_totales, len(camiones), entorno)
+    # Las zonas no cambian entre iteraciones: conjunto y máscara por camión se arman una vez
+    zonas = [set(zonas_iniciales[i]) for i in range(len(camiones))]
+    mascaras_zona = [None] * len(camiones)
+    for i, zona in enumerate(zonas):
+        if zona:
+            mascaras_zona[i] = np.zeros(n, dtype=bool)
+            mascaras_zona[i][list(zona)] = True
+
+    mmas = tau_min is not None or tau_max is not None
+    mejor_calidad = 0.0
+    mejores_rutas = []
+
+    eventos = consola() if eventos is None else eventos
+    detallar = eventos.escucha(DEBUG)
+
+    detener_al_completar = presupuesto is None
+    informar_presupuesto = presupuesto is not None
+    if presupuesto is None:
+        presupuesto = Presupuesto(max_iteraciones=iteraciones)
+    mejor_estado = None
+
+    def mover(camion, destino, tipo_nodo, descripcion=""):
+        if not mover_camion_seguro(camion, entorno, destino, tipo_nodo, descripcion):
+            return False
+        entorno.contadores["movimientos_aceptados"] += 1
+        if detallar:
+            eventos.emitir("aco_movimiento", DEBUG, camion=camiones.index(camion) + 1,
+                           destino=destino, tipo_nodo=tipo_nodo, motivo=descripcion,
+                           km_restantes=camion.km_restantes, kg=camion.kg_basura)
+        return True
     
-    for it in range(iteraciones):
+    while presupuesto.continuar():
         for camion in camiones:
             camion.pos = centro_inicial
             camion.km_restantes = km_max
@@ -297,10 +465,39 @@ def ejecutar_aco(
             camion.ruta = [centro_inicial]
             camion.tachos_visitados = set()
         
-        tachos_visitados_sector = set()
+        # Tachos recolectados/pendientes de la iteración (global y por zona)
+        tachos_visitados_sector = EstadoTachos(
+            entorno.tachos, n, [zonas_iniciales[i] for i in range(len(camiones))]
+        )
+
+        # Las feromonas solo cambian al final de la iteración
+        if selector == "vectorizado":
+            tau_alpha = feromonas ** alpha
+
+        def seleccionar(camion, i, fase, candidatos=None):
+            # `i`: camión cuya zona se usa (None en la fase colaborativa)
+            if selector == "vectorizado":
+                return seleccionar_siguiente_vectorizado(
+                    camion, entorno, tau_alpha, eta_beta, tachos_visitados_sector,
+                    None if i is None else mascaras_zona[i], fase, candidatos
+                )
+            return seleccionar_siguiente_colaborativo(
+                camion, entorno, feromonas, tachos_visitados_sector,
+                alpha, beta, None if i is None else zonas[i], fase, candidatos
+            )
+
+        def siguiente(camion, i, fase):
+            # Primero los k tachos más cercanos; si ninguno sirve, todos
+            if lista_vecinos is not None:
+                zona = zonas[i] if fase == "personal" and i is not None else None
+                cercanos = candidatos_cercanos(lista_vecinos, camion.pos, tachos_visitados_sector, zona)
+                if cercanos:
+                    destino = seleccionar(camion, i, fase, cercanos)
+                    if destino is not None:
+                        return destino
+            return seleccionar(camion, i, fase)
 
         for i, camion in enumerate(camiones):
-            zona_asignada = set(zonas_iniciales[i])
             pasos = 0
             
             while True:
@@ -308,44 +505,35 @@ def ejecutar_aco(
                 if pasos > 200:
                     break
                 
-                tachos_disponibles = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
-                tachos_zona_disponibles = [t for t in tachos_disponibles if t in zona_asignada]
-                
-                if not tachos_zona_disponibles:
+                if not tachos_visitados_sector.quedan_en_zona(i):
                     break
 
                 if necesita_abastecerse(camion, entorno):
-                    gasolinera_cercana = min(
-                        entorno.gasolineras,
-                        key=lambda g: entorno.distancia(camion.pos, g)
-                    )
-                    if not mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "COMBUSTIBLE CRÍTICO"):
+                    gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
+                    if not mover(camion, gasolinera_cercana, "gasolinera", "COMBUSTIBLE CRÍTICO"):
                         break
                     continue
 
-                tachos_zona_disponibles_check = [t for t in entorno.obtener_tachos_disponibles(tachos_visitados_sector) if t in zona_asignada]
-                if tachos_zona_disponibles_check:
+                if tachos_visitados_sector.quedan_en_zona(i):
                     if debe_ir_a_vertedero_antes(camion):
-                        if not mover_camion_seguro(camion, entorno, entorno.vertedero, "vertedero", "CONDICIÓN 4: Vertedero antes de exceder capacidad"):
+                        if not mover(camion, entorno.vertedero, "vertedero", "CONDICIÓN 4: Vertedero antes de exceder capacidad"):
                             break
                         continue
 
-                destino = seleccionar_siguiente_colaborativo(
-                    camion, entorno, feromonas, tachos_visitados_sector, 
-                    alpha, beta, zona_asignada, "personal"
-                )
+                destino = siguiente(camion, i, "personal")
                 
                 if destino is None:
                     break
                 
                 tipo = entorno.tipo_nodo(destino)
-                if not mover_camion_seguro(camion, entorno, destino, tipo, f"{tipo.upper()} {str(destino)[:6]}"):
+                if not mover(camion, destino, tipo, "SIGUIENTE"):
                     continue
                 
                 if tipo == "tacho":
-                    tachos_visitados_sector.add(destino)
+                    tachos_visitados_sector.recolectar(destino)
 
-        tachos_restantes = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
+        # Lista viva: se achica a medida que se recolectan tachos
+        tachos_restantes = tachos_visitados_sector.disponibles
         pasada_colaborativa = 1
         max_pasadas = 3
         
@@ -360,31 +548,23 @@ def ejecutar_aco(
                 
                 while tachos_restantes and pasos_colaboracion < 150:
                     pasos_colaboracion += 1
-                    tachos_restantes = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
                     
                     if not tachos_restantes:
                         break
                     
                     if necesita_abastecerse(camion, entorno):
-                        gasolinera_cercana = min(
-                            entorno.gasolineras,
-                            key=lambda g: entorno.distancia(camion.pos, g)
-                        )
-                        if not mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "COMBUSTIBLE CRÍTICO"):
+                        gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
+                        if not mover(camion, gasolinera_cercana, "gasolinera", "COMBUSTIBLE CRÍTICO"):
                             break
                         continue
 
-                    tachos_restantes_check = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
-                    if tachos_restantes_check:
+                    if tachos_restantes:
                         if debe_ir_a_vertedero_antes(camion):
-                            if not mover_camion_seguro(camion, entorno, entorno.vertedero, "vertedero", "CONDICIÓN 4: Vertedero antes de exceder capacidad"):
+                            if not mover(camion, entorno.vertedero, "vertedero", "CONDICIÓN 4: Vertedero antes de exceder capacidad"):
                                 break
                             continue
 
-                    destino = seleccionar_siguiente_colaborativo(
-                        camion, entorno, feromonas, tachos_visitados_sector, 
-                        alpha, beta, None, "colaborativa"
-                    )
+                    destino = siguiente(camion, None, "colaborativa")
                     
                     if destino is None:
                         destino = intentar_alcanzar_tachos_dificiles(camion, entorno, tachos_restantes)
@@ -393,11 +573,11 @@ def ejecutar_aco(
                         break
                     
                     tipo = entorno.tipo_nodo(destino)
-                    if not mover_camion_seguro(camion, entorno, destino, tipo, f"{tipo.upper()} {str(destino)[:6]}"):
+                    if not mover(camion, destino, tipo, "SIGUIENTE"):
                         continue
                     
                     if tipo == "tacho":
-                        tachos_visitados_sector.add(destino)
+                        tachos_visitados_sector.recolectar(destino)
 
             progreso_final = len(tachos_visitados_sector)
             if progreso_final == progreso_inicial:
@@ -406,37 +586,51 @@ def ejecutar_aco(
                         camion.kg_basura = 0
             
             pasada_colaborativa += 1
-            tachos_restantes = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
 
         # Verificar si se debe terminar la iteración
         total_tachos_recolectados = len(tachos_visitados_sector)
         eficiencia = (total_tachos_recolectados / len(entorno.tachos)) * 100
-        tachos_faltantes = len(entorno.tachos) - total_tachos_recolectados
         
         # Actualizar feromonas antes de verificar eficiencia
-        for camion in camiones:
-            for j in range(len(camion.ruta) - 1):
-                origen, destino = camion.ruta[j], camion.ruta[j + 1]
-                if (origen, destino) not in feromonas:
-                    feromonas[(origen, destino)] = 1.0
-                feromonas[(origen, destino)] *= (1 - rho)
-                if entorno.tipo_nodo(destino) == "tacho":
-                    feromonas[(origen, destino)] += 1.0
+        rutas = [camion.ruta for camion in camiones]
+        evaluacion = evaluador.evaluar(rutas)
+        calidad = calidad_solucion(total_tachos_recolectados, len(entorno.tachos), evaluacion.distancia)
+        if mmas:
+            if calidad > mejor_calidad:
+                mejor_calidad = calidad
+                mejores_rutas = [list(ruta) for ruta in rutas]
+            actualizar_feromonas(feromonas, mejores_rutas, q * mejor_calidad, rho,
+                                 tau_min, tau_max)
+        else:
+            actualizar_feromonas(feromonas, rutas, q * calidad, rho)
+
+        # Mejor iteración hasta ahora: rutas para el presupuesto y estado completo para la fase final
+        presupuesto.contar()
+        if presupuesto.registrar(evaluacion.costo, [list(ruta) for ruta in rutas]):
+            mejor_estado = copy.deepcopy((camiones, tachos_visitados_sector))
+
+        if detallar:
+            eventos.emitir("aco_iteracion", DEBUG, iteracion=presupuesto.iteraciones,
+                           recolectados=total_tachos_recolectados, total=len(entorno.tachos),
+                           distancia_m=evaluacion.distancia, calidad=calidad)
         
-        # Ser más persistente si quedan pocos tachos (menos de 10)
-        if eficiencia >= 100:
+        if eficiencia >= 100 and detener_al_completar:
+            presupuesto.detener("cobertura completa")
             break
-        elif tachos_faltantes <= 10 and it < iteraciones - 20:
-            # Si quedan pocos tachos, no terminar hasta intentar al menos 20 iteraciones más
-            continue
-        elif eficiencia >= 95 and it < iteraciones - 10:
-            # Si tenemos 95% o más, intentar al menos 10 iteraciones más
-            continue
+
+    if informar_presupuesto:
+        eventos.emitir("fin_presupuesto", INFO, solver="aco", **presupuesto.resumen())
+
+    # Continuar desde la mejor iteración (copia: el presupuesto conserva sus rutas)
+    if mejor_estado is not None:
+        mejores_camiones, tachos_visitados_sector = copy.deepcopy(mejor_estado)
+        for camion, mejor in zip(camiones, mejores_camiones):
+            camion.__dict__.update(mejor.__dict__)
 
     # FASE FINAL DE RECUPERACIÓN DE TACHOS FALTANTES
-    tachos_finales_faltantes = entorno.obtener_tachos_disponibles(tachos_visitados_sector)
+    tachos_finales_faltantes = tachos_visitados_sector.disponibles
     if tachos_finales_faltantes:
-        print(f"🎯 FASE FINAL: Intentando recuperar {len(tachos_finales_faltantes)} tachos faltantes...")
+        eventos.emitir("aco_fase_final", INFO, faltantes=len(tachos_finales_faltantes))
         
         for camion in camiones:
             if not tachos_finales_faltantes:
@@ -444,15 +638,15 @@ def ejecutar_aco(
                 
             # Vaciar camión si tiene carga para maximizar capacidad
             if camion.kg_basura > 0:
-                mover_camion_seguro(camion, entorno, entorno.vertedero, "vertedero", "Vaciar para fase final")
+                mover(camion, entorno.vertedero, "vertedero", "Vaciar para fase final")
             
             # Ir al centro para comenzar fase final
             if camion.pos != entorno.centro:
-                mover_camion_seguro(camion, entorno, entorno.centro, "centro", "Ir al centro para fase final")
+                mover(camion, entorno.centro, "centro", "Ir al centro para fase final")
             
             # Recargar combustible
-            gasolinera_cercana = min(entorno.gasolineras, key=lambda g: entorno.distancia(camion.pos, g))
-            mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "Recargar para fase final")
+            gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
+            mover(camion, gasolinera_cercana, "gasolinera", "Recargar para fase final")
             
             # Intentar alcanzar tachos faltantes uno por uno
             intentos_tacho = 0
@@ -461,22 +655,20 @@ def ejecutar_aco(
                 tacho_objetivo = min(tachos_finales_faltantes, 
                                    key=lambda t: entorno.distancia(camion.pos, t))
                 
-                if mover_camion_seguro(camion, entorno, tacho_objetivo, "tacho", f"FASE FINAL: Tacho {str(tacho_objetivo)[:6]}"):
-                    tachos_finales_faltantes.remove(tacho_objetivo)
-                    tachos_visitados_sector.add(tacho_objetivo)
-                    print(f"  ✅ Tacho {str(tacho_objetivo)[:6]} recuperado en fase final")
+                if mover(camion, tacho_objetivo, "tacho", "FASE FINAL"):
+                    tachos_visitados_sector.recolectar(tacho_objetivo)
+                    eventos.emitir("aco_tacho_recuperado", INFO, tacho=tacho_objetivo)
                 else:
                     # Si no puede llegar, recargar e intentar
                     if necesita_abastecerse(camion, entorno):
-                        gasolinera_cercana = min(entorno.gasolineras, 
-                                               key=lambda g: entorno.distancia(camion.pos, g))
-                        if mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "Recargar para continuar fase final"):
+                        gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
+                        if mover(camion, gasolinera_cercana, "gasolinera", "Recargar para continuar fase final"):
                             continue
                     break
 
     # VACIADO FINAL OBLIGATORIO - FUERA DEL BUCLE DE ITERACIONES
     # Este paso se ejecuta SIEMPRE al final, sin importar cómo terminó el algoritmo
-    print("🔄 Ejecutando vaciado final obligatorio...")
+    eventos.emitir("aco_vaciado_final", INFO)
     for i, camion in enumerate(camiones):
         # IMPORTANTE: Si el camión visitó tachos, DEBE ir al vertedero
         # incluso si ya vació su carga durante las operaciones
@@ -484,81 +676,69 @@ def ejecutar_aco(
         tiene_carga = camion.kg_basura > 0
         
         if tiene_carga or visito_tachos:
-            if tiene_carga:
-                print(f"  🚛 Camión {i+1}: Vaciando {camion.kg_basura}kg en vertedero")
-            else:
-                print(f"  🚛 Camión {i+1}: Visitó {len(camion.tachos_visitados)} tachos, verificando descarga en vertedero")
-            
+            kg = camion.kg_basura
             # Verificar si puede llegar al vertedero
-            distancia_vertedero = entorno.distancia(camion.pos, entorno.vertedero)
+            distancia_vertedero = entorno.distancia_vertedero(camion.pos)
             
             if camion.km_restantes >= distancia_vertedero:
                 # Puede llegar directamente
-                if not mover_camion_seguro(camion, entorno, entorno.vertedero, "vertedero", "FINAL OBLIGATORIO: Verificar/Vaciar carga"):
-                    print(f"  ⚠️ Error inesperado al mover camión {i+1} al vertedero, forzando vaciado")
+                if not mover(camion, entorno.vertedero, "vertedero", "FINAL OBLIGATORIO: Verificar/Vaciar carga"):
+                    eventos.emitir("aco_vaciado", AVISO, camion=i + 1, kg=kg, estado="error, vaciado forzado")
                     # IMPORTANTE: Agregar vertedero a la ruta incluso si hay error
                     if entorno.vertedero not in camion.ruta:
                         camion.ruta.append(entorno.vertedero)
                     camion.kg_basura = 0
                 else:
-                    print(f"  ✅ Camión {i+1}: Verificación/vaciado completado exitosamente")
+                    eventos.emitir("aco_vaciado", INFO, camion=i + 1, kg=kg, estado="completado")
             else:
                 # Necesita ir a gasolinera primero
-                print(f"  ⛽ Camión {i+1}: Necesita combustible, yendo a gasolinera primero")
-                gasolinera_cercana = min(
-                    entorno.gasolineras,
-                    key=lambda g: entorno.distancia(camion.pos, g)
-                )
+                gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
                 
-                if mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "Recargar para ir al vertedero"):
+                if mover(camion, gasolinera_cercana, "gasolinera", "Recargar para ir al vertedero"):
                     # Ahora intentar ir al vertedero
-                    if not mover_camion_seguro(camion, entorno, entorno.vertedero, "vertedero", "FINAL OBLIGATORIO: Verificar/Vaciar carga"):
-                        print(f"  ⚠️ Error al llegar al vertedero después de recargar, forzando vaciado")
+                    if not mover(camion, entorno.vertedero, "vertedero", "FINAL OBLIGATORIO: Verificar/Vaciar carga"):
+                        eventos.emitir("aco_vaciado", AVISO, camion=i + 1, kg=kg,
+                                       estado="error tras recargar, vaciado forzado")
                         # IMPORTANTE: Agregar vertedero a la ruta incluso si hay error
                         if entorno.vertedero not in camion.ruta:
                             camion.ruta.append(entorno.vertedero)
                         camion.kg_basura = 0
                     else:
-                        print(f"  ✅ Camión {i+1}: Verificación/vaciado completado después de recargar")
+                        eventos.emitir("aco_vaciado", INFO, camion=i + 1, kg=kg, estado="completado tras recargar")
                 else:
-                    print(f"  ⚠️ Camión {i+1}: No puede llegar ni a gasolinera, forzando vaciado")
+                    eventos.emitir("aco_vaciado", AVISO, camion=i + 1, kg=kg,
+                                   estado="sin combustible ni gasolinera, vaciado forzado")
                     # IMPORTANTE: Agregar vertedero a la ruta incluso si hay error
                     if entorno.vertedero not in camion.ruta:
                         camion.ruta.append(entorno.vertedero)
                     camion.kg_basura = 0
         else:
-            print(f"  ✅ Camión {i+1}: No visitó tachos, no necesita ir al vertedero")
+            eventos.emitir("aco_vaciado", INFO, camion=i + 1, kg=0, estado="sin tachos, no hace falta")
     
     # REGRESO FINAL AL CENTRO (OPCIONAL - para completar el ciclo)
-    print("🏠 Regresando todos los camiones al centro...")
+    eventos.emitir("aco_regreso_final", INFO)
     for i, camion in enumerate(camiones):
         if camion.pos != entorno.centro:
-            print(f"  🚛 Camión {i+1}: Regresando al centro")
-            
             # Verificar si puede llegar al centro
             distancia_centro = entorno.distancia(camion.pos, entorno.centro)
             
             if camion.km_restantes >= distancia_centro:
-                if not mover_camion_seguro(camion, entorno, entorno.centro, "centro", "REGRESO FINAL: Volver al centro"):
-                    print(f"  ⚠️ Error inesperado al regresar camión {i+1} al centro")
+                if not mover(camion, entorno.centro, "centro", "REGRESO FINAL: Volver al centro"):
+                    eventos.emitir("aco_regreso", AVISO, camion=i + 1, estado="error inesperado")
                 else:
-                    print(f"  ✅ Camión {i+1}: De vuelta en el centro")
+                    eventos.emitir("aco_regreso", INFO, camion=i + 1, estado="de vuelta")
             else:
                 # Intentar ir a gasolinera primero
-                print(f"  ⛽ Camión {i+1}: Necesita combustible para regresar")
-                gasolinera_cercana = min(
-                    entorno.gasolineras,
-                    key=lambda g: entorno.distancia(camion.pos, g)
-                )
+                gasolinera_cercana = entorno.gasolinera_mas_cercana(camion.pos)
                 
-                if mover_camion_seguro(camion, entorno, gasolinera_cercana, "gasolinera", "Recargar para regresar"):
-                    if not mover_camion_seguro(camion, entorno, entorno.centro, "centro", "REGRESO FINAL: Volver al centro"):
-                        print(f"  ⚠️ Error al regresar después de recargar")
+                if mover(camion, gasolinera_cercana, "gasolinera", "Recargar para regresar"):
+                    if not mover(camion, entorno.centro, "centro", "REGRESO FINAL: Volver al centro"):
+                        eventos.emitir("aco_regreso", AVISO, camion=i + 1, estado="error tras recargar")
                     else:
-                        print(f"  ✅ Camión {i+1}: De vuelta en el centro después de recargar")
+                        eventos.emitir("aco_regreso", INFO, camion=i + 1, estado="de vuelta tras recargar")
                 else:
-                    print(f"  ⚠️ Camión {i+1}: No puede regresar por combustible insuficiente")
+                    eventos.emitir("aco_regreso", AVISO, camion=i + 1, estado="combustible insuficiente")
         else:
-            print(f"  ✅ Camión {i+1}: Ya está en el centro")
+            eventos.emitir("aco_regreso", INFO, camion=i + 1, estado="ya estaba en el centro")
 
     return camiones
\ No newline at end of file
@@ -0,0 +1,180 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.vecinos import vecinos_cercanos
+
+
+class EntornoACOOptimized:
+    def __init__(self, matriz, centro, vertedero, tachos, gasolineras, nodo_a_indice, indice_a_nodo):
+        self.matriz = matriz
+        self.centro = centro
+        self.vertedero = vertedero
+        self.tachos = set(tachos)
+        self.gasolineras = set(gasolineras)
+        self.nodo_a_indice = nodo_a_indice
+        self.indice_a_nodo = indice_a_nodo
+        # Contadores para la instrumentación (algoritmos/instrumentacion.py)
+        self.contadores = {"consultas_distancia": 0, "verificaciones": 0,
+                           "candidatos_evaluados": 0, "movimientos_aceptados": 0}
+        self._precalcular_tablas()
+
+    def _precalcular_tablas(self):
+        """
+        Calcula una sola vez, para cada nodo de la matriz, la distancia a la
+        gasolinera más cercana, cuál es esa gasolinera y la distancia al
+        vertedero. Usa el mismo criterio que `distancia` (0 fuera de la
+        diagonal = sin camino).
+        """
+        n = len(self.matriz)
+        filas = np.arange(n)[:, None]
+
+        if self.gasolineras:
+            gasolineras = np.array(sorted(self.gasolineras))
+            hacia_gas = np.array(self.matriz[:, gasolineras], dtype=float)
+            hacia_gas[(hacia_gas == 0) & (filas != gasolineras[None, :])] = np.inf
+            cercana = np.argmin(hacia_gas, axis=1)
+            self.dist_gasolinera_cercana = hacia_gas[np.arange(n), cercana]
+            self.gasolinera_cercana = gasolineras[cercana]
+        else:
+            self.dist_gasolinera_cercana = np.full(n, np.inf)
+            self.gasolinera_cercana = np.full(n, -1)
+
+        hacia_vertedero = np.array(self.matriz[:, self.vertedero], dtype=float)
+        hacia_vertedero[(hacia_vertedero == 0) & (np.arange(n) != self.vertedero)] = np.inf
+        self.dist_a_vertedero = hacia_vertedero
+
+        # Versión densa de `distancia` para el selector vectorizado
+        self.tachos_array = np.array(sorted(self.tachos), dtype=np.int64)
+        self.distancias = np.array(self.matriz, dtype=float)
+        self.distancias[(self.distancias == 0) & ~np.eye(n, dtype=bool)] = np.inf
+        self._eta_beta = {}
+        self._candidatos = {}
+
+    def lista_candidatos(self, k):
+        """Para cada nodo, sus k tachos más cercanos (-1 = sin vecino); se calcula una vez por k."""
+        if k not in self._candidatos:
+            self._candidatos[k] = vecinos_cercanos(self.matriz, self.tachos, k, cero_es_infinito=True)
+        return self._candidatos[k]
+
+    def eta_beta(self, beta):
+        """Matriz (1 / distancia) ** beta, calculada una vez por valor de beta."""
+        if beta not in self._eta_beta:
+            with np.errstate(divide="ignore"):
+                eta = 1.0 / self.distancias
+            eta[~np.isfinite(eta)] = 0.0
+            self._eta_beta[beta] = eta ** beta
+        return self._eta_beta[beta]
+
+    def longitud_ruta(self, ruta):
+        """Suma de las distancias de la matriz a lo largo de la ruta (metros)."""
+        if len(ruta) < 2:
+            return 0.0
+        ruta = np.asarray(ruta)
+        return float(self.matriz[ruta[:-1], ruta[1:]].sum())
+
+    def distancia_gasolinera_cercana(self, nodo_idx):
+        return float(self.dist_gasolinera_cercana[nodo_idx])
+
+    def gasolinera_mas_cercana(self, nodo_idx):
+        return int(self.gasolinera_cercana[nodo_idx])
+
+    def distancia_vertedero(self, nodo_idx):
+        return float(self.dist_a_vertedero[nodo_idx])
+
+    def tipo_nodo(self, nodo_idx):
+        if nodo_idx in self.tachos:
+            return "tacho"
+        elif nodo_idx == self.vertedero:
+            return "vertedero"
+        elif nodo_idx in self.gasolineras:
+            return "gasolinera"
+        return "otro"
+    
+    def obtener_tachos_disponibles(self, tachos_visitados_sector):
+        # Con EstadoTachos se devuelve su lista interna (no modificar)
+        if isinstance(tachos_visitados_sector, EstadoTachos):
+            return tachos_visitados_sector.disponibles
+        return list(self.tachos - tachos_visitados_sector)
+    
+    def distancia(self, origen, destino):
+        self.contadores["consultas_distancia"] += 1
+        try:
+            if origen >= len(self.matriz) or destino >= len(self.matriz[0]):
+                return float('inf')
+            distancia = self.matriz[origen][destino]
+            return distancia if distancia != 0 or origen == destino else float('inf')
+        except:
+            return float('inf')
+
+
+class EstadoTachos:
+    """
+    Tachos recolectados y pendientes durante una iteración de la colonia:
+    - `visitados` (set) y `mascara` (bool por nodo) para consultar si un
+      tacho ya fue recolectado.
+    - `disponibles` y una lista por zona con los tachos pendientes; se
+      quitan con swap-remove, así recolectar y preguntar "¿quedan en mi
+      zona?" son O(1).
+
+    Se comporta como el conjunto de visitados (`in`, `len`, iteración).
+    """
+
+    def __init__(self, tachos, n, zonas=()):
+        self.visitados = set()
+        self.mascara = np.zeros(n, dtype=bool)
+        self.disponibles = list(tachos)
+        self._indice = {t: i for i, t in enumerate(self.disponibles)}
+        self.zonas = [list(zona) for zona in zonas]
+        self._indice_zona = [{t: i for i, t in enumerate(zona)} for zona in self.zonas]
+        self._zona_de = {t: z for z, zona in enumerate(self.zonas) for t in zona}
+
+    @staticmethod
+    def _quitar(lista, indice, tacho):
+        i = indice.pop(tacho)
+        ultimo = lista.pop()
+        if ultimo != tacho:
+            lista[i] = ultimo
+            indice[ultimo] = i
+
+    def recolectar(self, tacho):
+        """Marca el tacho como recolectado. Devuelve False si ya lo estaba."""
+        if tacho in self.visitados:
+            return False
+        self.visitados.add(tacho)
+        self.mascara[tacho] = True
+        if tacho in self._indice:
+            self._quitar(self.disponibles, self._indice, tacho)
+        z = self._zona_de.get(tacho)
+        if z is not None:
+            self._quitar(self.zonas[z], self._indice_zona[z], tacho)
+        return True
+
+    def quedan(self):
+        return bool(self.disponibles)
+
+    def quedan_en_zona(self, zona):
+        return bool(self.zonas[zona])
+
+    def __contains__(self, tacho):
+        return tacho in self.visitados
+
+    def __len__(self):
+        return len(self.visitados)
+
+    def __iter__(self):
+        return iter(self.visitados)
+
+
+def crear_entorno(sector, datos, matriz, nodo_a_indice, indice_a_nodo):
+    """Construye el entorno de un sector a partir de datos_extra.json y la matriz."""
+    centro_idx = nodo_a_indice[datos["nodo_centro"]]
+    vertedero_idx = nodo_a_indice[datos["nodo_vertedero"]]
+    tachos_idx = [nodo_a_indice[t] for t in datos[f"tachos_{sector}"] if t in nodo_a_indice]
+    gasolineras_idx = [nodo_a_indice[g] for g in datos["puntos_gasolineras"] if g in nodo_a_indice]
+    return EntornoACOOptimized(
+        matriz, centro_idx, vertedero_idx,
+        tachos_idx, gasolineras_idx,
+        nodo_a_indice, indice_a_nodo
+    )
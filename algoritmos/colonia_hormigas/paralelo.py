@@ -0,0 +1,147 @@
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ant import Camion
+from aco import ejecutar_aco, actualizar_feromonas, calidad_solucion
+from entorno import crear_entorno
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias import cargar_datos
+from algoritmos.evaluador import DEMANDA_KG, Evaluador
+from algoritmos.eventos import SIN_EVENTOS
+
+DIRECTORIO_DATOS = "../../data"
+NUM_CAMIONES = 3
+KM_MAX = 5000
+KG_MAX = 5000
+
+# Estado de cada proceso del pool (se asigna en el inicializador)
+_datos_worker = None
+_entornos_worker = {}
+
+
+def _inicializar_worker(directorio):
+    """
+    Abre la matriz (memory-mapped si existe el almacén binario, así todos
+    los procesos comparten las mismas páginas) y los datos del problema.
+    """
+    global _datos_worker
+    import json
+    with open(os.path.join(directorio, "datos_extra.json"), "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    _datos_worker = (datos,) + tuple(cargar_datos.cargar_matriz_y_indices(directorio))
+    _entornos_worker.clear()
+
+
+def _entorno(sector):
+    if sector not in _entornos_worker:
+        datos, matriz, nodo_a_indice, indice_a_nodo = _datos_worker
+        _entornos_worker[sector] = crear_entorno(sector, datos, matriz, nodo_a_indice, indice_a_nodo)
+    return _entornos_worker[sector]
+
+
+def _ejecutar_colonia(tarea):
+    """
+    Corre `iteraciones` de una colonia partiendo de su matriz de feromonas.
+    Devuelve la solución, su costo según el evaluador común, su calidad
+    (el depósito de `ejecutar_aco`) y las feromonas actualizadas.
+    """
+    sector, semilla, feromonas, iteraciones, parametros = tarea
+    entorno = _entorno(sector)
+    random.seed(semilla)
+
+    camiones = [Camion(entorno.centro, km_max=KM_MAX, kg_max=KG_MAX) for _ in range(NUM_CAMIONES)]
+    camiones = ejecutar_aco(entorno, feromonas, camiones, iteraciones=iteraciones,
+                            eventos=SIN_EVENTOS, **parametros)
+
+    evaluador = Evaluador(entorno.matriz, entorno.tachos, entorno.vertedero, entorno.gasolineras,
+                          capacidad=KG_MAX, demanda=DEMANDA_KG, autonomia=KM_MAX)
+    evaluacion = evaluador.evaluar([camion.ruta for camion in camiones])
+    cobertura = len(set().union(*(camion.tachos_visitados for camion in camiones)))
+    return {
+        "camiones": camiones,
+        "feromonas": feromonas,
+        "costo": evaluacion.costo,
+        "cobertura": cobertura,
+        "distancia": evaluacion.distancia,
+        "calidad": calidad_solucion(cobertura, len(entorno.tachos), evaluacion.distancia),
+    }
+
+
+def semilla_colonia(semilla, indice_sector, epoca, colonia, epocas, colonias):
+    """Semilla única y reproducible para cada (sector, época, colonia)."""
+    return semilla * 1_000_003 + (indice_sector * epocas + epoca) * colonias + colonia
+
+
+def es_mejor(resultado, mejor):
+    """Menor costo del evaluador común (distancia más penalizaciones), como en `ejecutar_aco`."""
+    return mejor is None or resultado["costo"] < mejor["costo"]
+
+
+def ejecutar_colonias_paralelas(sectores=("este", "oeste"),
+                                colonias=4,
+                                epocas=8,
+                                iteraciones_por_epoca=10,
+                                procesos=None,
+                                semilla=0,
+                                directorio=DIRECTORIO_DATOS,
+                                **parametros):
+    """
+    Modelo de islas: por cada sector corren `colonias` colonias
+    independientes, cada una con su matriz de feromonas. En cada época
+    todas las colonias de todos los sectores se reparten en un mismo
+    `ProcessPoolExecutor`; al terminar la época la mejor solución global de
+    cada sector deposita feromonas en todas sus colonias (intercambio
+    elitista) y empieza la siguiente época.
+
+    Las semillas dependen solo de (semilla, sector, época, colonia), así que
+    el resultado es el mismo sin importar el número de procesos.
+    `parametros` se pasa tal cual a `ejecutar_aco` (alpha, beta, rho,
+    selector, q, tau_min, tau_max).
+
+    Devuelve {sector: mejor resultado} con "camiones", "costo",
+    "cobertura", "distancia" y "calidad".
+    """
+    matriz, _, _ = cargar_datos.cargar_matriz_y_indices(directorio)
+    n = len(matriz)
+    q = parametros.get("q", 1.0)
+    tau_min, tau_max = parametros.get("tau_min"), parametros.get("tau_max")
+
+    feromonas = {sector: [np.ones((n, n)) for _ in range(colonias)] for sector in sectores}
+    mejores = {sector: None for sector in sectores}
+
+    with ProcessPoolExecutor(max_workers=procesos,
+                             initializer=_inicializar_worker,
+                             initargs=(directorio,)) as pool:
+        for epoca in range(epocas):
+            tareas = [
+                (sector,
+                 semilla_colonia(semilla, s, epoca, k, epocas, colonias),
+                 feromonas[sector][k],
+                 iteraciones_por_epoca,
+                 parametros)
+                for s, sector in enumerate(sectores)
+                for k in range(colonias)
+            ]
+            resultados = list(pool.map(_ejecutar_colonia, tareas))
+
+            for s, sector in enumerate(sectores):
+                de_sector = resultados[s * colonias:(s + 1) * colonias]
+                for k, resultado in enumerate(de_sector):
+                    feromonas[sector][k] = resultado["feromonas"]
+                    if es_mejor(resultado, mejores[sector]):
+                        mejores[sector] = resultado
+
+                # Intercambio: la mejor solución global refuerza todas las colonias
+                mejor = mejores[sector]
+                rutas = [camion.ruta for camion in mejor["camiones"]]
+                for tau in feromonas[sector]:
+                    actualizar_feromonas(tau, rutas, q * mejor["calidad"], 0.0, tau_min, tau_max)
+
+    for mejor in mejores.values():
+        mejor.pop("feromonas", None)
+    return mejores
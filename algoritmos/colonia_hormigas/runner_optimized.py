@@ -1,64 +1,39 @@
 import numpy as np
 import json
 import os
+import sys
 import time
 from datetime import datetime
-from utils import cargar_datos_extra
 from ant import Camion
 from aco import ejecutar_aco
+from entorno import EntornoACOOptimized, crear_entorno
+from paralelo import ejecutar_colonias_paralelas
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.instancia import Instancia
+from algoritmos.busqueda_local.busqueda_local import mejorar_rutas
+from algoritmos.evaluador import Evaluador
+from algoritmos.eventos import eventos_desde_argv
+from algoritmos.instrumentacion import SIN_INSTRUMENTACION, instrumentacion_desde_argv
 
-class EntornoACOOptimized:
-    def __init__(self, matriz, centro, vertedero, tachos, gasolineras, nodo_a_indice, indice_a_nodo):
-        self.matriz = matriz
-        self.centro = centro
-        self.vertedero = vertedero
-        self.tachos = set(tachos)
-        self.gasolineras = set(gasolineras)
-        self.nodo_a_indice = nodo_a_indice
-        self.indice_a_nodo = indice_a_nodo
-
-    def tipo_nodo(self, nodo_idx):
-        if nodo_idx in self.tachos:
-            return "tacho"
-        elif nodo_idx == self.vertedero:
-            return "vertedero"
-        elif nodo_idx in self.gasolineras:
-            return "gasolinera"
-        return "otro"
-    
-    def obtener_tachos_disponibles(self, tachos_visitados_sector):
-        return list(self.tachos - tachos_visitados_sector)
-    
-    def distancia(self, origen, destino):
-        try:
-            if origen >= len(self.matriz) or destino >= len(self.matriz[0]):
-                return float('inf')
-            distancia = self.matriz[origen][destino]
-            return distancia if distancia != 0 or origen == destino else float('inf')
-        except:
-            return float('inf')
+# Tamaño de la lista de candidatos (tachos más cercanos) por paso de hormiga
+K_VECINOS = 10
 
+# Instancia compartida por todas las corridas: se carga una sola vez al primer uso
+INSTANCIA = Instancia("../../data")
 
-def cargar_matriz_y_indices():
-    matriz = np.load("../../data/matriz_distancias.npy")
-    
-    with open("../../data/indices_nodos.json", "r") as f:
-        indice_a_nodo = json.load(f)
-    with open("../../data/nodos_indices.json", "r") as f:
-        nodo_a_indice = json.load(f)
 
-    # Convertir claves a enteros
-    indice_a_nodo = {int(k): v for k, v in indice_a_nodo.items()}
-    nodo_a_indice = {int(k): v for k, v in nodo_a_indice.items()}
-
-    return matriz, nodo_a_indice, indice_a_nodo
+def cargar_matriz_y_indices():
+    # Almacén memory-mapped compartido (o .npy + JSON si no existe)
+    return INSTANCIA.matriz, INSTANCIA.nodo_a_indice, INSTANCIA.indice_a_nodo
 
-def run_aco_optimized(sector="este"):
+def run_aco_optimized(sector="este", mejorar=False, eventos=None, instrumentacion=SIN_INSTRUMENTACION):
     
     # Cargar datos
-    datos = cargar_datos_extra("../../data/datos_extra.json")
-    matriz, nodo_a_indice, indice_a_nodo = cargar_matriz_y_indices()
+    with instrumentacion.fase("carga"):
+        datos = INSTANCIA.datos
+    with instrumentacion.fase("matriz"):
+        matriz, nodo_a_indice, indice_a_nodo = cargar_matriz_y_indices()
     
     # Convertir nodos a índices
     centro_idx = nodo_a_indice[datos["nodo_centro"]]
@@ -86,24 +61,37 @@ def run_aco_optimized(sector="este"):
     
     # Crear camiones con combustible estándar de 5km
     camiones = [Camion(centro_idx, km_max=5000, kg_max=5000) for _ in range(3)]
-    feromonas = {}
+    feromonas = np.ones((len(matriz), len(matriz)))
     
     # Medir tiempo de ejecución
     start_time = time.time()
     
     # Ejecutar algoritmo
-    resultado = ejecutar_aco(entorno, feromonas, camiones, iteraciones=80)
+    with instrumentacion.fase("construccion"):
+        resultado = ejecutar_aco(entorno, feromonas, camiones, iteraciones=80, vecinos=K_VECINOS,
+                                 eventos=eventos)
+    instrumentacion.sumar(entorno.contadores, "aco")
+    if mejorar:
+        with instrumentacion.fase("mejora"):
+            mejorar_camiones(resultado, entorno, eventos, instrumentacion)
     
     # Calcular tiempo de ejecución
     execution_time = time.time() - start_time
     
-    # Mostrar resultados
+    with instrumentacion.fase("salida"):
+        return mostrar_resultados(sector, resultado, tachos_idx, indice_a_nodo, execution_time)
+
+def mostrar_resultados(sector, resultado, tachos_idx, indice_a_nodo, execution_time):
+    """Imprime el resumen del sector y guarda el JSON para comparación."""
     print(f"\n🏆 RESULTADOS DEL SECTOR {sector.upper()}")
     print("=" * 50)
     
     total_tachos_visitados = set()
     total_basura_recolectada = 0
     total_distancia_recorrida = 0
+
+    # La distancia sale de la ruta (km_max - km_restantes no sirve tras recargar)
+    evaluacion = Evaluador(INSTANCIA.matriz, tachos_idx).evaluar([camion.ruta for camion in resultado])
     
     for i, camion in enumerate(resultado, 1):
         print(f"\n🚛 Camión {i}:")
@@ -113,7 +101,7 @@ def run_aco_optimized(sector="este"):
         print(f"  ⛽ Combustible restante: {camion.km_restantes:.1f} m")
         
         # Calcular distancia total recorrida
-        distancia_camion = camion.km_max - camion.km_restantes
+        distancia_camion = float(evaluacion.distancias[i - 1])
         print(f"  🛣️ Distancia recorrida: {distancia_camion:.1f} m")
         
         total_tachos_visitados.update(camion.tachos_visitados)
@@ -180,12 +168,72 @@ def guardar_resultados_aco(camiones, sector, indice_a_nodo,
     return archivo_latest
 
 
+def mejorar_camiones(camiones, entorno, eventos=None, instrumentacion=SIN_INSTRUMENTACION):
+    """Post-optimización local de las rutas de los camiones (se reemplaza `camion.ruta`)."""
+    mejoradas = mejorar_rutas(
+        [camion.ruta for camion in camiones], entorno.matriz, entorno.tachos,
+        entorno.vertedero, entorno.gasolineras,
+        capacidad=camiones[0].kg_max, demanda=300, autonomia=camiones[0].km_max,
+        eventos=eventos, instrumentacion=instrumentacion
+    )
+    for camion, ruta in zip(camiones, mejoradas):
+        camion.ruta = ruta
+    return camiones
+
+def run_aco_paralelo(sectores=("este", "oeste"), colonias=4, procesos=None, mejorar=False,
+                     eventos=None, instrumentacion=SIN_INSTRUMENTACION):
+    """
+    Ejecuta `colonias` colonias independientes por sector en un pool de
+    procesos (ver paralelo.py); ambos sectores se resuelven a la vez.
+    """
+    with instrumentacion.fase("carga"):
+        datos = INSTANCIA.datos
+    with instrumentacion.fase("matriz"):
+        matriz, nodo_a_indice, indice_a_nodo = cargar_matriz_y_indices()
+
+    print(f"🧵 ACO paralelo: {colonias} colonias por sector, {procesos or os.cpu_count()} procesos")
+    start_time = time.time()
+    # Los contadores de las colonias quedan en sus procesos; aquí solo se mide el tiempo
+    with instrumentacion.fase("construccion"):
+        mejores = ejecutar_colonias_paralelas(sectores, colonias=colonias, procesos=procesos,
+                                              vecinos=K_VECINOS)
+    execution_time = time.time() - start_time
+
+    salida = {}
+    for sector in sectores:
+        tachos_idx = [nodo_a_indice[t] for t in datos[f"tachos_{sector}"] if t in nodo_a_indice]
+        camiones = mejores[sector]["camiones"]
+        if mejorar:
+            entorno = crear_entorno(sector, datos, matriz, nodo_a_indice, indice_a_nodo)
+            with instrumentacion.fase("mejora"):
+                mejorar_camiones(camiones, entorno, eventos, instrumentacion)
+        with instrumentacion.fase("salida"):
+            salida[sector] = mostrar_resultados(sector, camiones, tachos_idx,
+                                                indice_a_nodo, execution_time)
+    return salida
+
+
 if __name__ == "__main__":
-    print("🚀 Ejecutando ACO para sector ESTE...")
-    resultado_este, archivo_este = run_aco_optimized("este")
-    
-    print("\n🚀 Ejecutando ACO para sector OESTE...")
-    resultado_oeste, archivo_oeste = run_aco_optimized("oeste")
+    # Uso: python runner_optimized.py [--paralelo [colonias]] [--mejorar]
+    #                                 [--eventos eventos.jsonl] [--nivel debug]
+    #                                 [--perfil] [--reporte instrumentacion.json]
+    eventos, argv = eventos_desde_argv(sys.argv[1:])
+    instrumentacion, argv = instrumentacion_desde_argv(argv)
+    mejorar = "--mejorar" in argv
+    if "--paralelo" in argv:
+        argumentos = [a for a in argv if not a.startswith("--")]
+        colonias = int(argumentos[0]) if argumentos else 4
+        resultados = run_aco_paralelo(colonias=colonias, mejorar=mejorar, eventos=eventos,
+                                      instrumentacion=instrumentacion)
+        (resultado_este, archivo_este), (resultado_oeste, archivo_oeste) = resultados["este"], resultados["oeste"]
+    else:
+        print("🚀 Ejecutando ACO para sector ESTE...")
+        resultado_este, archivo_este = run_aco_optimized("este", mejorar=mejorar, eventos=eventos,
+                                                         instrumentacion=instrumentacion)
+        
+        print("\n🚀 Ejecutando ACO para sector OESTE...")
+        resultado_oeste, archivo_oeste = run_aco_optimized("oeste", mejorar=mejorar, eventos=eventos,
+                                                           instrumentacion=instrumentacion)
     
     print("\n" + "="*60)
     print("📋 ARCHIVOS GENERADOS:")
@@ -193,3 +241,5 @@ if __name__ == "__main__":
     print(f"  📁 {archivo_oeste}")
     print("\n💡 Para generar mapas visuales, ejecuta:")
     print("  python visualizar_rutas.py")
+    eventos.cerrar()
+    instrumentacion.terminar()
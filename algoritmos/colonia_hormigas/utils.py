@@ -1,10 +1,14 @@
 import json
 import networkx as nx
-import osmnx as ox
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from instancias.grafo_csr import cargar_grafo_csr
 
 
 def cargar_grafo(path):
-    return ox.load_graphml(path)
+    return cargar_grafo_csr(path)
 
 def cargar_datos_extra(path):
     with open(path, 'r', encoding='utf-8') as f:
@@ -0,0 +1,263 @@
+import numpy as np
+
+# Parámetros comunes del problema, todos en metros y kilogramos
+CAPACIDAD_KG = 5000
+DEMANDA_KG = 300
+AUTONOMIA_M = 5000
+
+# Pesos de penalización únicos para todo el proyecto (por unidad de exceso)
+PESOS = {
+    "carga": 1000.0,         # por kg sobre la capacidad antes de cada descarga
+    "combustible": 500.0,    # por metro sobre la autonomía antes de cada recarga
+    "sin_camino": 50000.0,   # por tramo sin camino en la matriz
+    "faltante": 9999.0,      # por tacho del sector que no se visita
+    "duplicado": 99999.0,    # por visita repetida a un tacho
+    "sin_recarga": 50000.0,  # búsqueda tabú: ruta sin gasolinera entre vertedero y centro
+}
+
+
+class Evaluacion:
+    """
+    Resultado de evaluar una solución (lista de rutas por índices). Las
+    métricas por ruta son arreglos con una posición por ruta; `distancias`
+    es inf en las rutas con algún tramo sin camino y `con_camino` suma solo
+    los tramos que sí lo tienen. `aislados` son los tachos visitados solo
+    por tramos sin camino (de llegada o de salida): no cuentan en la
+    cobertura, aunque tampoco se penalizan como faltantes porque ya pagan
+    sus tramos sin camino.
+    """
+
+    def __init__(self, distancias, con_camino, exceso_carga, exceso_combustible, sin_camino,
+                 violaciones_ruta, visitados, faltantes, duplicados, pesos, perfiles=None,
+                 aislados=0):
+        self.distancias = distancias
+        self.con_camino = con_camino
+        self.exceso_carga = exceso_carga
+        self.exceso_combustible = exceso_combustible
+        self.sin_camino = sin_camino
+        self.violaciones_ruta = violaciones_ruta
+        self.visitados = visitados
+        self.faltantes = faltantes
+        self.duplicados = duplicados
+        self.pesos = pesos
+        self.perfiles = perfiles
+        self.aislados = aislados
+
+    @property
+    def distancia(self):
+        return float(self.distancias.sum())
+
+    @property
+    def violaciones(self):
+        """Tramos sin camino + descargas/recargas a las que se llega excedido."""
+        return int(self.violaciones_ruta.sum())
+
+    @property
+    def factible(self):
+        return self.violaciones == 0 and self.duplicados == 0
+
+    @property
+    def cobertura(self):
+        """Fracción de tachos a los que se llega y de los que se sale por tramos con camino."""
+        total = self.visitados + self.faltantes
+        return (self.visitados - self.aislados) / total if total else 1.0
+
+    @property
+    def penalizacion(self):
+        p = self.pesos
+        return float(p["carga"] * self.exceso_carga.sum()
+                     + p["combustible"] * self.exceso_combustible.sum()
+                     + p["sin_camino"] * self.sin_camino.sum()
+                     + p["faltante"] * self.faltantes
+                     + p["duplicado"] * self.duplicados)
+
+    @property
+    def costo(self):
+        """
+        Distancia de los tramos con camino (m) más penalizaciones: cada
+        tramo sin camino suma su penalización en lugar de inf.
+        """
+        return float(self.con_camino.sum()) + self.penalizacion
+
+
+class Evaluador:
+    """
+    Validador y evaluador de soluciones común a todos los algoritmos.
+
+    Una ruta es una lista de índices de la matriz. La carga se acumula en
+    cada tacho y se vacía al llegar al vertedero; el recorrido se acumula en
+    cada tramo y se reinicia al llegar a una gasolinera. Se controla la
+    carga al llegar a cada descarga (y al final de la ruta) y el recorrido
+    al llegar a cada recarga (y al final). `autonomia=None` desactiva el
+    control de combustible.
+
+    Todas las rutas de una o varias soluciones se concatenan en un único
+    arreglo: las distancias salen de una sola lectura `D[origenes, destinos]`
+    y los perfiles de carga y combustible de sumas acumuladas con reinicios,
+    sin bucles de Python por nodo.
+    """
+
+    def __init__(self, matriz, tachos, vertedero=None, gasolineras=(),
+                 capacidad=CAPACIDAD_KG, demanda=DEMANDA_KG, autonomia=AUTONOMIA_M, pesos=None):
+        self.matriz = matriz
+        self.tachos = np.asarray(sorted(set(tachos)), dtype=np.int64)
+        self.vertedero = vertedero
+        self.capacidad = capacidad
+        self.autonomia = autonomia
+        self.pesos = {**PESOS, **(pesos or {})}
+        # Contadores para la instrumentación: tramos leídos y rutas validadas
+        self.contadores = {"consultas_distancia": 0, "verificaciones": 0}
+
+        n = len(matriz)
+        self.demanda = np.zeros(n)
+        if isinstance(demanda, dict):
+            for t, kg in demanda.items():
+                self.demanda[t] = kg
+        else:
+            self.demanda[self.tachos] = demanda
+        self.es_tacho = np.zeros(n, dtype=bool)
+        self.es_tacho[self.tachos] = True
+        self.es_gasolinera = np.zeros(n, dtype=bool)
+        self.es_gasolinera[list(gasolineras)] = True
+
+    def _recorrer(self, rutas):
+        """
+        Perfiles de todas las rutas concatenadas. Devuelve (nodos, ruta_de,
+        tramo, carga, recorrido, control_carga, control_combustible) con una
+        posición por nodo visitado; `tramo[k]` es la distancia desde el nodo
+        anterior de la misma ruta (0 al inicio de cada ruta).
+        """
+        largos = np.array([len(r) for r in rutas], dtype=np.int64)
+        nodos = np.concatenate(rutas).astype(np.int64, copy=False) if rutas else np.zeros(0, dtype=np.int64)
+        ruta_de = np.repeat(np.arange(len(rutas)), largos)
+        fines = np.cumsum(largos)
+        es_inicio = np.zeros(len(nodos), dtype=bool)
+        es_inicio[fines - largos] = True
+        es_fin = np.zeros(len(nodos), dtype=bool)
+        es_fin[fines - 1] = True
+
+        tramo = np.zeros(len(nodos))
+        siguientes = np.flatnonzero(~es_inicio)
+        self.contadores["consultas_distancia"] += len(siguientes)
+        self.contadores["verificaciones"] += len(rutas)
+        tramo[siguientes] = self.matriz[nodos[siguientes - 1], nodos[siguientes]]
+        finito = np.where(np.isfinite(tramo), tramo, 0.0)
+
+        # Carga: suma acumulada que se vacía al llegar al vertedero
+        es_vertedero = nodos == self.vertedero
+        acumulada = np.cumsum(self.demanda[nodos])
+        base = np.maximum.accumulate(np.where(es_inicio | es_vertedero, acumulada, 0.0))
+        carga = acumulada - base
+        base_previa = np.concatenate(([0.0], base[:-1]))
+        llegada_carga = acumulada - base_previa
+        control_carga = (es_vertedero | es_fin) & ~es_inicio
+
+        # Combustible: recorrido acumulado que se reinicia en cada gasolinera
+        es_gasolinera = self.es_gasolinera[nodos]
+        acumulado = np.cumsum(finito)
+        base = np.maximum.accumulate(np.where(es_inicio | es_gasolinera, acumulado, 0.0))
+        recorrido = acumulado - base
+        base_previa = np.concatenate(([0.0], base[:-1]))
+        llegada_recorrido = acumulado - base_previa
+        control_combustible = (es_gasolinera | es_fin) & ~es_inicio
+
+        return (nodos, ruta_de, tramo, carga, recorrido,
+                np.where(control_carga, llegada_carga, 0.0),
+                np.where(control_combustible, llegada_recorrido, 0.0))
+
+    def _evaluar_plano(self, rutas, soluciones_de, num_soluciones, perfiles=False):
+        num_rutas = len(rutas)
+        (nodos, ruta_de, tramo, carga, recorrido,
+         llegada_carga, llegada_recorrido) = self._recorrer(rutas)
+
+        con_camino = np.bincount(ruta_de, weights=np.where(np.isfinite(tramo), tramo, 0.0),
+                                 minlength=num_rutas).astype(float)
+        sin_camino = np.bincount(ruta_de, weights=~np.isfinite(tramo), minlength=num_rutas)
+        distancias = np.where(sin_camino > 0, np.inf, con_camino)
+
+        exceso_c = np.maximum(llegada_carga - self.capacidad, 0.0)
+        exceso_carga = np.bincount(ruta_de, weights=exceso_c, minlength=num_rutas)
+        violaciones = sin_camino + np.bincount(ruta_de, weights=exceso_c > 0, minlength=num_rutas)
+        if self.autonomia is not None:
+            exceso_r = np.maximum(llegada_recorrido - self.autonomia, 0.0)
+            exceso_combustible = np.bincount(ruta_de, weights=exceso_r, minlength=num_rutas)
+            violaciones += np.bincount(ruta_de, weights=exceso_r > 0, minlength=num_rutas)
+        else:
+            exceso_combustible = np.zeros(num_rutas)
+
+        # Cobertura y duplicados por solución: visitas a cada tacho, y visitas
+        # conectadas (tramo de llegada y de salida con camino; el primer y el
+        # último nodo de cada ruta no tienen tramo de llegada o de salida)
+        solucion_de_nodo = soluciones_de[ruta_de]
+        en_tacho = self.es_tacho[nodos]
+        llega = np.isfinite(tramo)
+        sale = np.ones(len(nodos), dtype=bool)
+        misma_ruta = ruta_de[1:] == ruta_de[:-1]
+        sale[:-1] = ~misma_ruta | llega[1:]
+        n = len(self.matriz)
+        claves = solucion_de_nodo * n + nodos
+        visitas = np.bincount(claves[en_tacho], minlength=num_soluciones * n).reshape(num_soluciones, n)
+        visitas = visitas[:, self.tachos]
+        conectadas = en_tacho & llega & sale
+        conectadas = np.bincount(claves[conectadas], minlength=num_soluciones * n).reshape(num_soluciones, n)
+        conectadas = conectadas[:, self.tachos]
+
+        evaluaciones = []
+        for s in range(num_soluciones):
+            mias = soluciones_de == s
+            vistos = int((visitas[s] > 0).sum())
+            cubiertos = int((conectadas[s] > 0).sum())
+            detalle = None
+            if perfiles:
+                cortes = np.flatnonzero(np.diff(ruta_de[solucion_de_nodo == s])) + 1
+                mis_nodos = solucion_de_nodo == s
+                detalle = {
+                    "tramos": np.split(tramo[mis_nodos], cortes),
+                    "carga": np.split(carga[mis_nodos], cortes),
+                    "recorrido": np.split(recorrido[mis_nodos], cortes),
+                }
+            evaluaciones.append(Evaluacion(
+                distancias[mias], con_camino[mias], exceso_carga[mias], exceso_combustible[mias], sin_camino[mias],
+                violaciones[mias], vistos, len(self.tachos) - vistos,
+                int(np.maximum(visitas[s] - 1, 0).sum()), self.pesos, detalle, vistos - cubiertos))
+        return evaluaciones
+
+    def evaluar(self, rutas, perfiles=False):
+        """
+        Evalúa una solución. Con `perfiles=True` la evaluación incluye, por
+        ruta, los tramos, la carga y el recorrido desde la última recarga en
+        cada nodo.
+        """
+        rutas = [r for r in rutas if len(r) > 0]
+        return self._evaluar_plano(rutas, np.zeros(len(rutas), dtype=np.int64), 1, perfiles)[0]
+
+    def evaluar_lote(self, soluciones):
+        """
+        Evalúa varias soluciones candidatas en una sola pasada vectorizada.
+        Devuelve una Evaluacion por solución, en el mismo orden.
+        """
+        rutas, soluciones_de = [], []
+        for s, solucion in enumerate(soluciones):
+            for ruta in solucion:
+                if len(ruta) > 0:
+                    rutas.append(ruta)
+                    soluciones_de.append(s)
+        return self._evaluar_plano(rutas, np.asarray(soluciones_de, dtype=np.int64), len(soluciones))
+
+    def distancia(self, ruta):
+        """Distancia de una ruta en metros (inf si algún tramo no tiene camino)."""
+        if len(ruta) < 2:
+            return 0.0
+        self.contadores["consultas_distancia"] += len(ruta) - 1
+        r = np.asarray(ruta)
+        return float(self.matriz[r[:-1], r[1:]].sum())
+
+    def exceso(self, ruta):
+        """(exceso de carga en kg, exceso de combustible en m) de una ruta."""
+        if len(ruta) == 0:
+            return 0.0, 0.0
+        _, _, _, _, _, llegada_carga, llegada_recorrido = self._recorrer([ruta])
+        exceso_carga = float(np.maximum(llegada_carga - self.capacidad, 0.0).sum())
+        if self.autonomia is None:
+            return exceso_carga, 0.0
+        return exceso_carga, float(np.maximum(llegada_recorrido - self.autonomia, 0.0).sum())
@@ -0,0 +1,213 @@
+import json
+import math
+import sys
+import time
+from collections import deque
+
+# Niveles de detalle: un sumidero recibe los eventos de su nivel o superior
+DEBUG = 10
+INFO = 20
+AVISO = 30
+ERROR = 40
+NIVELES = {"debug": DEBUG, "info": INFO, "aviso": AVISO, "error": ERROR}
+
+# Plantillas para la consola (o funciones evento -> texto); los eventos sin
+# plantilla se muestran como clave=valor
+FORMATOS = {
+    "aco_iteracion": "🐜 Iteración {iteracion}: {recolectados}/{total} tachos, {distancia_m:.1f} m",
+    "aco_movimiento": "  🚛 Camión {camion} → {destino} ({tipo_nodo})",
+    "aco_fase_final": "🎯 FASE FINAL: Intentando recuperar {faltantes} tachos faltantes...",
+    "aco_tacho_recuperado": "  ✅ Tacho {tacho} recuperado en fase final",
+    "aco_vaciado_final": "🔄 Ejecutando vaciado final obligatorio...",
+    "aco_vaciado": "  🚛 Camión {camion}: vaciado en vertedero ({estado})",
+    "aco_regreso_final": "🏠 Regresando todos los camiones al centro...",
+    "aco_regreso": "  🚛 Camión {camion}: regreso al centro ({estado})",
+    "tabu_inicio": "Iteración 0: Costo inicial = {costo:.2f}",
+    "tabu_mejora": "✅ Iteración {iteracion}: Mejorada a {costo:.2f}",
+    "tabu_iteracion": lambda e: (f"Iteración {e['iteracion']}: Costo = {e['costo']:.2f}"
+                                 + (" ⭐️ (tabú)" if e["tabu"] else " ")),
+    "tabu_multiarranque_epoca": "🔁 Época {epoca}: mejor costo global {mejor_costo:.2f}",
+    "tabu_sin_vecinos": "⚠️ Sin vecinos generados en la iteración {iteracion}",
+    "cw_salto_invalido": "⚠️ Camión {camion} omitió salto inválido: {origen} → {destino} (distancia = inf)",
+    "cw_sin_vertedero": "⚠️ Camión {camion} no pudo ir al vertedero desde {origen} (sin conexión)",
+    "cw_sin_regreso": "⚠️ Camión {camion} no pudo regresar al centro desde {origen} (sin conexión)",
+    "fin_presupuesto": "⏹️ {solver}: fin por {motivo} tras {iteraciones} iteraciones, "
+                       "{evaluaciones} evaluaciones y {segundos:.2f} s (mejor costo {mejor_costo:.1f})",
+    "busqueda_local": "🔧 Búsqueda local: {antes_m:.1f} m → {despues_m:.1f} m "
+                      "(2-opt: {dos_opt}, or-opt: {or_opt}, exchange: {exchange})",
+    "ruta": "  🚛 Camión {camion}: {paradas} paradas, {distancia_m:.1f} m",
+}
+
+
+def _nivel(nivel):
+    return NIVELES[nivel] if isinstance(nivel, str) else nivel
+
+
+def _a_json(valor):
+    # Tipos de NumPy y conjuntos a algo que json.dumps acepte
+    if hasattr(valor, "tolist"):
+        return valor.tolist()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor)
+    return str(valor)
+
+
+class Sumidero:
+    """Destino de eventos. Recibe solo los de nivel >= `nivel`."""
+
+    def __init__(self, nivel=INFO):
+        self.nivel = _nivel(nivel)
+
+    def recibir(self, evento):
+        raise NotImplementedError
+
+    def cerrar(self):
+        pass
+
+
+class SumideroNulo(Sumidero):
+    """Descarta todo; útil para medir sin salida."""
+
+    def __init__(self):
+        super().__init__(math.inf)
+
+    def recibir(self, evento):
+        pass
+
+
+class SumideroMemoria(Sumidero):
+    """Guarda los últimos `capacidad` eventos en un buffer circular."""
+
+    def __init__(self, capacidad=1000, nivel=DEBUG):
+        super().__init__(nivel)
+        self.eventos = deque(maxlen=capacidad)
+
+    def recibir(self, evento):
+        self.eventos.append(evento)
+
+    def de_tipo(self, tipo):
+        return [e for e in self.eventos if e["tipo"] == tipo]
+
+
+class SumideroJSONL(Sumidero):
+    """Escribe un evento por línea (JSON Lines) en `path`."""
+
+    def __init__(self, path, nivel=INFO):
+        super().__init__(nivel)
+        self.path = path
+        self.archivo = open(path, "w", encoding="utf-8")
+
+    def recibir(self, evento):
+        self.archivo.write(json.dumps(evento, ensure_ascii=False, default=_a_json) + "\n")
+
+    def cerrar(self):
+        if not self.archivo.closed:
+            self.archivo.close()
+
+
+class SumideroConsola(Sumidero):
+    """Muestra los eventos como las líneas con emojis de siempre."""
+
+    def __init__(self, nivel=INFO, salida=None):
+        super().__init__(nivel)
+        self.salida = salida
+
+    def recibir(self, evento):
+        formato = FORMATOS.get(evento["tipo"])
+        if callable(formato):
+            texto = formato(evento)
+        elif formato is not None:
+            texto = formato.format(**evento)
+        else:
+            datos = " ".join(f"{k}={v}" for k, v in evento.items() if k not in ("tipo", "nivel", "t"))
+            texto = f"• {evento['tipo']}: {datos}"
+        print(texto, file=self.salida or sys.stdout)
+
+
+class SumideroFuncion(Sumidero):
+    """Llama a `funcion(evento)` por cada evento (API de callback)."""
+
+    def __init__(self, funcion, nivel=INFO):
+        super().__init__(nivel)
+        self.funcion = funcion
+
+    def recibir(self, evento):
+        self.funcion(evento)
+
+
+class Eventos:
+    """
+    Flujo de eventos estructurados de los algoritmos. Cada evento es un
+    diccionario {"tipo", "nivel", "t", ...datos} que se reparte a los
+    sumideros cuyo nivel lo admite.
+
+    Sin sumideros (o con todos por encima del nivel) `emitir` retorna de
+    inmediato; en los bucles calientes se consulta antes `escucha(nivel)`
+    para no armar siquiera los datos del evento.
+    """
+
+    def __init__(self, *sumideros):
+        self.sumideros = list(sumideros)
+        self._actualizar()
+
+    def _actualizar(self):
+        self.nivel_minimo = min((s.nivel for s in self.sumideros), default=math.inf)
+
+    def agregar(self, sumidero):
+        self.sumideros.append(sumidero)
+        self._actualizar()
+        return sumidero
+
+    def escucha(self, nivel=INFO):
+        return nivel >= self.nivel_minimo
+
+    def emitir(self, tipo, nivel=INFO, **datos):
+        if nivel < self.nivel_minimo:
+            return
+        evento = {"tipo": tipo, "nivel": nivel, "t": time.time(), **datos}
+        for sumidero in self.sumideros:
+            if nivel >= sumidero.nivel:
+                sumidero.recibir(evento)
+
+    def cerrar(self):
+        for sumidero in self.sumideros:
+            sumidero.cerrar()
+
+
+# Emisor sin sumideros: no hace nada
+SIN_EVENTOS = Eventos()
+
+
+def consola(nivel=INFO):
+    """Emisor que muestra los eventos por consola desde `nivel`."""
+    return Eventos(SumideroConsola(nivel))
+
+
+def crear_eventos(archivo=None, nivel="info", silencioso=False):
+    """
+    Emisor para los runners: consola (salvo `silencioso`) y, si se indica,
+    un archivo JSON Lines con el mismo nivel.
+    """
+    eventos = Eventos()
+    if not silencioso:
+        eventos.agregar(SumideroConsola(nivel))
+    if archivo:
+        eventos.agregar(SumideroJSONL(archivo, nivel))
+    return eventos
+
+
+def eventos_desde_argv(argv, nivel="info"):
+    """
+    Para los runners que leen sys.argv a mano: extrae `--eventos ARCHIVO` y
+    `--nivel NIVEL` y devuelve (emisor, argumentos restantes).
+    """
+    opciones = {"--eventos": None, "--nivel": nivel}
+    resto, i = [], 0
+    while i < len(argv):
+        if argv[i] in opciones and i + 1 < len(argv):
+            opciones[argv[i]] = argv[i + 1]
+            i += 2
+        else:
+            resto.append(argv[i])
+            i += 1
+    return crear_eventos(opciones["--eventos"], opciones["--nivel"]), resto
@@ -0,0 +1,135 @@
+import cProfile
+import json
+import pstats
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class Instrumentacion:
+    """
+    Tiempos por fase, contadores y perfil opcional de una corrida.
+
+    - `fase(nombre)` mide con perf_counter y acumula segundos y entradas
+      por nombre (carga, matriz, construccion, mejora, salida...).
+    - Los contadores (consultas de distancia, verificaciones de
+      factibilidad, vecinos evaluados, movimientos aceptados...) los llevan
+      los propios solvers como enteros en sus bucles y se suman aquí al
+      terminar con `sumar`, así medir no cuesta nada en el camino caliente.
+    - Con `perfil=True` cProfile queda activo mientras haya una fase abierta.
+
+    `terminar()` guarda el reporte JSON en `archivo` (si se indicó) y, si
+    se pidió algo, muestra el resumen por consola.
+    """
+
+    def __init__(self, perfil=False, archivo=None):
+        self.fases = {}
+        self.contadores = Counter()
+        self.perfilador = cProfile.Profile() if perfil else None
+        self.archivo = archivo
+        self._inicio = time.perf_counter()
+        self._abiertas = 0
+
+    @contextmanager
+    def fase(self, nombre):
+        if self.perfilador is not None and self._abiertas == 0:
+            self.perfilador.enable()
+        self._abiertas += 1
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._abiertas -= 1
+            if self.perfilador is not None and self._abiertas == 0:
+                self.perfilador.disable()
+            fase = self.fases.setdefault(nombre, {"segundos": 0.0, "veces": 0})
+            fase["segundos"] += segundos
+            fase["veces"] += 1
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] += cantidad
+
+    def sumar(self, contadores, prefijo=None):
+        """Acumula un diccionario de contadores, opcionalmente como 'prefijo.nombre'."""
+        for nombre, cantidad in contadores.items():
+            self.contadores[f"{prefijo}.{nombre}" if prefijo else nombre] += cantidad
+
+    def perfil(self, top=20):
+        """Las `top` funciones con más tiempo propio según cProfile ([] sin perfil)."""
+        if self.perfilador is None:
+            return []
+        estadisticas = pstats.Stats(self.perfilador).stats
+        filas = sorted(estadisticas.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        return [
+            {"funcion": f"{archivo}:{linea}({nombre})", "llamadas": llamadas,
+             "tiempo_propio_s": round(propio, 6), "tiempo_acumulado_s": round(acumulado, 6)}
+            for (archivo, linea, nombre), (_, llamadas, propio, acumulado, _) in filas
+        ]
+
+    def reporte(self, top=20):
+        return {
+            "total_s": round(time.perf_counter() - self._inicio, 6),
+            "fases": {nombre: {"segundos": round(f["segundos"], 6), "veces": f["veces"]}
+                      for nombre, f in self.fases.items()},
+            "contadores": dict(sorted(self.contadores.items())),
+            "perfil": self.perfil(top),
+        }
+
+    def guardar(self, path, top=20):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.reporte(top), f, indent=2, ensure_ascii=False)
+
+    def mostrar(self, top=10):
+        reporte = self.reporte(top)
+        print("\n⏱️ INSTRUMENTACIÓN:")
+        for nombre, fase in reporte["fases"].items():
+            print(f"  {nombre:<14} {fase['segundos']:9.3f} s  ({fase['veces']}×)")
+        for nombre, cantidad in reporte["contadores"].items():
+            print(f"  🔢 {nombre}: {cantidad}")
+        for fila in reporte["perfil"]:
+            print(f"  🔥 {fila['tiempo_propio_s']:8.3f} s  {fila['llamadas']:>9}  {fila['funcion']}")
+
+    def terminar(self):
+        if self.archivo:
+            self.guardar(self.archivo)
+            print(f"💾 Reporte de instrumentación en {self.archivo}")
+        if self.archivo or self.perfilador is not None:
+            self.mostrar()
+
+
+class InstrumentacionNula(Instrumentacion):
+    """No mide nada; valor por defecto de los solvers."""
+
+    def fase(self, nombre):
+        return nullcontext()
+
+    def contar(self, nombre, cantidad=1):
+        pass
+
+    def sumar(self, contadores, prefijo=None):
+        pass
+
+    def terminar(self):
+        pass
+
+
+SIN_INSTRUMENTACION = InstrumentacionNula()
+
+
+def instrumentacion_desde_argv(argv):
+    """
+    Para los runners que leen sys.argv a mano: extrae `--perfil` y
+    `--reporte ARCHIVO.json` y devuelve (instrumentación, argumentos restantes).
+    """
+    perfil, archivo, resto, i = False, None, [], 0
+    while i < len(argv):
+        if argv[i] == "--perfil":
+            perfil = True
+        elif argv[i] == "--reporte" and i + 1 < len(argv):
+            archivo = argv[i + 1]
+            i += 1
+        else:
+            resto.append(argv[i])
+        i += 1
+    return Instrumentacion(perfil, archivo), resto
@@ -0,0 +1,109 @@
+import math
+import time
+
+
+class Presupuesto:
+    """
+    Criterio de parada común a las metaheurísticas (ACO, búsqueda tabú) y
+    registro de la mejor solución encontrada.
+
+    Se detiene por lo primero que ocurra:
+    - `segundos`: tiempo de reloj desde que se crea el presupuesto.
+    - `max_evaluaciones`: soluciones evaluadas (cada solver cuenta las
+      suyas: el ACO una por iteración de la colonia, la tabú una por vecino).
+    - `max_iteraciones`.
+    - `paciencia`: iteraciones seguidas sin mejorar la mejor solución en
+      más de `tolerancia`.
+
+    Es de un solo uso: el reloj arranca al crearlo. `mejor` y `mejor_costo`
+    se pueden consultar en cualquier momento (p. ej. desde un sumidero de
+    eventos o al vencer el plazo) y siempre tienen la mejor solución vista.
+
+    Uso dentro de un solver:
+
+        while presupuesto.continuar():
+            ...
+            presupuesto.contar(evaluaciones)
+            presupuesto.registrar(costo, solucion)
+    """
+
+    def __init__(self, segundos=None, max_evaluaciones=None, max_iteraciones=None,
+                 paciencia=None, tolerancia=1e-9):
+        self.segundos = segundos
+        self.max_evaluaciones = max_evaluaciones
+        self.max_iteraciones = max_iteraciones
+        self.paciencia = paciencia
+        self.tolerancia = tolerancia
+
+        self.inicio = time.perf_counter()
+        self.iteraciones = 0
+        self.evaluaciones = 0
+        self.iteracion_mejor = 0
+        self.mejor = None
+        self.mejor_costo = math.inf
+        self.motivo = None
+
+    @property
+    def transcurrido(self):
+        return time.perf_counter() - self.inicio
+
+    def restante(self):
+        """Segundos que quedan (inf sin límite de tiempo)."""
+        if self.segundos is None:
+            return math.inf
+        return max(self.segundos - self.transcurrido, 0.0)
+
+    def agotado(self):
+        """True si se cumplió algún criterio de parada; `motivo` dice cuál."""
+        if self.motivo is None:
+            if self.max_iteraciones is not None and self.iteraciones >= self.max_iteraciones:
+                self.motivo = "iteraciones"
+            elif self.max_evaluaciones is not None and self.evaluaciones >= self.max_evaluaciones:
+                self.motivo = "evaluaciones"
+            elif self.paciencia is not None and self.iteraciones - self.iteracion_mejor >= self.paciencia:
+                self.motivo = "estancamiento"
+            elif self.segundos is not None and self.transcurrido >= self.segundos:
+                self.motivo = "tiempo"
+        return self.motivo is not None
+
+    def continuar(self):
+        """
+        Cuenta una iteración más si queda presupuesto; False si hay que parar.
+        La primera iteración siempre se permite, para tener alguna solución.
+        """
+        if self.iteraciones > 0 and self.agotado():
+            return False
+        self.iteraciones += 1
+        return True
+
+    def detener(self, motivo):
+        """Termina antes por una razón propia del solver (p. ej. sin vecinos)."""
+        self.motivo = motivo
+
+    def contar(self, evaluaciones=1):
+        self.evaluaciones += evaluaciones
+
+    def mejora(self, costo):
+        return costo < self.mejor_costo - self.tolerancia
+
+    def registrar(self, costo, solucion):
+        """
+        Guarda `solucion` si mejora a la mejor (no se copia: el solver debe
+        pasar una que no vaya a modificar). Devuelve True si mejoró.
+        """
+        if not self.mejora(costo):
+            return False
+        self.mejor = solucion
+        self.mejor_costo = costo
+        self.iteracion_mejor = self.iteraciones
+        return True
+
+    def resumen(self):
+        return {
+            "motivo": self.motivo,
+            "iteraciones": self.iteraciones,
+            "evaluaciones": self.evaluaciones,
+            "segundos": self.transcurrido,
+            "iteracion_mejor": self.iteracion_mejor,
+            "mejor_costo": self.mejor_costo,
+        }
@@ -0,0 +1,150 @@
+import os
+import random
+import sys
+from typing import List, Protocol
+
+import numpy as np
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "algoritmos", "colonia_hormigas"))
+sys.path.insert(0, os.path.join(RAIZ, "algoritmos", "clarke_wright"))
+
+from algoritmos.busqueda_tabu.multiarranque import crear_tabu, ejecutar_multiarranque
+from algoritmos.busqueda_local.busqueda_local import mejorar_rutas
+from algoritmos.evaluador import CAPACIDAD_KG, DEMANDA_KG, AUTONOMIA_M, Evaluador
+from algoritmos.eventos import INFO, SIN_EVENTOS
+from algoritmos.instrumentacion import SIN_INSTRUMENTACION
+from clarke_wright import (construir_rutas, construir_rutas_paralelas,
+                           optimizar_rutas_distribuidas)
+from ant import Camion
+from aco import ejecutar_aco
+from entorno import crear_entorno
+
+NUM_CAMIONES = 3
+
+
+class Solver(Protocol):
+    """
+    Interfaz común de los algoritmos: reciben un `Problema` (instancias/instancia.py)
+    y devuelven una ruta por camión como lista de índices de la matriz. El
+    progreso se informa con `eventos` (algoritmos/eventos.py) y los
+    contadores del solver se suman a `instrumentacion` (algoritmos/instrumentacion.py).
+    Las metaheurísticas paran según `presupuesto` (algoritmos/presupuesto.py)
+    si se indica; los constructivos lo ignoran.
+    """
+
+    nombre: str
+
+    def resolver(self, problema, semilla=0, eventos=SIN_EVENTOS,
+                 instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, **parametros) -> List[List[int]]:
+        ...
+
+
+class ClarkeWrightSolver:
+    nombre = "Clarke & Wright"
+
+    def resolver(self, problema, semilla=0, eventos=SIN_EVENTOS,
+                 instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, modo="secuencial"):
+        p = problema
+        if modo == "secuencial":
+            brutas = construir_rutas(p.alcanzables, p.centro, p.matriz, p.vertedero, p.gasolineras)
+        else:
+            brutas = construir_rutas_paralelas(p.alcanzables, p.centro, p.matriz, vertedero_idx=p.vertedero,
+                                               gasolineras_idx=p.gasolineras)
+        finales = optimizar_rutas_distribuidas(brutas, p.matriz, p.indice_a_nodo,
+                                               p.centro, p.vertedero, p.gasolineras, eventos)
+        return [ruta["ruta_indices"] for ruta in finales]
+
+
+class ACOSolver:
+    nombre = "ACO (Ant Colony Optimization)"
+
+    def resolver(self, problema, semilla=0, eventos=SIN_EVENTOS,
+                 instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, iteraciones=20, **parametros):
+        p = problema
+        random.seed(semilla)
+        entorno = crear_entorno(p.sector, p.datos, p.matriz, p.nodo_a_indice, p.indice_a_nodo)
+        camiones = [Camion(p.centro, km_max=AUTONOMIA_M, kg_max=CAPACIDAD_KG) for _ in range(NUM_CAMIONES)]
+        feromonas = np.ones((len(p.matriz), len(p.matriz)))
+        camiones = ejecutar_aco(entorno, feromonas, camiones, iteraciones=iteraciones,
+                                eventos=eventos, presupuesto=presupuesto, **parametros)
+        instrumentacion.sumar(entorno.contadores, "aco")
+        return [camion.ruta for camion in camiones]
+
+
+class TabuSolver:
+    nombre = "Tabu Search"
+
+    def resolver(self, problema, semilla=0, eventos=SIN_EVENTOS,
+                 instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, max_iter=200, num_vecinos=30,
+                 k_vecinos=None):
+        random.seed(semilla)
+        ts = crear_tabu(problema, k_vecinos, NUM_CAMIONES)
+        ts.ejecutar_busqueda(max_iter=max_iter, num_vecinos=num_vecinos, eventos=eventos,
+                             presupuesto=presupuesto)
+        instrumentacion.sumar(ts.contadores, "tabu")
+        return ts.mejor_solucion
+
+
+class TabuMultiarranqueSolver:
+    nombre = "Tabu Search (multiarranque)"
+
+    def resolver(self, problema, semilla=0, eventos=SIN_EVENTOS,
+                 instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, **parametros):
+        # Del presupuesto se respetan el plazo y las evaluaciones (se reparten entre
+        # las trayectorias, que corren en otros procesos); no la paciencia
+        segundos = max_evaluaciones = None
+        if presupuesto is not None and presupuesto.segundos is not None:
+            segundos = presupuesto.restante()
+        if presupuesto is not None and presupuesto.max_evaluaciones is not None:
+            max_evaluaciones = presupuesto.max_evaluaciones - presupuesto.evaluaciones
+        resultado = ejecutar_multiarranque(problema.sector, semilla=semilla, segundos=segundos,
+                                           max_evaluaciones=max_evaluaciones,
+                                           directorio=problema.directorio, eventos=eventos,
+                                           **parametros)
+        instrumentacion.sumar({"evaluaciones": resultado["evaluaciones"]}, "tabu_multiarranque")
+        if presupuesto is not None:
+            presupuesto.contar(resultado["evaluaciones"])
+            presupuesto.registrar(resultado["costo"], resultado["mejor"])
+        return resultado["mejor"]
+
+
+SOLVERS = {
+    "clarke_wright": ClarkeWrightSolver(),
+    "aco": ACOSolver(),
+    "tabu": TabuSolver(),
+    "tabu_multiarranque": TabuMultiarranqueSolver(),
+}
+
+
+def resolver(nombre, problema, semilla=0, mejorar=False, eventos=SIN_EVENTOS,
+             instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, **parametros):
+    """
+    Resuelve `problema` con el solver registrado como `nombre` y, si se pide,
+    aplica la búsqueda local común a las rutas obtenidas. Al terminar emite
+    un evento "ruta" por camión, con la ruta por índices y su distancia.
+    Las fases "construccion" y "mejora" se miden en `instrumentacion`.
+    """
+    with instrumentacion.fase("construccion"):
+        rutas = SOLVERS[nombre].resolver(problema, semilla, eventos=eventos,
+                                         instrumentacion=instrumentacion, presupuesto=presupuesto,
+                                         **parametros)
+    if mejorar:
+        with instrumentacion.fase("mejora"):
+            rutas = mejorar_rutas(rutas, problema.matriz, problema.tachos, problema.vertedero,
+                                  problema.gasolineras, capacidad=CAPACIDAD_KG,
+                                  demanda=DEMANDA_KG, autonomia=AUTONOMIA_M, eventos=eventos,
+                                  instrumentacion=instrumentacion)
+    if eventos.escucha(INFO):
+        for camion, ruta in enumerate(rutas, 1):
+            eventos.emitir("ruta", INFO, solver=nombre, sector=problema.sector, camion=camion,
+                           paradas=len(ruta), distancia_m=distancia_total(problema.matriz, [ruta]),
+                           ruta=list(ruta))
+    return rutas
+
+
+def distancia_total(matriz, rutas):
+    """Suma de las distancias (m) de todas las rutas por índices, según el evaluador común."""
+    evaluador = Evaluador(matriz, ())
+    return float(sum(evaluador.distancia(ruta) for ruta in rutas))
@@ -0,0 +1,160 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from instancias.instancia import Instancia
+from algoritmos.solvers import resolver
+from algoritmos.evaluador import Evaluador, CAPACIDAD_KG, DEMANDA_KG, AUTONOMIA_M
+from algoritmos.eventos import SIN_EVENTOS
+from algoritmos.presupuesto import Presupuesto
+from evaluacion.comparador import (guardar_tabla, resumir, mostrar_resumen, guardar_baseline,
+                                   cargar_baseline, comparar_con_baseline)
+
+DATOS_DIR = "data"
+SALIDA_PATH = "evaluacion/resultados/benchmark.csv"
+
+# Grilla por defecto: cada solver recibe el producto cartesiano de sus listas
+GRILLA = {
+    "clarke_wright": {"modo": ["secuencial", "paralelo"], "mejorar": [False, True]},
+    "aco": {"iteraciones": [20], "vecinos": [None, 10], "mejorar": [False, True]},
+    "tabu": {"max_iter": [200], "k_vecinos": [None, 10], "mejorar": [False, True]},
+    "tabu_multiarranque": {"arranques": [6], "epocas": [5], "mejorar": [False, True]},
+}
+
+
+def evaluar_rutas(problema, rutas):
+    """
+    Métricas comunes: distancia total (m, inf si algún tramo no existe),
+    cobertura (fracción de tachos del sector a los que se llega y de los
+    que se sale por tramos con camino) y número de violaciones (tramos sin
+    camino, exceso de carga antes de cada descarga y exceso de autonomía
+    antes de cada recarga).
+    """
+    p = problema
+    evaluacion = Evaluador(p.matriz, p.tachos, p.vertedero, p.gasolineras,
+                           CAPACIDAD_KG, DEMANDA_KG, AUTONOMIA_M).evaluar(rutas)
+    return {
+        "distancia_m": evaluacion.distancia,
+        "cobertura": evaluacion.cobertura,
+        "violaciones": evaluacion.violaciones,
+    }
+
+
+def expandir_grilla(grilla):
+    """{"a": [1, 2], "b": [3]} -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]"""
+    claves = sorted(grilla)
+    return [dict(zip(claves, valores)) for valores in itertools.product(*(grilla[c] for c in claves))]
+
+
+def _resolver(problema, solver, semilla, parametros, presupuesto=None):
+    # El presupuesto es de un solo uso: uno nuevo por corrida
+    presupuesto = Presupuesto(**presupuesto) if presupuesto else None
+    return resolver(solver, problema, semilla, eventos=SIN_EVENTOS, presupuesto=presupuesto,
+                    **parametros)
+
+
+def ejecutar_caso(problema, solver, semilla, parametros, memoria=True, presupuesto=None):
+    """
+    Corre un solver (más la búsqueda local si `mejorar`) y mide el tiempo.
+    La memoria pico se mide en una segunda corrida con la misma semilla bajo
+    tracemalloc, para que su sobrecosto no afecte el tiempo medido.
+    `presupuesto` son los argumentos de un `Presupuesto` (p. ej.
+    {"max_evaluaciones": 36000}) para comparar metaheurísticas con el mismo
+    esfuerzo; los constructivos lo ignoran.
+    """
+    inicio = time.perf_counter()
+    rutas = _resolver(problema, solver, semilla, parametros, presupuesto)
+    tiempo = time.perf_counter() - inicio
+
+    pico = float("nan")
+    if memoria:
+        tracemalloc.start()
+        _resolver(problema, solver, semilla, parametros, presupuesto)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"tiempo_s": tiempo, "memoria_pico_mb": pico / 2**20, **evaluar_rutas(problema, rutas)}
+
+
+def ejecutar_benchmark(solvers=None, sectores=("este", "oeste"), semillas=(0, 1, 2),
+                       grilla=None, directorio=DATOS_DIR, memoria=True, verbose=True,
+                       presupuesto=None):
+    """
+    Ejecuta cada solver × sector × semilla × combinación de parámetros y
+    devuelve la tabla de resultados como lista de diccionarios. `directorio`
+    puede ser el de una instancia sintética (instancias/generar_sintetica.py).
+    """
+    grilla = grilla or GRILLA
+    solvers = solvers or list(grilla)
+    instancia = Instancia(directorio)
+
+    filas = []
+    for sector in sectores:
+        problema = instancia.problema(sector)
+        for solver in solvers:
+            for parametros in expandir_grilla(grilla.get(solver, {})):
+                etiqueta = ",".join(f"{k}={v}" for k, v in parametros.items())
+                for semilla in semillas:
+                    metricas = ejecutar_caso(problema, solver, semilla, parametros, memoria,
+                                             presupuesto)
+                    fila = {"solver": solver, "sector": sector, "parametros": etiqueta,
+                            "semilla": semilla, **metricas}
+                    filas.append(fila)
+                    if verbose:
+                        print(f"  ⏱️ {solver:<14} {sector:<6} {etiqueta:<40} semilla={semilla} "
+                              f"{metricas['tiempo_s']:.3f} s  {metricas['distancia_m']:.1f} m  "
+                              f"cobertura={metricas['cobertura']:.2f}")
+    return filas
+
+
+if __name__ == "__main__":
+    # Uso: python evaluacion/benchmark.py [--solvers aco,tabu] [--semillas 3] [--baseline base.json]
+    parser = argparse.ArgumentParser(description="Benchmark de los algoritmos de ruteo")
+    parser.add_argument("--solvers", default=",".join(GRILLA))
+    parser.add_argument("--sectores", default="este,oeste")
+    parser.add_argument("--semillas", type=int, default=3)
+    parser.add_argument("--datos", default=DATOS_DIR, help="Directorio de la instancia")
+    parser.add_argument("--salida", default=SALIDA_PATH, help="CSV (o .parquet si hay pandas)")
+    parser.add_argument("--guardar-baseline", help="Guarda el resumen como línea base (JSON)")
+    parser.add_argument("--baseline", help="Falla si hay regresiones respecto a esta línea base")
+    parser.add_argument("--tolerancia-tiempo", type=float, default=0.25)
+    parser.add_argument("--margen-tiempo", type=float, default=0.05,
+                        help="Holgura absoluta (s) para no marcar ruido en corridas muy cortas")
+    parser.add_argument("--tolerancia-distancia", type=float, default=0.02)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir la memoria pico")
+    parser.add_argument("--segundos", type=float, help="Mismo plazo para cada metaheurística")
+    parser.add_argument("--max-evaluaciones", type=int,
+                        help="Mismo número de soluciones evaluadas para cada metaheurística")
+    args = parser.parse_args()
+
+    presupuesto = {clave: valor for clave, valor in (("segundos", args.segundos),
+                                                      ("max_evaluaciones", args.max_evaluaciones))
+                   if valor is not None}
+    print("🧪 Ejecutando benchmark...")
+    filas = ejecutar_benchmark(args.solvers.split(","), args.sectores.split(","),
+                               range(args.semillas), directorio=args.datos,
+                               memoria=not args.sin_memoria, presupuesto=presupuesto)
+    archivo = guardar_tabla(filas, args.salida)
+    resumen = resumir(filas)
+    mostrar_resumen(resumen)
+    print(f"\n💾 Resultados guardados en {archivo}")
+
+    if args.guardar_baseline:
+        guardar_baseline(resumen, args.guardar_baseline)
+        print(f"📌 Línea base guardada en {args.guardar_baseline}")
+
+    if args.baseline:
+        regresiones = comparar_con_baseline(resumen, cargar_baseline(args.baseline),
+                                            args.tolerancia_tiempo, args.tolerancia_distancia,
+                                            args.margen_tiempo)
+        if regresiones:
+            print("\n🚨 Regresiones respecto a la línea base:")
+            for r in regresiones:
+                print(f"  - {r}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones respecto a la línea base")
@@ -1 +1,150 @@
-print("comparar")
\ No newline at end of file
+import csv
+import json
+import math
+import os
+import statistics
+import sys
+
+# Columnas de la tabla de resultados del benchmark
+CLAVES = ("solver", "sector", "parametros")
+METRICAS = ("tiempo_s", "memoria_pico_mb", "distancia_m", "cobertura", "violaciones")
+COLUMNAS = CLAVES + ("semilla",) + METRICAS
+
+
+def guardar_tabla(filas, path):
+    """
+    Guarda las filas (diccionarios) en CSV. Si el archivo termina en
+    .parquet y pandas está instalado, se guarda en Parquet.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            path = path[:-len(".parquet")] + ".csv"
+            print(f"⚠️ pandas no está instalado, se guarda en CSV: {path}")
+        else:
+            pd.DataFrame(filas, columns=COLUMNAS).to_parquet(path, index=False)
+            return path
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow({c: fila.get(c) for c in COLUMNAS})
+    return path
+
+
+def leer_tabla(path):
+    """Lee una tabla de resultados (CSV o Parquet) como lista de diccionarios."""
+    if path.endswith(".parquet"):
+        import pandas as pd
+        return pd.read_parquet(path).to_dict("records")
+
+    with open(path, "r", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    for fila in filas:
+        fila["semilla"] = int(fila["semilla"])
+        for m in METRICAS:
+            fila[m] = float(fila[m])
+    return filas
+
+
+def _estadisticas(valores):
+    valores = [v for v in valores if not math.isnan(v)] or [math.nan]
+    finitos = [v for v in valores if math.isfinite(v)]
+    return {
+        "media": statistics.fmean(valores),
+        "desv": statistics.pstdev(finitos) if len(finitos) > 1 else 0.0,
+        "min": min(valores),
+        "max": max(valores),
+    }
+
+
+def resumir(filas):
+    """
+    Agrupa las filas por (solver, sector, parametros) y calcula media,
+    desviación, mínimo y máximo de cada métrica sobre las semillas.
+    """
+    grupos = {}
+    for fila in filas:
+        grupos.setdefault(tuple(fila[c] for c in CLAVES), []).append(fila)
+
+    resumen = {}
+    for clave, grupo in sorted(grupos.items()):
+        resumen["|".join(clave)] = {
+            "n": len(grupo),
+            **{m: _estadisticas([f[m] for f in grupo]) for m in METRICAS},
+        }
+    return resumen
+
+
+def mostrar_resumen(resumen):
+    print(f"\n{'solver | sector | parámetros':<58} {'n':>3} {'tiempo (s)':>11} "
+          f"{'mem (MB)':>9} {'distancia (m)':>14} {'cobertura':>10} {'viol.':>6}")
+    print("-" * 116)
+    for clave, r in resumen.items():
+        print(f"{clave:<58} {r['n']:>3} {r['tiempo_s']['media']:>11.3f} "
+              f"{r['memoria_pico_mb']['media']:>9.2f} {r['distancia_m']['media']:>14.1f} "
+              f"{r['cobertura']['media']:>10.3f} {r['violaciones']['media']:>6.1f}")
+
+
+def guardar_baseline(resumen, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2)
+
+
+def cargar_baseline(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def comparar_con_baseline(resumen, baseline, tolerancia_tiempo=0.25, tolerancia_distancia=0.02,
+                          margen_tiempo=0.05):
+    """
+    Devuelve la lista de regresiones respecto a la línea base (vacía si no hay):
+    - tiempo medio mayor que base * (1 + tolerancia_tiempo) + margen_tiempo (s)
+    - distancia media mayor que base * (1 + tolerancia_distancia)
+    - cobertura media menor que la base
+    Solo se comparan las configuraciones presentes en ambos resúmenes.
+    """
+    regresiones = []
+    for clave, actual in resumen.items():
+        base = baseline.get(clave)
+        if base is None:
+            continue
+        t, t0 = actual["tiempo_s"]["media"], base["tiempo_s"]["media"]
+        d, d0 = actual["distancia_m"]["media"], base["distancia_m"]["media"]
+        c, c0 = actual["cobertura"]["media"], base["cobertura"]["media"]
+        if t > t0 * (1 + tolerancia_tiempo) + margen_tiempo:
+            regresiones.append(f"{clave}: tiempo {t:.3f} s > {t0:.3f} s (+{tolerancia_tiempo:.0%})")
+        if d > d0 * (1 + tolerancia_distancia):
+            regresiones.append(f"{clave}: distancia {d:.1f} m > {d0:.1f} m (+{tolerancia_distancia:.0%})")
+        if c < c0 - 1e-9:
+            regresiones.append(f"{clave}: cobertura {c:.3f} < {c0:.3f}")
+    return regresiones
+
+
+def comparar_resultados(archivos):
+    """
+    Compara archivos JSON de resultados de los runners
+    ({total_distance, routes, execution_time, algorithm}).
+    """
+    print(f"\n{'archivo':<45} {'algoritmo':<32} {'distancia':>12} {'tiempo (s)':>11} {'rutas':>6}")
+    print("-" * 110)
+    for path in archivos:
+        with open(path, "r", encoding="utf-8") as f:
+            r = json.load(f)
+        print(f"{os.path.basename(path):<45} {r.get('algorithm', '?'):<32} "
+              f"{r['total_distance']:>12.2f} {r['execution_time']:>11.2f} {len(r['routes']):>6}")
+
+
+if __name__ == "__main__":
+    # Uso: python evaluacion/comparador.py resultados.csv | archivo1.json archivo2.json ...
+    if len(sys.argv) < 2:
+        print("Uso: python evaluacion/comparador.py [tabla.csv|tabla.parquet] | [resultado.json ...]")
+        exit(1)
+    if sys.argv[1].endswith((".csv", ".parquet")):
+        mostrar_resumen(resumir(leer_tabla(sys.argv[1])))
+    else:
+        comparar_resultados(sys.argv[1:])
@@ -0,0 +1,108 @@
+import json
+import os
+import struct
+import numpy as np
+
+from instancias.grafo_csr import GRAFO_PATH, hash_cacheado
+
+ALMACEN_PATH = "data/matriz_distancias.bin"
+
+MAGICO = b"MATRIZD\0"
+VERSION = 1
+ALINEACION = 64
+
+# Codificaciones soportadas y su dtype en disco
+CODIFICACIONES = {
+    "float64": np.dtype("<f8"),
+    "float32": np.dtype("<f4"),
+    "uint32_m": np.dtype("<u4"),
+}
+# En "uint32_m" las distancias se guardan en metros enteros y este valor marca "sin camino"
+SIN_CAMINO_U32 = np.iinfo(np.uint32).max
+
+
+def guardar_almacen(matriz, indice_a_nodo, path=ALMACEN_PATH, hash_grafo="", codificacion="float64"):
+    """
+    Guarda la matriz en un archivo binario con cabecera versionada:
+    [MAGICO][version u32][largo cabecera u32][cabecera JSON][relleno][datos]
+
+    La cabecera incluye el mapeo índice→nodo OSM y el hash del grafo de origen,
+    y los datos quedan alineados para poder abrirlos con `np.memmap`.
+    """
+    if codificacion not in CODIFICACIONES:
+        raise ValueError(f"Codificación no soportada: {codificacion}")
+
+    dtype = CODIFICACIONES[codificacion]
+    if codificacion == "uint32_m":
+        datos = np.where(np.isfinite(matriz), np.rint(matriz), SIN_CAMINO_U32).astype(dtype)
+    else:
+        datos = np.ascontiguousarray(matriz, dtype=dtype)
+
+    cabecera = json.dumps({
+        "version": VERSION,
+        "codificacion": codificacion,
+        "dtype": dtype.str,
+        "forma": list(datos.shape),
+        "hash_grafo": hash_grafo,
+        "indice_a_nodo": {str(k): int(v) for k, v in indice_a_nodo.items()},
+    }).encode("utf-8")
+
+    inicio = len(MAGICO) + 8 + len(cabecera)
+    relleno = (-inicio) % ALINEACION
+
+    with open(path, "wb") as f:
+        f.write(MAGICO)
+        f.write(struct.pack("<II", VERSION, len(cabecera) + relleno))
+        f.write(cabecera + b" " * relleno)
+        f.write(datos.tobytes())
+
+
+def leer_cabecera(path=ALMACEN_PATH):
+    """
+    Devuelve (cabecera, offset) donde offset es la posición de los datos.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGICO)) != MAGICO:
+            raise ValueError(f"{path} no es un almacén de matriz válido")
+        version, largo = struct.unpack("<II", f.read(8))
+        if version > VERSION:
+            raise ValueError(f"Versión de almacén {version} no soportada (máxima {VERSION})")
+        cabecera = json.loads(f.read(largo).decode("utf-8"))
+    return cabecera, len(MAGICO) + 8 + largo
+
+
+def cargar_almacen(path=ALMACEN_PATH, mmap_mode="r", grafo_path=GRAFO_PATH):
+    """
+    Abre el almacén y devuelve (matriz, nodo_a_indice, indice_a_nodo).
+
+    Con codificación float64/float32 la matriz es un `np.memmap` de solo
+    lectura: varios procesos que abren el mismo archivo comparten las mismas
+    páginas en caché. Con "uint32_m" se decodifica a float32 (inf = sin camino).
+
+    Si `grafo_path` existe y su hash no coincide con el de la cabecera se
+    lanza ValueError: la matriz está desactualizada respecto al grafo. El
+    hash se toma de la huella guardada junto al GraphML mientras su tamaño
+    y fecha de modificación no cambien (ver `hash_cacheado`).
+    """
+    cabecera, offset = leer_cabecera(path)
+
+    if grafo_path and cabecera.get("hash_grafo") and os.path.exists(grafo_path):
+        if hash_cacheado(grafo_path) != cabecera["hash_grafo"]:
+            raise ValueError(
+                f"La matriz {path} fue generada con otra versión de {grafo_path}; "
+                "vuelve a ejecutar instancias/generar_matriz.py"
+            )
+
+    dtype = np.dtype(cabecera["dtype"])
+    forma = tuple(cabecera["forma"])
+    if mmap_mode:
+        matriz = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=forma)
+    else:
+        matriz = np.fromfile(path, dtype=dtype, offset=offset).reshape(forma)
+
+    if cabecera["codificacion"] == "uint32_m":
+        matriz = np.where(matriz == SIN_CAMINO_U32, np.inf, matriz).astype(np.float32)
+
+    indice_a_nodo = {int(k): v for k, v in cabecera["indice_a_nodo"].items()}
+    nodo_a_indice = {v: k for k, v in indice_a_nodo.items()}
+    return matriz, nodo_a_indice, indice_a_nodo
@@ -1,12 +1,26 @@
 import numpy as np
 import json
+import os
 
-def cargar_matriz_y_indices():
-    matriz = np.load("data/matriz_distancias.npy")
-    
-    with open("data/indices_nodos.json", "r") as f:
+from instancias.almacen_matriz import cargar_almacen
+
+
+def cargar_matriz_y_indices(directorio="data", mmap_mode="r"):
+    """
+    Devuelve (matriz, nodo_a_indice, indice_a_nodo). Si existe el almacén
+    binario (matriz_distancias.bin) la matriz se abre memory-mapped y el
+    índice sale de su cabecera; si no, se leen el .npy y los dos JSON.
+    """
+    almacen = os.path.join(directorio, "matriz_distancias.bin")
+    if os.path.exists(almacen):
+        return cargar_almacen(almacen, mmap_mode=mmap_mode,
+                              grafo_path=os.path.join(directorio, "grafo_paucarpata.graphml"))
+
+    matriz = np.load(os.path.join(directorio, "matriz_distancias.npy"))
+
+    with open(os.path.join(directorio, "indices_nodos.json"), "r") as f:
         indice_a_nodo = json.load(f)
-    with open("data/nodos_indices.json", "r") as f:
+    with open(os.path.join(directorio, "nodos_indices.json"), "r") as f:
         nodo_a_indice = json.load(f)
 
     indice_a_nodo = {int(k): v for k, v in indice_a_nodo.items()}
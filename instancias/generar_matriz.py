@@ -1,59 +1,248 @@
-import networkx as nx
-import osmnx as ox
+import os
+import sys
 import numpy as np
 import json
-import os
-import matplotlib.pyplot as plt
-
-G = ox.load_graphml("data/grafo_paucarpata.graphml")
-with open ("data/datos_extra.json", "r") as f:
-    datos = json.load(f)
-
-nodos_relevantes = (
-    [datos["nodo_centro"]] +
-    [datos["nodo_vertedero"]] +
-    datos["tachos_este"] +
-    datos["tachos_oeste"]+
-    datos["puntos_gasolineras"]
-)
-
-indice_a_nodo = {}
-for i in range(len(nodos_relevantes)):
-    nodo = nodos_relevantes[i]
-    indice_a_nodo[i] = nodo
-
-nodo_a_indice = {}
-for i, nodo in indice_a_nodo.items():
-    nodo_a_indice[nodo] = i
-
-with open("data/nodos_indices.json", "w") as f:
-    json.dump(nodo_a_indice, f, indent=4)
-
-matriz_path = "data/matriz_distancias.npy"
-indices_path = "data/indices_nodos.json"
-
-#if not os.path.exists(matriz_path) or not os.path.exists(indices_path):
-n = len(nodos_relevantes)
-matriz = np.zeros((n, n))
-
-for i in range(n):
-    for j in range(n):
-        if i == j:
-            matriz[i][j] = 0
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from instancias.grafo_csr import cargar_grafo_csr
+from instancias.almacen_matriz import ALMACEN_PATH, guardar_almacen, leer_cabecera
+
+GRAFO_PATH = "data/grafo_paucarpata.graphml"
+DATOS_PATH = "data/datos_extra.json"
+MATRIZ_PATH = "data/matriz_distancias.npy"
+INDICES_PATH = "data/indices_nodos.json"
+NODOS_PATH = "data/nodos_indices.json"
+
+# Grafo compartido por los procesos del pool (se asigna en el inicializador)
+_grafo_worker = None
+
+
+def obtener_nodos_relevantes(datos):
+    """
+    Devuelve la lista ordenada de nodos relevantes: centro, vertedero,
+    tachos este, tachos oeste y gasolineras. La posición en la lista es
+    el índice del nodo en la matriz.
+    """
+    return (
+        [datos["nodo_centro"]] +
+        [datos["nodo_vertedero"]] +
+        datos["tachos_este"] +
+        datos["tachos_oeste"] +
+        datos["puntos_gasolineras"]
+    )
+
+
+def calcular_fila(grafo, origen, nodos_relevantes):
+    """
+    Ejecuta un único Dijkstra desde `origen` sobre el grafo CSR y devuelve
+    la fila de distancias hacia todos los nodos relevantes (inf si no hay camino).
+    """
+    return grafo.distancias_desde(origen, nodos_relevantes)
+
+
+def _inicializar_worker(grafo):
+    global _grafo_worker
+    _grafo_worker = grafo
+
+
+def _calcular_fila_worker(args):
+    origen, destinos = args
+    return calcular_fila(_grafo_worker, origen, destinos)
+
+
+def calcular_filas(grafo, origenes, destinos, procesos=None):
+    """
+    Devuelve una matriz len(origenes) x len(destinos) con un Dijkstra por
+    origen. Si `procesos` es mayor a 1 las filas se calculan en un pool de
+    procesos; cada proceso recibe el grafo una sola vez al iniciar.
+    """
+    filas = np.zeros((len(origenes), len(destinos)))
+
+    if procesos and procesos > 1:
+        tareas = [(origen, destinos) for origen in origenes]
+        with ProcessPoolExecutor(max_workers=procesos,
+                                 initializer=_inicializar_worker,
+                                 initargs=(grafo,)) as pool:
+            for i, fila in enumerate(pool.map(_calcular_fila_worker, tareas, chunksize=8)):
+                filas[i] = fila
+    else:
+        for i, origen in enumerate(origenes):
+            filas[i] = calcular_fila(grafo, origen, destinos)
+
+    return filas
+
+
+def construir_matriz(grafo, nodos_relevantes, procesos=None):
+    """
+    Construye la matriz de distancias con una búsqueda de Dijkstra por nodo
+    relevante (n búsquedas en lugar de n² consultas origen-destino).
+    """
+    matriz = calcular_filas(grafo, nodos_relevantes, nodos_relevantes, procesos=procesos)
+    np.fill_diagonal(matriz, 0)
+    return matriz
+
+
+def actualizar_matriz(grafo, nodos_relevantes, matriz, indice_a_nodo, procesos=None):
+    """
+    Actualiza una matriz existente al nuevo conjunto de nodos relevantes
+    sin recalcularla completa:
+    - Los nodos que se mantienen conservan su índice.
+    - Los nodos eliminados liberan su índice (fila y columna quedan en inf).
+    - Los nodos nuevos ocupan primero los índices libres y luego se agregan
+      al final; solo se calculan sus filas (Dijkstra directo) y columnas
+      (Dijkstra sobre el grafo transpuesto).
+
+    Devuelve (matriz, indice_a_nodo, agregados, eliminados).
+    """
+    relevantes = list(dict.fromkeys(nodos_relevantes))
+    conjunto = set(relevantes)
+    nodo_a_indice = {nodo: idx for idx, nodo in indice_a_nodo.items()}
+
+    eliminados = [nodo for nodo in nodo_a_indice if nodo not in conjunto]
+    agregados = [nodo for nodo in relevantes if nodo not in nodo_a_indice]
+
+    nuevo_indice = {idx: nodo for idx, nodo in indice_a_nodo.items() if nodo in conjunto}
+    libres = sorted(nodo_a_indice[nodo] for nodo in eliminados)
+    siguiente = len(matriz)
+    for nodo in agregados:
+        if libres:
+            idx = libres.pop(0)
         else:
-            try:
-                distancia = nx.shortest_path_length(G, 
-                                                    source = indice_a_nodo[i], 
-                                                    target = indice_a_nodo[j], 
-                                                    weight = "length")
-                matriz[i][j] = distancia
-
-            except nx.NetworkXNoPath:
-                matriz[i][j] = np.inf
-
-np.save(matriz_path, matriz)
-with open(indices_path, "w") as f:
-    json.dump(indice_a_nodo, f, indent=4)
-#else:
- #   print("Los archivos ya existen, no se generarán de nuevo.")
+            idx = siguiente
+            siguiente += 1
+        nuevo_indice[idx] = nodo
+
+    # Índices libres al final de la matriz se recortan
+    n = max(nuevo_indice) + 1 if nuevo_indice else 0
+    n_comun = min(n, len(matriz))
+    nueva = np.full((n, n), np.inf)
+    nueva[:n_comun, :n_comun] = matriz[:n_comun, :n_comun]
+
+    for idx in range(n):
+        if idx not in nuevo_indice:
+            nueva[idx, :] = np.inf
+            nueva[:, idx] = np.inf
+
+    if agregados:
+        indices_destino = sorted(nuevo_indice)
+        destinos = [nuevo_indice[idx] for idx in indices_destino]
+        conjunto_agregados = set(agregados)
+        indices_agregados = [idx for idx in indices_destino if nuevo_indice[idx] in conjunto_agregados]
+        origenes = [nuevo_indice[idx] for idx in indices_agregados]
+
+        filas = calcular_filas(grafo, origenes, destinos, procesos=procesos)
+        columnas = calcular_filas(grafo.transpuesta(), origenes, destinos, procesos=procesos)
+        for k, idx in enumerate(indices_agregados):
+            nueva[idx, indices_destino] = filas[k]
+            nueva[indices_destino, idx] = columnas[k]
+
+    np.fill_diagonal(nueva, 0)
+    return nueva, nuevo_indice, agregados, eliminados
+
+
+def cargar_indices_guardados(indices_path=INDICES_PATH):
+    with open(indices_path, "r") as f:
+        return {int(k): int(v) for k, v in json.load(f).items()}
+
+
+def guardar_matriz_e_indices(matriz, nodos_relevantes,
+                             matriz_path=MATRIZ_PATH,
+                             indices_path=INDICES_PATH,
+                             nodos_path=NODOS_PATH,
+                             almacen_path=ALMACEN_PATH,
+                             hash_grafo="",
+                             codificacion="float64"):
+    """
+    Guarda la matriz y los dos archivos de índices (índice→nodo y nodo→índice),
+    además del almacén binario memory-mapped con el índice y el hash del grafo.
+    `nodos_relevantes` puede ser la lista ordenada de nodos o un diccionario
+    índice→nodo (con huecos si hubo nodos eliminados).
+    """
+    if isinstance(nodos_relevantes, dict):
+        indice_a_nodo = dict(sorted(nodos_relevantes.items()))
+    else:
+        indice_a_nodo = {i: nodo for i, nodo in enumerate(nodos_relevantes)}
+    nodo_a_indice = {nodo: i for i, nodo in indice_a_nodo.items()}
+
+    np.save(matriz_path, matriz)
+    with open(indices_path, "w") as f:
+        json.dump(indice_a_nodo, f, indent=4)
+    with open(nodos_path, "w") as f:
+        json.dump(nodo_a_indice, f, indent=4)
+    if almacen_path:
+        guardar_almacen(matriz, indice_a_nodo, almacen_path,
+                        hash_grafo=hash_grafo, codificacion=codificacion)
+
+    return indice_a_nodo, nodo_a_indice
+
+
+def matriz_previa_valida(grafo):
+    """
+    Indica si hay una matriz previa en disco generada con este mismo grafo.
+    """
+    if not (os.path.exists(MATRIZ_PATH) and os.path.exists(INDICES_PATH)):
+        return False
+    if os.path.exists(ALMACEN_PATH):
+        cabecera, _ = leer_cabecera(ALMACEN_PATH)
+        return cabecera.get("hash_grafo") in ("", grafo.hash_origen)
+    return True
+
+
+def generar_matriz(grafo_path=GRAFO_PATH, datos_path=DATOS_PATH, procesos=None,
+                   incremental=False, codificacion="float64"):
+    """
+    Carga el grafo y los datos extra, construye la matriz de distancias y
+    escribe la matriz y los índices en una sola pasada.
+
+    Con `incremental=True` y una matriz previa generada con el mismo grafo
+    solo se calculan las filas y columnas de los nodos agregados
+    (ver `actualizar_matriz`).
+    """
+    grafo = cargar_grafo_csr(grafo_path)
+    with open(datos_path, "r") as f:
+        datos = json.load(f)
+
+    nodos_relevantes = obtener_nodos_relevantes(datos)
+
+    if incremental and matriz_previa_valida(grafo):
+        inicio = time.time()
+        matriz, indice_a_nodo, agregados, eliminados = actualizar_matriz(
+            grafo, nodos_relevantes, np.load(MATRIZ_PATH),
+            cargar_indices_guardados(), procesos=procesos
+        )
+        duracion = time.time() - inicio
+
+        guardar_matriz_e_indices(matriz, indice_a_nodo, hash_grafo=grafo.hash_origen,
+                                 codificacion=codificacion)
+
+        print(f"📐 Matriz {len(matriz)}x{len(matriz)} actualizada en {duracion:.2f} s")
+        print(f"  ➕ Nodos agregados: {len(agregados)}")
+        print(f"  ➖ Nodos eliminados: {len(eliminados)}")
+        return matriz
+
+    inicio = time.time()
+    matriz = construir_matriz(grafo, nodos_relevantes, procesos=procesos)
+    duracion = time.time() - inicio
+
+    guardar_matriz_e_indices(matriz, nodos_relevantes, hash_grafo=grafo.hash_origen,
+                             codificacion=codificacion)
+
+    print(f"📐 Matriz {len(nodos_relevantes)}x{len(nodos_relevantes)} generada en {duracion:.2f} s")
+    print(f"  🚫 Pares sin camino: {int(np.isinf(matriz).sum())}")
+    return matriz
+
 
+if __name__ == "__main__":
+    # Uso: python instancias/generar_matriz.py [--incremental] [--float32|--uint32] [procesos]
+    argumentos = sys.argv[1:]
+    incremental = "--incremental" in argumentos
+    codificacion = "float64"
+    if "--float32" in argumentos:
+        codificacion = "float32"
+    elif "--uint32" in argumentos:
+        codificacion = "uint32_m"
+    argumentos = [a for a in argumentos if not a.startswith("--")]
+    procesos = int(argumentos[0]) if argumentos else None
+    generar_matriz(procesos=procesos, incremental=incremental, codificacion=codificacion)
@@ -0,0 +1,278 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from instancias.grafo_csr import GRAFO_PATH, GrafoCSR, cargar_grafo_csr, hash_archivo, ruta_cache
+from instancias.generar_matriz import construir_matriz, guardar_matriz_e_indices, obtener_nodos_relevantes
+
+TIPOS = ("grilla", "geometrico", "perturbado")
+
+# Referencia para convertir metros a coordenadas (zona de Paucarpata)
+LON_REFERENCIA = -71.48
+LAT_REFERENCIA = -16.42
+METROS_POR_GRADO_LAT = 110540.0
+SEPARACION_M = 100.0
+
+
+def _a_coordenadas(x_m, y_m):
+    """Convierte coordenadas planas en metros a (lon, lat) alrededor de la referencia."""
+    metros_por_grado_lon = 111320.0 * math.cos(math.radians(LAT_REFERENCIA))
+    return LON_REFERENCIA + x_m / metros_por_grado_lon, LAT_REFERENCIA + y_m / METROS_POR_GRADO_LAT
+
+
+def _aristas_con_largo(origenes, destinos, x_m, y_m, rng, curvatura=0.15):
+    """
+    Diccionario {(u, v): largo} con el largo euclidiano multiplicado por un
+    factor aleatorio en [1, 1 + curvatura] (las calles no son rectas).
+    """
+    largo = np.hypot(x_m[origenes] - x_m[destinos], y_m[origenes] - y_m[destinos])
+    largo *= rng.uniform(1.0, 1.0 + curvatura, size=len(largo))
+    return dict(zip(zip(origenes.tolist(), destinos.tolist()), largo.tolist()))
+
+
+def grafo_grilla(num_nodos, rng, prob_una_via=0.3, prob_corte=0.05):
+    """
+    Cuadrícula de calles con intersecciones desplazadas al azar. Cada fila y
+    columna es de una vía con probabilidad `prob_una_via` (sentido alternado,
+    como en un damero) y se corta un `prob_corte` de los tramos.
+    """
+    lado = max(2, math.ceil(math.sqrt(num_nodos)))
+    i, j = np.divmod(np.arange(lado * lado), lado)
+    x_m = j * SEPARACION_M + rng.uniform(-0.25, 0.25, lado * lado) * SEPARACION_M
+    y_m = i * SEPARACION_M + rng.uniform(-0.25, 0.25, lado * lado) * SEPARACION_M
+
+    una_via_fila = rng.random(lado) < prob_una_via
+    una_via_columna = rng.random(lado) < prob_una_via
+
+    origenes, destinos = [], []
+    # Tramos horizontales (u -> u + 1, a lo largo de la fila i) y
+    # verticales (u -> u + lado, a lo largo de la columna j)
+    for paso, una_via, linea, hay_siguiente in (
+        (1, una_via_fila, i, j < lado - 1),
+        (lado, una_via_columna, j, i < lado - 1),
+    ):
+        u = np.flatnonzero(hay_siguiente)
+        u = u[rng.random(len(u)) >= prob_corte]
+        v = u + paso
+        numero = linea[u]
+        ida = ~una_via[numero] | (numero % 2 == 0)
+        vuelta = ~una_via[numero] | (numero % 2 == 1)
+        origenes += [u[ida], v[vuelta]]
+        destinos += [v[ida], u[vuelta]]
+
+    origenes, destinos = np.concatenate(origenes), np.concatenate(destinos)
+    return x_m, y_m, _aristas_con_largo(origenes, destinos, x_m, y_m, rng)
+
+
+def grafo_geometrico(num_nodos, rng, k=3):
+    """
+    Grafo geométrico aleatorio: puntos uniformes en un cuadrado y cada punto
+    unido (en ambos sentidos) con sus k vecinos más cercanos. Los vecinos se
+    buscan por celdas para no calcular todas las distancias.
+    """
+    lado_m = math.sqrt(num_nodos) * SEPARACION_M
+    x_m = rng.uniform(0, lado_m, num_nodos)
+    y_m = rng.uniform(0, lado_m, num_nodos)
+
+    tam_celda = 2 * SEPARACION_M
+    cx = (x_m // tam_celda).astype(np.int64)
+    cy = (y_m // tam_celda).astype(np.int64)
+    celdas = {}
+    for p, clave in enumerate(zip(cx.tolist(), cy.tolist())):
+        celdas.setdefault(clave, []).append(p)
+    celdas = {c: np.array(ps) for c, ps in celdas.items()}
+
+    origenes, destinos = [], []
+    for (a, b), puntos in celdas.items():
+        candidatos = np.concatenate([celdas[(a + da, b + db)]
+                                     for da in (-1, 0, 1) for db in (-1, 0, 1)
+                                     if (a + da, b + db) in celdas])
+        d = np.hypot(x_m[puntos][:, None] - x_m[candidatos][None, :],
+                     y_m[puntos][:, None] - y_m[candidatos][None, :])
+        d[puntos[:, None] == candidatos[None, :]] = np.inf
+        kk = min(k, len(candidatos) - 1)
+        if kk <= 0:
+            continue
+        cercanos = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+        finitos = np.isfinite(np.take_along_axis(d, cercanos, axis=1))
+        u = np.repeat(puntos, kk)[finitos.ravel()]
+        v = candidatos[cercanos].ravel()[finitos.ravel()]
+        origenes += [u, v]
+        destinos += [v, u]
+
+    origenes, destinos = np.concatenate(origenes), np.concatenate(destinos)
+    return x_m, y_m, _aristas_con_largo(origenes, destinos, x_m, y_m, rng, curvatura=0.2)
+
+
+def grafo_perturbado(rng, base_path=GRAFO_PATH, variacion=0.1):
+    """
+    Copia del grafo de Paucarpata con el largo de cada arista multiplicado
+    por un factor en [1 - variacion, 1 + variacion]. Conserva los ids OSM.
+    """
+    base = cargar_grafo_csr(base_path)
+    origenes = np.repeat(np.arange(base.num_nodos), np.diff(base.indptr))
+    pesos = base.pesos * rng.uniform(1 - variacion, 1 + variacion, size=base.num_aristas)
+    aristas = dict(zip(zip(base.nodos[origenes].tolist(), base.nodos[base.indices].tolist()),
+                       pesos.tolist()))
+    return GrafoCSR._desde_aristas(base.nodos.tolist(), base.x, base.y, aristas)
+
+
+def construir_grafo(tipo, num_nodos, rng):
+    """Devuelve un GrafoCSR del tipo pedido (ids de nodo enteros)."""
+    if tipo == "perturbado":
+        return grafo_perturbado(rng)
+    if tipo == "grilla":
+        x_m, y_m, aristas = grafo_grilla(num_nodos, rng)
+    elif tipo == "geometrico":
+        x_m, y_m, aristas = grafo_geometrico(num_nodos, rng)
+    else:
+        raise ValueError(f"Tipo de grafo desconocido: {tipo} (usa {', '.join(TIPOS)})")
+
+    lon, lat = _a_coordenadas(x_m, y_m)
+    # Ids a partir de 1, como enteros al estilo OSM
+    nodos = (np.arange(len(x_m)) + 1).tolist()
+    aristas = {(u + 1, v + 1): largo for (u, v), largo in aristas.items()}
+    return GrafoCSR._desde_aristas(nodos, lon, lat, aristas)
+
+
+def escribir_graphml(grafo, path):
+    """
+    Escribe el grafo en GraphML con los atributos que lee `GrafoCSR.desde_graphml`
+    (x, y de los nodos y length de las aristas).
+    """
+    origenes = np.repeat(np.arange(grafo.num_nodos), np.diff(grafo.indptr))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n"
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                '  <key id="d0" for="node" attr.name="x" attr.type="string" />\n'
+                '  <key id="d1" for="node" attr.name="y" attr.type="string" />\n'
+                '  <key id="d2" for="edge" attr.name="length" attr.type="string" />\n'
+                '  <graph edgedefault="directed">\n')
+        for n, x, y in zip(grafo.nodos.tolist(), grafo.x.tolist(), grafo.y.tolist()):
+            f.write(f'    <node id={quoteattr(str(n))}><data key="d0">{x!r}</data>'
+                    f'<data key="d1">{y!r}</data></node>\n')
+        for u, v, largo in zip(grafo.nodos[origenes].tolist(), grafo.nodos[grafo.indices].tolist(),
+                               grafo.pesos.tolist()):
+            f.write(f'    <edge source="{u}" target="{v}"><data key="d2">{largo!r}</data></edge>\n')
+        f.write("  </graph>\n</graphml>\n")
+
+
+def seleccionar_nodos(grafo, rng, num_tachos, num_gasolineras, fraccion_oeste=None):
+    """
+    Elige centro, vertedero, tachos y gasolineras como en `prueba.py`:
+    - centro: nodo más cercano al centro geométrico del grafo.
+    - vertedero: el nodo alcanzable más lejano desde el centro.
+    - tachos repartidos en oeste/este según la mediana de x (proporcional
+      al número de nodos de cada lado, o `fraccion_oeste` si se indica).
+    - gasolineras entre los nodos restantes.
+    Solo se usan nodos que van y vuelven del centro (su componente fuerte),
+    así todas las rutas son posibles.
+    """
+    cx, cy = np.median(grafo.x), np.median(grafo.y)
+    centro_pos = int(np.argmin(np.hypot(grafo.x - cx, grafo.y - cy)))
+
+    ida = grafo.dijkstra(centro_pos)
+    vuelta = grafo.transpuesta().dijkstra(centro_pos)
+    conectados = np.flatnonzero(np.isfinite(ida) & np.isfinite(vuelta))
+    conectados = conectados[conectados != centro_pos]
+
+    vertedero_pos = int(conectados[np.argmax(ida[conectados])])
+    libres = conectados[conectados != vertedero_pos]
+
+    requeridos = num_tachos + num_gasolineras
+    if requeridos > len(libres):
+        raise ValueError(f"El grafo tiene {len(libres)} nodos utilizables y se piden {requeridos}; "
+                         "usa más nodos o un tipo de grafo más grande")
+
+    x_medio = np.sort(grafo.x[libres])[len(libres) // 2]
+    oeste = libres[grafo.x[libres] <= x_medio]
+    este = libres[grafo.x[libres] > x_medio]
+    if fraccion_oeste is None:
+        fraccion_oeste = len(oeste) / len(libres)
+    num_oeste = min(round(num_tachos * fraccion_oeste), len(oeste))
+    num_este = min(num_tachos - num_oeste, len(este))
+
+    tachos_oeste = rng.choice(oeste, num_oeste, replace=False)
+    tachos_este = rng.choice(este, num_este, replace=False)
+    ocupados = set(tachos_oeste.tolist()) | set(tachos_este.tolist())
+    disponibles = np.array([p for p in libres.tolist() if p not in ocupados])
+    gasolineras = rng.choice(disponibles, min(num_gasolineras, len(disponibles)), replace=False)
+
+    ids = grafo.nodos
+    return {
+        "nodo_centro": int(ids[centro_pos]),
+        "nodo_vertedero": int(ids[vertedero_pos]),
+        "tachos_oeste": [int(n) for n in ids[tachos_oeste]],
+        "tachos_este": [int(n) for n in ids[tachos_este]],
+        "puntos_gasolineras": [int(n) for n in ids[gasolineras]],
+    }
+
+
+def generar_instancia(salida, tipo="grilla", num_tachos=1000, num_gasolineras=30, semilla=0,
+                      num_nodos=None, fraccion_oeste=None, procesos=None, codificacion="float64"):
+    """
+    Genera una instancia sintética en el directorio `salida` con los mismos
+    archivos que la real: grafo_paucarpata.graphml (+ caché .npz),
+    datos_extra.json, matriz_distancias.npy/.bin, indices_nodos.json y
+    nodos_indices.json. Con la misma semilla se obtiene la misma instancia.
+    """
+    if not 1 <= num_tachos <= 20000:
+        raise ValueError("num_tachos debe estar entre 1 y 20000")
+    rng = np.random.default_rng(semilla)
+    num_nodos = num_nodos or max(400, 4 * (num_tachos + num_gasolineras + 2))
+    os.makedirs(salida, exist_ok=True)
+
+    inicio = time.time()
+    grafo = construir_grafo(tipo, num_nodos, rng)
+    grafo_path = os.path.join(salida, "grafo_paucarpata.graphml")
+    escribir_graphml(grafo, grafo_path)
+    grafo.hash_origen = hash_archivo(grafo_path)
+    grafo.guardar(ruta_cache(grafo_path))
+    print(f"🗺️ Grafo {tipo}: {grafo.num_nodos} nodos, {grafo.num_aristas} aristas "
+          f"({time.time() - inicio:.2f} s)")
+
+    datos = seleccionar_nodos(grafo, rng, num_tachos, num_gasolineras, fraccion_oeste)
+    with open(os.path.join(salida, "datos_extra.json"), "w") as f:
+        json.dump(datos, f, indent=4)
+    print(f"  🗑️ Tachos: {len(datos['tachos_oeste'])} oeste, {len(datos['tachos_este'])} este")
+    print(f"  ⛽ Gasolineras: {len(datos['puntos_gasolineras'])}")
+
+    inicio = time.time()
+    nodos_relevantes = obtener_nodos_relevantes(datos)
+    matriz = construir_matriz(grafo, nodos_relevantes, procesos=procesos)
+    guardar_matriz_e_indices(
+        matriz, nodos_relevantes,
+        matriz_path=os.path.join(salida, "matriz_distancias.npy"),
+        indices_path=os.path.join(salida, "indices_nodos.json"),
+        nodos_path=os.path.join(salida, "nodos_indices.json"),
+        almacen_path=os.path.join(salida, "matriz_distancias.bin"),
+        hash_grafo=grafo.hash_origen,
+        codificacion=codificacion,
+    )
+    print(f"📐 Matriz {len(matriz)}x{len(matriz)} generada en {time.time() - inicio:.2f} s")
+    return datos
+
+
+if __name__ == "__main__":
+    # Uso: python instancias/generar_sintetica.py data/sintetica --tipo grilla --tachos 1000
+    parser = argparse.ArgumentParser(description="Genera una instancia sintética sin descargar OSM")
+    parser.add_argument("salida", help="Directorio de salida")
+    parser.add_argument("--tipo", choices=TIPOS, default="grilla")
+    parser.add_argument("--tachos", type=int, default=1000)
+    parser.add_argument("--gasolineras", type=int, default=30)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--nodos", type=int, help="Nodos del grafo (grilla/geometrico)")
+    parser.add_argument("--fraccion-oeste", type=float, help="Fracción de tachos en el oeste")
+    parser.add_argument("--procesos", type=int, help="Procesos para calcular la matriz")
+    parser.add_argument("--codificacion", choices=["float64", "float32", "uint32_m"], default="float64")
+    args = parser.parse_args()
+
+    generar_instancia(args.salida, args.tipo, args.tachos, args.gasolineras, args.semilla,
+                      args.nodos, args.fraccion_oeste, args.procesos, args.codificacion)
@@ -1,13 +1,14 @@
-import networkx as nx
+import os
+import sys
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import json
 
-# Cargar grafo
-G = nx.read_graphml("data/grafo_paucarpata.graphml")
-# Convertir los pesos 'length' a float
-for u, v, d in G.edges(data=True):
-    if "length" in d:
-        d["length"] = float(d["length"])
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from instancias.grafo_csr import cargar_grafo_csr
+
+# Cargar grafo (caché CSR)
+G = cargar_grafo_csr("data/grafo_paucarpata.graphml")
 
 
 # Cargar índices
@@ -20,16 +21,11 @@ with open("data/soluciones/solucion_0.json", "r") as f:
     rutas = json.load(f)
 rutas = [[int(n) for n in ruta] for ruta in rutas]
 
-# Posiciones de nodos
-pos = {
-    n: (float(G.nodes[n]["x"]), float(G.nodes[n]["y"]))
-    for n in G.nodes
-    if "x" in G.nodes[n] and "y" in G.nodes[n]
-}
-
 # Dibujar grafo base
 fig, ax = plt.subplots(figsize=(10, 10))
-nx.draw(G, pos, node_size=5, edge_color='lightgray', ax=ax)
+ax.add_collection(LineCollection(G.segmentos(), colors='lightgray', linewidths=0.5))
+ax.scatter(G.x, G.y, s=5)
+ax.autoscale()
 
 # Dibujar rutas
 colores = ["red", "blue", "green", "purple", "orange", "cyan"]
@@ -41,14 +37,12 @@ def dibujar_ruta(ruta, color, label):
             print(f"⚠️ Índice {idx} no está en indice_a_nodo")
             continue
 
-        nodo_real = str(indice_a_nodo[idx])  # convertimos a string porque G usa nodos string
-        if nodo_real not in G.nodes:
+        nodo_real = indice_a_nodo[idx]
+        if nodo_real not in G.nodo_a_pos:
             print(f"⚠️ Nodo {nodo_real} no está en el grafo")
             continue
 
-        x = float(G.nodes[nodo_real]["x"])
-        y = float(G.nodes[nodo_real]["y"])
-        coords.append((x, y))
+        coords.append(G.coordenadas(nodo_real))
 
     if len(coords) >= 2:
         xs, ys = zip(*coords)
@@ -59,18 +53,18 @@ def dibujar_ruta_por_calles(G, indice_a_nodo, ruta, color, label):
         idx_origen = ruta[i]
         idx_destino = ruta[i + 1]
 
-        try:
-            nodo_origen = str(indice_a_nodo[idx_origen])
-            nodo_destino = str(indice_a_nodo[idx_destino])
-            path = nx.shortest_path(G, source=nodo_origen, target=nodo_destino, weight='length')
-            path_coords = [(float(G.nodes[n]['x']), float(G.nodes[n]['y'])) for n in path if n in G.nodes]
-
-            if len(path_coords) >= 2:
-                xs, ys = zip(*path_coords)
-                ax.plot(xs, ys, linewidth=2, color=color, alpha=0.8, label=label if i == 0 else "")  # Solo 1 vez el label
+        nodo_origen = indice_a_nodo[idx_origen]
+        nodo_destino = indice_a_nodo[idx_destino]
+        path = G.camino(nodo_origen, nodo_destino)
 
-        except nx.NetworkXNoPath:
+        if path is None:
             print(f"❌ Sin camino entre {nodo_origen} y {nodo_destino}")
+            continue
+
+        path_coords = [G.coordenadas(n) for n in path]
+        if len(path_coords) >= 2:
+            xs, ys = zip(*path_coords)
+            ax.plot(xs, ys, linewidth=2, color=color, alpha=0.8, label=label if i == 0 else "")  # Solo 1 vez el label
 
 
 for i, ruta in enumerate(rutas):
@@ -0,0 +1,244 @@
+import hashlib
+import heapq
+import json
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+
+GRAFO_PATH = "data/grafo_paucarpata.graphml"
+
+GRAPHML_NS = "{http://graphml.graphdrawing.org/xmlns}"
+
+
+def hash_archivo(path):
+    """
+    Devuelve el hash SHA-1 del contenido de un archivo. Se usa para saber
+    si la caché binaria (o la matriz) corresponde a la versión actual del grafo.
+    """
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def ruta_huella(path):
+    return os.path.splitext(path)[0] + ".hash.json"
+
+
+def hash_cacheado(path):
+    """
+    Como `hash_archivo`, pero guarda el hash junto al archivo con su tamaño
+    y fecha de modificación y solo vuelve a leer el contenido si cambiaron.
+    Abrir la instancia (una vez por proceso del pool) no re-hashea el GraphML.
+    """
+    estado = os.stat(path)
+    huella = {"tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+    try:
+        with open(ruta_huella(path), "r", encoding="utf-8") as f:
+            guardada = json.load(f)
+        if {k: guardada.get(k) for k in huella} == huella and guardada.get("sha1"):
+            return guardada["sha1"]
+    except (OSError, ValueError):
+        pass
+
+    huella["sha1"] = hash_archivo(path)
+    try:
+        with open(ruta_huella(path), "w", encoding="utf-8") as f:
+            json.dump(huella, f)
+    except OSError:
+        pass  # directorio de solo lectura: se re-hashea la próxima vez
+    return huella["sha1"]
+
+
+class GrafoCSR:
+    """
+    Grafo vial dirigido almacenado en arreglos NumPy (formato CSR):
+    - nodos: id OSM de cada nodo (posición = índice interno)
+    - x, y: coordenadas de cada nodo
+    - indptr, indices, pesos: adyacencia y longitud (m) de cada arista
+    """
+
+    def __init__(self, nodos, x, y, indptr, indices, pesos, hash_origen=""):
+        self.nodos = np.asarray(nodos, dtype=np.int64)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.pesos = np.asarray(pesos, dtype=np.float64)
+        self.hash_origen = hash_origen
+        self.nodo_a_pos = {int(n): i for i, n in enumerate(self.nodos)}
+        self._listas = None
+
+    @property
+    def num_nodos(self):
+        return len(self.nodos)
+
+    @property
+    def num_aristas(self):
+        return len(self.indices)
+
+    @classmethod
+    def desde_graphml(cls, path):
+        """
+        Lee un GraphML de OSMnx sin pasar por NetworkX. De las aristas
+        paralelas se conserva solo la más corta.
+        """
+        claves = {}
+        nodos, xs, ys = [], [], []
+        aristas = {}
+
+        for _, elem in ET.iterparse(path, events=("end",)):
+            tag = elem.tag.replace(GRAPHML_NS, "")
+            if tag == "key":
+                claves[(elem.get("for"), elem.get("attr.name"))] = elem.get("id")
+            elif tag == "node":
+                datos = {d.get("key"): d.text for d in elem.findall(GRAPHML_NS + "data")}
+                nodos.append(int(elem.get("id")))
+                xs.append(float(datos.get(claves.get(("node", "x")), "nan")))
+                ys.append(float(datos.get(claves.get(("node", "y")), "nan")))
+                elem.clear()
+            elif tag == "edge":
+                datos = {d.get("key"): d.text for d in elem.findall(GRAPHML_NS + "data")}
+                u, v = int(elem.get("source")), int(elem.get("target"))
+                largo = float(datos.get(claves.get(("edge", "length")), 1.0))
+                if (u, v) not in aristas or largo < aristas[(u, v)]:
+                    aristas[(u, v)] = largo
+                elem.clear()
+
+        grafo = cls._desde_aristas(nodos, xs, ys, aristas)
+        grafo.hash_origen = hash_cacheado(path)
+        return grafo
+
+    @classmethod
+    def _desde_aristas(cls, nodos, xs, ys, aristas):
+        nodo_a_pos = {n: i for i, n in enumerate(nodos)}
+        n = len(nodos)
+        origenes = np.fromiter((nodo_a_pos[u] for u, _ in aristas), dtype=np.int64, count=len(aristas))
+        destinos = np.fromiter((nodo_a_pos[v] for _, v in aristas), dtype=np.int64, count=len(aristas))
+        pesos = np.fromiter(aristas.values(), dtype=np.float64, count=len(aristas))
+
+        orden = np.lexsort((destinos, origenes))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origenes, minlength=n), out=indptr[1:])
+        return cls(nodos, xs, ys, indptr, destinos[orden], pesos[orden])
+
+    def guardar(self, path):
+        np.savez(path, nodos=self.nodos, x=self.x, y=self.y,
+                 indptr=self.indptr, indices=self.indices, pesos=self.pesos,
+                 hash_origen=np.array(self.hash_origen))
+
+    @classmethod
+    def cargar(cls, path):
+        with np.load(path) as datos:
+            return cls(datos["nodos"], datos["x"], datos["y"],
+                       datos["indptr"], datos["indices"], datos["pesos"],
+                       str(datos["hash_origen"]))
+
+    def transpuesta(self):
+        """Devuelve el grafo con todas las aristas invertidas."""
+        origenes = np.repeat(np.arange(self.num_nodos), np.diff(self.indptr))
+        aristas = dict(zip(zip(self.nodos[self.indices].tolist(),
+                               self.nodos[origenes].tolist()),
+                           self.pesos.tolist()))
+        grafo = GrafoCSR._desde_aristas(self.nodos.tolist(), self.x, self.y, aristas)
+        grafo.hash_origen = self.hash_origen
+        return grafo
+
+    def _adyacencia(self):
+        # Listas de Python: indexarlas en el bucle de Dijkstra es mucho más
+        # rápido que indexar arreglos NumPy elemento a elemento.
+        if self._listas is None:
+            self._listas = (self.indptr.tolist(), self.indices.tolist(), self.pesos.tolist())
+        return self._listas
+
+    def dijkstra(self, origen, objetivos=None, predecesores=False):
+        """
+        Distancias mínimas desde la posición `origen` a todos los nodos
+        (inf si no hay camino). Si se indican `objetivos` (posiciones), la
+        búsqueda se detiene cuando todos quedan fijados.
+        """
+        indptr, indices, pesos = self._adyacencia()
+        dist = [float("inf")] * self.num_nodos
+        pred = [-1] * self.num_nodos
+        visitado = [False] * self.num_nodos
+        pendientes = set(objetivos) if objetivos is not None else None
+
+        dist[origen] = 0.0
+        heap = [(0.0, origen)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if visitado[u]:
+                continue
+            visitado[u] = True
+            if pendientes is not None:
+                pendientes.discard(u)
+                if not pendientes:
+                    break
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + pesos[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd, v))
+
+        if predecesores:
+            return np.array(dist), np.array(pred)
+        return np.array(dist)
+
+    def distancias_desde(self, origen, destinos):
+        """
+        Distancias desde el nodo OSM `origen` a cada nodo OSM de `destinos`.
+        """
+        posiciones = [self.nodo_a_pos[d] for d in destinos]
+        dist = self.dijkstra(self.nodo_a_pos[origen], objetivos=posiciones)
+        return dist[posiciones]
+
+    def camino(self, origen, destino):
+        """
+        Camino más corto entre dos nodos OSM como lista de ids OSM,
+        o None si no existe.
+        """
+        o, d = self.nodo_a_pos[origen], self.nodo_a_pos[destino]
+        dist, pred = self.dijkstra(o, objetivos=[d], predecesores=True)
+        if not np.isfinite(dist[d]):
+            return None
+        camino = [d]
+        while camino[-1] != o:
+            camino.append(pred[camino[-1]])
+        return [int(self.nodos[p]) for p in reversed(camino)]
+
+    def coordenadas(self, nodo):
+        i = self.nodo_a_pos[nodo]
+        return self.x[i], self.y[i]
+
+    def segmentos(self):
+        """Arreglo (m, 2, 2) con los extremos de cada arista, para graficar."""
+        origenes = np.repeat(np.arange(self.num_nodos), np.diff(self.indptr))
+        inicio = np.column_stack((self.x[origenes], self.y[origenes]))
+        fin = np.column_stack((self.x[self.indices], self.y[self.indices]))
+        return np.stack((inicio, fin), axis=1)
+
+
+def ruta_cache(graphml_path):
+    return os.path.splitext(graphml_path)[0] + ".npz"
+
+
+def cargar_grafo_csr(graphml_path=GRAFO_PATH, cache_path=None):
+    """
+    Carga el grafo desde la caché binaria `.npz` junto al GraphML. Si la
+    caché no existe o fue generada a partir de otra versión del GraphML,
+    se reconstruye y se vuelve a guardar.
+    """
+    cache_path = cache_path or ruta_cache(graphml_path)
+    hash_actual = hash_cacheado(graphml_path)
+
+    if os.path.exists(cache_path):
+        grafo = GrafoCSR.cargar(cache_path)
+        if grafo.hash_origen == hash_actual:
+            return grafo
+
+    grafo = GrafoCSR.desde_graphml(graphml_path)
+    grafo.guardar(cache_path)
+    return grafo
@@ -0,0 +1,78 @@
+import json
+import math
+import os
+from functools import cached_property
+
+from instancias.cargar_datos import cargar_matriz_y_indices
+
+SECTORES = ("este", "oeste")
+
+
+class Problema:
+    """
+    Datos de un sector en índices de la matriz. `directorio` es el de la
+    instancia, para los solvers que reabren la matriz en otros procesos.
+    `alcanzables` son los tachos con camino desde el centro y de regreso;
+    los demás no se pueden atender y los solvers los dejan fuera.
+    """
+
+    def __init__(self, sector, datos, matriz, nodo_a_indice, indice_a_nodo, directorio=None):
+        self.sector = sector
+        self.directorio = directorio
+        self.datos = datos
+        self.matriz = matriz
+        self.nodo_a_indice = nodo_a_indice
+        self.indice_a_nodo = indice_a_nodo
+        self.centro = nodo_a_indice[datos["nodo_centro"]]
+        self.vertedero = nodo_a_indice[datos["nodo_vertedero"]]
+        self.gasolineras = [nodo_a_indice[g] for g in datos["puntos_gasolineras"] if g in nodo_a_indice]
+        self.tachos = [nodo_a_indice[t] for t in datos[f"tachos_{sector}"] if t in nodo_a_indice]
+        self.alcanzables = [t for t in self.tachos
+                            if math.isfinite(matriz[self.centro][t]) and math.isfinite(matriz[t][self.centro])]
+
+    def a_nodos(self, ruta):
+        """Convierte una ruta por índices a ids de nodo OSM."""
+        return [int(self.indice_a_nodo[i]) for i in ruta]
+
+
+class Instancia:
+    """
+    Instancia del problema leída una sola vez desde `directorio` (data/ o el
+    de una instancia sintética). Todo se carga al primer uso: la matriz se
+    abre memory-mapped desde el almacén binario si existe, y los problemas
+    por sector se construyen una vez y se reutilizan entre corridas.
+    """
+
+    def __init__(self, directorio="data"):
+        self.directorio = directorio
+        self._problemas = {}
+
+    @cached_property
+    def datos(self):
+        with open(os.path.join(self.directorio, "datos_extra.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @cached_property
+    def _matriz_e_indices(self):
+        return cargar_matriz_y_indices(self.directorio)
+
+    @property
+    def matriz(self):
+        return self._matriz_e_indices[0]
+
+    @property
+    def nodo_a_indice(self):
+        return self._matriz_e_indices[1]
+
+    @property
+    def indice_a_nodo(self):
+        return self._matriz_e_indices[2]
+
+    def problema(self, sector):
+        if sector not in SECTORES:
+            raise ValueError(f"Sector inválido: {sector} (usa {', '.join(SECTORES)})")
+        if sector not in self._problemas:
+            self._problemas[sector] = Problema(sector, self.datos, self.matriz,
+                                               self.nodo_a_indice, self.indice_a_nodo,
+                                               self.directorio)
+        return self._problemas[sector]
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def vecinos_cercanos(matriz, candidatos, k, cero_es_infinito=False):
+    """
+    Lista de candidatos: para cada nodo (fila de la matriz) devuelve los
+    `k` nodos de `candidatos` más cercanos, ordenados por distancia.
+
+    Devuelve un arreglo (n, k) de índices de la matriz; las posiciones sin
+    vecino alcanzable (distancia inf) quedan en -1. Un nodo nunca es vecino
+    de sí mismo. Con `cero_es_infinito=True` las distancias 0 fuera de la
+    diagonal se tratan como "sin camino" (criterio del entorno ACO).
+    """
+    candidatos = np.asarray(sorted(candidatos), dtype=np.int64)
+    n = len(matriz)
+    k = min(k, len(candidatos))
+    if k == 0:
+        return np.full((n, 0), -1, dtype=np.int64)
+
+    distancias = np.array(matriz[:, candidatos], dtype=float)
+    mismo = np.arange(n)[:, None] == candidatos[None, :]
+    distancias[mismo] = np.inf
+    if cero_es_infinito:
+        distancias[distancias == 0] = np.inf
+
+    if k < len(candidatos):
+        cercanos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+    else:
+        cercanos = np.tile(np.arange(len(candidatos)), (n, 1))
+    orden = np.argsort(np.take_along_axis(distancias, cercanos, axis=1), axis=1, kind="stable")
+    cercanos = np.take_along_axis(cercanos, orden, axis=1)
+
+    vecinos = candidatos[cercanos]
+    vecinos[~np.isfinite(np.take_along_axis(distancias, cercanos, axis=1))] = -1
+    return vecinos
@@ -1,9 +1,14 @@
+import os
+import sys
 import json
-import osmnx as ox
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.collections import LineCollection
 
-G = ox.load_graphml("data/grafo_paucarpata.graphml")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from instancias.grafo_csr import cargar_grafo_csr
+
+G = cargar_grafo_csr("data/grafo_paucarpata.graphml")
 with open("data/datos_extra.json") as f:
     datos = json.load(f)
 with open("data/indices_nodos.json") as f:
@@ -17,9 +22,11 @@ tachos_oeste = set(datos["tachos_oeste"])
 tachos_este = set(datos["tachos_este"])
 gasolineras = set(datos["puntos_gasolineras"])
 
-posiciones = {nodo: (G.nodes[nodo]['x'], G.nodes[nodo]['y']) for nodo in indice_a_nodo.values()}
+posiciones = {nodo: G.coordenadas(nodo) for nodo in indice_a_nodo.values()}
 
-fig, ax = ox.plot_graph(G, node_size=0, edge_color='gray', show=False, close=False)
+fig, ax = plt.subplots(figsize=(10, 10))
+ax.add_collection(LineCollection(G.segmentos(), colors='gray', linewidths=0.5))
+ax.autoscale()
 ax.set_facecolor('white')
 
 def obtener_color(nodo):
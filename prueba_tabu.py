@@ -1,28 +1,25 @@
 from algoritmos.busqueda_tabu.tabu import TabuSearch, mostrar_rutas
-from instancias.cargar_datos import cargar_matriz_y_indices
+from instancias.instancia import Instancia
+from algoritmos.busqueda_local.busqueda_local import mejorar_rutas
 import json
 import random
-
-# === Cargar la matriz de distancias y los índices ===
-matriz, nodo_a_indice, indice_a_nodo = cargar_matriz_y_indices()
-
-# === Cargar datos extra ===
-with open("data/datos_extra.json", "r") as f:
-    datos = json.load(f)
+import sys
 
 # === Zona de trabajo: 'este' o 'oeste' ===
 zona = "este"
 
-# === Obtener nodos clave ===
-centro = nodo_a_indice[datos["nodo_centro"]]
-vertedero = nodo_a_indice[datos["nodo_vertedero"]]
-gasolineras = [nodo_a_indice[n] for n in datos["puntos_gasolineras"]]
-tachos_zona = datos["tachos_este"] if zona == "este" else datos["tachos_oeste"]
-tachos_actuales_idx = [nodo_a_indice[n] for n in tachos_zona]
+# === Cargar la instancia (matriz memory-mapped, índices y nodos clave) ===
+instancia = Instancia("data")
+problema = instancia.problema(zona)
+matriz, nodo_a_indice, indice_a_nodo = instancia.matriz, instancia.nodo_a_indice, instancia.indice_a_nodo
+centro = problema.centro
+vertedero = problema.vertedero
+gasolineras = problema.gasolineras
+tachos_actuales_idx = problema.tachos
 # === Simular demandas en kg ===
 random.seed(42)
-demandas = {nodo_a_indice[n]: 400 for n in tachos_zona}
-#demandas = {nodo_a_indice[n]: random.randint(300, 800) for n in tachos_zona}
+demandas = {t: 400 for t in tachos_actuales_idx}
+#demandas = {t: random.randint(300, 800) for t in tachos_actuales_idx}
 
 # === Crear instancia de TabuSearch ===
 ts = TabuSearch(
@@ -38,13 +35,23 @@ ts = TabuSearch(
     max_km=100.0,
     num_camiones=3,
     tam_tabu=7,
-    zona=zona
+    zona=zona,
+    k_vecinos=10            # swap/relocate entre tachos cercanos
 )
 
 # === Ejecutar búsqueda tabú ===
 print("\n🔍 Iniciando búsqueda Tabú...\n")
 ts.ejecutar_busqueda(max_iter=50)
 
+# === Post-optimización local opcional (python prueba_tabu.py --mejorar) ===
+# El combustible lo penaliza la propia búsqueda tabú, aquí solo se controla la carga
+if "--mejorar" in sys.argv:
+    ts.mejor_solucion = mejorar_rutas(
+        ts.mejor_solucion, matriz, tachos_actuales_idx, vertedero, gasolineras,
+        capacidad=ts.capacidad_kg, demanda=demandas, autonomia=None
+    )
+    ts.mejor_costo = ts.evaluar_costo(ts.mejor_solucion)
+
 # === Mostrar mejor solución encontrada ===
 print("\n✅ Mejor solución encontrada:")
 mostrar_rutas(ts, ts.mejor_solucion)
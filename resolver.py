@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import time
+
+from instancias.instancia import Instancia, SECTORES
+from algoritmos.solvers import SOLVERS, resolver, distancia_total
+from algoritmos.eventos import NIVELES, SIN_EVENTOS, crear_eventos
+from algoritmos.instrumentacion import Instrumentacion, SIN_INSTRUMENTACION
+from algoritmos.presupuesto import Presupuesto
+
+
+def leer_parametro(texto):
+    """'clave=valor' -> (clave, valor); el valor se interpreta como JSON si se puede."""
+    clave, _, valor = texto.partition("=")
+    try:
+        return clave, json.loads(valor)
+    except json.JSONDecodeError:
+        return clave, valor
+
+
+def resolver_sector(instancia, solver, sector, semilla=0, mejorar=False, eventos=SIN_EVENTOS,
+                    instrumentacion=SIN_INSTRUMENTACION, presupuesto=None, **parametros):
+    """
+    Resuelve un sector y devuelve el resultado en el formato común
+    {total_distance, routes, execution_time, algorithm} (distancia en metros,
+    rutas como ids de nodo OSM).
+    """
+    problema = instancia.problema(sector)
+    inicio = time.time()
+    rutas = resolver(solver, problema, semilla, mejorar=mejorar, eventos=eventos,
+                     instrumentacion=instrumentacion, presupuesto=presupuesto, **parametros)
+    execution_time = time.time() - inicio
+
+    return {
+        "total_distance": round(distancia_total(problema.matriz, rutas), 2),
+        "routes": [problema.a_nodos(ruta) for ruta in rutas],
+        "execution_time": round(execution_time, 2),
+        "algorithm": SOLVERS[solver].nombre + (" + búsqueda local" if mejorar else ""),
+    }
+
+
+if __name__ == "__main__":
+    # Uso: python resolver.py aco este,oeste [--semilla 1] [--mejorar] [-p iteraciones=50 -p vecinos=10]
+    #                         [--eventos eventos.jsonl] [--nivel debug] [--silencioso]
+    #                         [--perfil] [--reporte instrumentacion.json]
+    #                         [--segundos 10] [--max-evaluaciones 50000] [--paciencia 100]
+    parser = argparse.ArgumentParser(description="Ejecuta cualquier solver sobre cualquier sector")
+    parser.add_argument("solver", choices=sorted(SOLVERS))
+    parser.add_argument("sectores", nargs="?", default=",".join(SECTORES))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--mejorar", action="store_true", help="Aplicar la búsqueda local común")
+    parser.add_argument("-p", "--parametro", action="append", default=[], type=leer_parametro,
+                        help="Parámetro del solver como clave=valor (repetible)")
+    parser.add_argument("--datos", default="data", help="Directorio de la instancia")
+    parser.add_argument("--salida", default="resultados", help="Directorio de los JSON de resultados")
+    parser.add_argument("--eventos", help="Archivo JSON Lines donde guardar los eventos")
+    parser.add_argument("--nivel", choices=sorted(NIVELES, key=NIVELES.get), default="info",
+                        help="Nivel mínimo de los eventos (debug muestra cada iteración)")
+    parser.add_argument("--silencioso", action="store_true", help="No mostrar eventos por consola")
+    parser.add_argument("--perfil", action="store_true", help="Perfilar con cProfile")
+    parser.add_argument("--reporte", help="Archivo JSON con tiempos por fase, contadores y perfil")
+    parser.add_argument("--segundos", type=float, help="Tiempo máximo por sector (metaheurísticas)")
+    parser.add_argument("--max-evaluaciones", type=int, help="Máximo de soluciones evaluadas por sector")
+    parser.add_argument("--paciencia", type=int, help="Iteraciones sin mejora antes de parar")
+    args = parser.parse_args()
+    con_presupuesto = any(v is not None for v in (args.segundos, args.max_evaluaciones, args.paciencia))
+
+    instrumentacion = Instrumentacion(args.perfil, args.reporte)
+    instancia = Instancia(args.datos)
+    with instrumentacion.fase("carga"):
+        instancia.datos
+    with instrumentacion.fase("matriz"):
+        instancia.matriz
+    eventos = crear_eventos(args.eventos, args.nivel, args.silencioso)
+    os.makedirs(args.salida, exist_ok=True)
+    for sector in args.sectores.split(","):
+        print(f"🚀 {SOLVERS[args.solver].nombre} en el sector {sector.upper()}...")
+        presupuesto = (Presupuesto(args.segundos, args.max_evaluaciones, paciencia=args.paciencia)
+                       if con_presupuesto else None)
+        resultado = resolver_sector(instancia, args.solver, sector, args.semilla, args.mejorar,
+                                    eventos, instrumentacion, presupuesto, **dict(args.parametro))
+        archivo = os.path.join(args.salida, f"{args.solver}_{sector}.json")
+        # Sin NaN/Infinity: el formato común debe ser JSON válido
+        with instrumentacion.fase("salida"):
+            texto = json.dumps(resultado, indent=2, ensure_ascii=False, allow_nan=False)
+            with open(archivo, "w", encoding="utf-8") as f:
+                f.write(texto)
+        print(f"  🛣️ Distancia total: {resultado['total_distance']:.2f} m")
+        print(f"  🚛 Rutas: {len(resultado['routes'])}")
+        problema = instancia.problema(sector)
+        if len(problema.alcanzables) < len(problema.tachos):
+            print(f"  ⚠️ Tachos sin camino desde o hacia el centro: "
+                  f"{len(problema.tachos) - len(problema.alcanzables)}")
+        print(f"  ⏱️ Tiempo de ejecución: {resultado['execution_time']:.2f} segundos")
+        print(f"  💾 Guardado en {archivo}")
+    eventos.cerrar()
+    instrumentacion.terminar()